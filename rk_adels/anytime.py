@@ -0,0 +1,169 @@
+"""Anytime control for the optimizers in rk_adels.de.
+
+Every optimizer exists as a generator (`iter_*`) that yields a `Progress` after
+each evaluation and returns its `DEResult` when it stops. The blocking `run_*`
+functions simply drain it. A generator stops when
+
+- its time budget is used up,
+- the `CancelToken` passed to it is cancelled (from any thread), or
+- the best utilization reaches `target_V`, or
+- the best utilization reaches the instance's upper bound (rk_adels.bounds), i.e. the
+  incumbent is provably optimal (stop = "bound").
+
+The budget clock only runs while the generator is executing: time spent by the
+consumer between two yields is not charged. Advancing several generators in turn
+(`interleave`) therefore gives every run its full budget of solver time.
+
+An incumbent from elsewhere can be offered with ``gen.send((x, eval_info))``; the
+RK-ADE, GA, PSO and SA generators adopt it at their next generation (or move) when it
+beats their own best (see rk_adels.portfolio).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Hashable, Iterator, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .de import DEResult, EvalInfo
+    from .instance import Instance
+
+
+class CancelToken:
+    """Thread-safe flag that asks a running optimizer to stop after its current evaluation."""
+
+    def __init__(self):
+        self._ev = threading.Event()
+
+    def cancel(self) -> None:
+        self._ev.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._ev.is_set()
+
+
+@dataclass
+class Progress:
+    n_evals: int
+    elapsed: float          # solver seconds since the run started (pauses excluded)
+    best_eval: "EvalInfo"
+    best_x: np.ndarray
+    improved: bool          # this evaluation produced a new best
+
+
+class StopRun(Exception):
+    """Raised inside an optimizer generator when it was cancelled or hit its target."""
+
+
+class RunControl:
+    """Budget clock, stop conditions and last reported state of one optimizer run."""
+
+    def __init__(self, seconds: float, cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+                 inst: Optional["Instance"] = None, check: Optional[Callable[[np.ndarray], None]] = None):
+        self.seconds = float(seconds)
+        self.check = check  # called on every new incumbent x (e.g. to validate its packing)
+        self.cancel = cancel
+        self.target_V = target_V
+        self.V_bound: Optional[float] = None
+        if inst is not None:
+            from .bounds import BOUND_TOL, instance_bounds
+            self.V_bound = instance_bounds(inst).V_ub - BOUND_TOL
+        self._t0 = time.time()
+        self._paused = 0.0
+        self._budget0 = 0.0
+        self.stop = "budget"
+        self.n_evals = 0
+        self.best_x: Optional[np.ndarray] = None
+        self.best_eval: Optional["EvalInfo"] = None
+        self.injected: Optional[Tuple[np.ndarray, "EvalInfo"]] = None
+
+    def active(self) -> float:
+        return time.time() - self._t0 - self._paused
+
+    def start_budget(self) -> None:
+        """Start charging the budget from now (used where initialization is not budgeted)."""
+        self._budget0 = self.active()
+
+    def charge(self, seconds: float) -> None:
+        """Count `seconds` of the budget as already used (a run resumed from a checkpoint)."""
+        self._budget0 -= float(seconds)
+
+    def elapsed(self) -> float:
+        return self.active() - self._budget0
+
+    def expired(self) -> bool:
+        return self.elapsed() >= self.seconds
+
+    def step(self, n_evals: int, best_x: np.ndarray, best_eval: "EvalInfo", improved: bool) -> Generator[Progress, Any, Any]:
+        """Report one evaluation; use as ``sent = yield from ctl.step(...)``.
+
+        Returns the value sent into the generator (if any) and raises StopRun when the
+        run was cancelled or reached its target in the meantime.
+        """
+        if improved and self.check is not None:
+            self.check(best_x)
+        self.n_evals = n_evals
+        self.best_x = best_x
+        self.best_eval = best_eval
+        t = time.time()
+        sent = yield Progress(n_evals=n_evals, elapsed=t - self._t0 - self._paused,
+                              best_eval=best_eval, best_x=best_x, improved=improved)
+        self._paused += time.time() - t
+        if sent is not None:
+            self.injected = sent
+        if self.cancel is not None and self.cancel.cancelled:
+            self.stop = "cancelled"
+            raise StopRun
+        if self.target_V is not None and best_eval.V >= self.target_V:
+            self.stop = "target"
+            raise StopRun
+        if self.V_bound is not None and best_eval.V >= self.V_bound:
+            self.stop = "bound"
+            raise StopRun
+        return sent
+
+
+    def take_injected(self, best_f: float) -> Optional[Tuple[np.ndarray, "EvalInfo"]]:
+        """The (x, EvalInfo) last sent into the generator if it beats `best_f` (consumed)."""
+        inj, self.injected = self.injected, None
+        if inj is None or inj[1].f <= best_f:
+            return None
+        return inj
+
+
+def drain(gen: Generator[Progress, Any, "DEResult"], callback: Optional[Callable[[Progress], None]] = None) -> "DEResult":
+    """Run an optimizer generator to completion, calling `callback` on every Progress."""
+    while True:
+        try:
+            p = next(gen)
+        except StopIteration as s:
+            return s.value
+        if callback is not None:
+            callback(p)
+
+
+def improvements(gen: Generator[Progress, Any, "DEResult"]) -> Iterator[Progress]:
+    """Only the Progress items that carry a new best."""
+    for p in gen:
+        if p.improved:
+            yield p
+
+
+def interleave(streams: Dict[Hashable, Generator[Progress, Any, "DEResult"]]) -> Iterator[Tuple[Hashable, Any]]:
+    """Advance several optimizer generators round-robin, one evaluation at a time.
+
+    Yields (key, Progress) while runs are active and (key, DEResult) once per run when it
+    stops. Breaking out of the loop leaves the remaining generators suspended.
+    """
+    active = dict(streams)
+    while active:
+        for key in list(active):
+            try:
+                yield key, next(active[key])
+            except StopIteration as s:
+                del active[key]
+                yield key, s.value
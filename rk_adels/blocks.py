@@ -0,0 +1,133 @@
+"""Block building: pre-aggregate identical boxes into composite cuboids.
+
+`build_blocks` turns every box type with q > 1 into a few simple blocks: nx x ny x nz
+boxes of that type side by side in their original axes (rows, columns and layers).
+The blocks form a new `Instance` (one block per item), so the random-key genotype,
+the optimizers and `decode_wall_heightmap` work on blocks unchanged, with a much
+shorter decode sequence. A block keeps the `vert_ok` flags of its boxes: rotating the
+block rotates every box the same way, so each box orientation the decoder can pick
+for a block is allowed for its boxes.
+
+`BlockPlan.expand` maps a block packing back to one placement per box of the
+original instance.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from .decoder import DecodeResult, Placement
+from .instance import BoxType, Instance, orientations
+
+_PERMS = [(0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)]
+
+
+@dataclass
+class BlockShape:
+    type_index: int           # box type in the original instance
+    counts: Tuple[int, int, int]  # boxes along the box's own w, h, d axes
+    box: Tuple[float, float, float]
+
+    @property
+    def size(self) -> int:
+        return self.counts[0] * self.counts[1] * self.counts[2]
+
+    @property
+    def dims(self) -> Tuple[float, float, float]:
+        return tuple(c * b for c, b in zip(self.counts, self.box))  # type: ignore[return-value]
+
+
+def _fits(dims, vert_ok, W: float, H: float, D: float) -> bool:
+    return any(w <= W and h <= H and d <= D for w, h, d in orientations(*dims, vert_ok))
+
+
+def _best_block(t: BoxType, q: int, W: float, H: float, D: float, max_items: int, max_extent: float) -> Tuple[int, int, int]:
+    """Largest nx*ny*nz <= min(q, max_items) block that fits the container; ties go to the
+    most compact block (smallest longest edge relative to the container)."""
+    L = max_extent * max(W, H, D)
+    cap = min(q, max_items)
+    lim = [max(1, min(cap, int(L // e))) if e > 0 else 1 for e in (t.w, t.h, t.d)]
+    best, best_key = (1, 1, 1), None
+    for nx in range(1, lim[0] + 1):
+        for ny in range(1, min(lim[1], cap // nx) + 1):
+            for nz in range(1, min(lim[2], cap // (nx * ny)) + 1):
+                dims = (nx * t.w, ny * t.h, nz * t.d)
+                if max(dims) > L or not _fits(dims, t.vert_ok, W, H, D):
+                    continue
+                key = (nx * ny * nz, -max(dims))
+                if best_key is None or key > best_key:
+                    best, best_key = (nx, ny, nz), key
+    return best
+
+
+class BlockPlan:
+    """Blocks of an instance: `instance` packs blocks; `members[j]` are the original item
+    indices in block j (row-major over the block's nx, ny, nz grid)."""
+
+    def __init__(self, inst: Instance, shapes: List[BlockShape], quantities: List[int]):
+        self.source = inst
+        self.shapes = shapes
+        types = []
+        for s, q in zip(shapes, quantities):
+            t = inst.types[s.type_index]
+            w, h, d = s.dims
+            types.append(BoxType(w=w, h=h, d=d, vert_ok=t.vert_ok, q=q))
+        self.instance = Instance(name=inst.name, container=inst.container, types=types)
+        # Item ranges: consecutive blocks take consecutive original item indices of their type.
+        self.members: List[List[int]] = []
+        self._shape_of: List[int] = []
+        next_item = list(inst.type_offsets[:-1])
+        for k, (s, q) in enumerate(zip(shapes, quantities)):
+            for _ in range(q):
+                lo = next_item[s.type_index]
+                self.members.append(list(range(lo, lo + s.size)))
+                self._shape_of.append(k)
+                next_item[s.type_index] = lo + s.size
+
+    @property
+    def n_blocks(self) -> int:
+        return len(self.members)
+
+    def expand(self, res: DecodeResult, eps_P: float = 1e-4) -> DecodeResult:
+        """Per-box packing of the original instance from a packing of `instance`."""
+        placements: List[Placement] = []
+        for p in res.placements:
+            s = self.shapes[self._shape_of[p.item]]
+            flags = tuple(int(v) for v in self.source.types[s.type_index].vert_ok)
+            bdims = s.dims
+            # The same permutation orientations() chose for this placed size.
+            a, b, c = next(pm for pm in _PERMS if flags[pm[1]] == 1
+                           and (bdims[pm[0]], bdims[pm[1]], bdims[pm[2]]) == (p.w, p.h, p.d))
+            nx, ny, nz = s.counts[a], s.counts[b], s.counts[c]
+            w, h, d = s.box[a], s.box[b], s.box[c]
+            # Member k sits at grid cell (i0, i1, i2) along the box's own axes.
+            members = self.members[p.item]
+            ni = s.counts
+            for k, item in enumerate(members):
+                cell = (k // (ni[1] * ni[2]), (k // ni[2]) % ni[1], k % ni[2])
+                ix, iy, iz = cell[a], cell[b], cell[c]
+                placements.append(Placement(x=p.x + ix * w, y=p.y + iy * h, z=p.z + iz * d,
+                                            w=w, h=h, d=d, r=p.r, item=item))
+        n = self.source.n
+        f = res.f + eps_P * (len(placements) / n - res.placed_count / max(self.n_blocks, 1)) if n else res.f
+        return DecodeResult(V=res.V, placed_count=len(placements), H_max=res.H_max, D_max=res.D_max, f=f,
+                            placements=placements, hm_peak_bytes=res.hm_peak_bytes, hm_allocs=res.hm_allocs,
+                            n_anchors=res.n_anchors)
+
+
+def build_blocks(inst: Instance, max_items: int = 8, max_extent: float = 0.5) -> BlockPlan:
+    """Greedily cut each box type's quantity into the largest simple blocks of at most
+    `max_items` boxes whose edges stay within `max_extent` of the longest container edge."""
+    c = inst.container
+    shapes: List[BlockShape] = []
+    quantities: List[int] = []
+    for ti, t in enumerate(inst.types):
+        left = int(t.q)
+        while left > 0:
+            counts = _best_block(t, left, c.W, c.H, c.D, max_items, max_extent)
+            shape = BlockShape(type_index=ti, counts=counts, box=(t.w, t.h, t.d))
+            k = left // shape.size
+            shapes.append(shape)
+            quantities.append(k)
+            left -= k * shape.size
+    return BlockPlan(inst, shapes, quantities)
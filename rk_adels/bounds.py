@@ -0,0 +1,72 @@
+"""Per-instance upper bounds on utilization V and on the number of placed items.
+
+- Items that do not fit the empty container in any `vert_ok`-feasible orientation can
+  never be placed.
+- Volume bound: V <= (volume of the items that fit) / container volume, capped at 1.
+- Normal-pattern bound (integer instances): a packing can be pushed towards the origin
+  until every coordinate is a normal pattern (rk_adels.raster), so it lies inside
+  W* x H* x D*, the largest normal patterns not exceeding W, H and D; hence
+  V <= W* H* D* / (W H D).
+- Count bound: the k smallest fitting items must fit by volume, so at most as many
+  items are placed as the longest ascending-volume prefix within the container volume.
+
+The optimizers stop as soon as their incumbent reaches `V_ub` (see
+rk_adels.anytime.RunControl); run rows report the bound and the remaining gap.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from .instance import Instance, InstanceCache, orientations
+from .raster import normal_patterns
+
+BOUND_TOL = 1e-9
+
+
+@dataclass
+class Bounds:
+    V_ub: float          # best upper bound on V
+    placed_ub: int       # upper bound on the number of placed items
+    n_fit: int           # items that fit the empty container on their own
+    V_volume: float      # volume bound
+    V_pattern: float     # normal-pattern bound (nan for non-integer instances)
+
+
+def fits_container(inst: Instance, w: float, h: float, d: float, vert_ok=(1, 1, 1)) -> bool:
+    c = inst.container
+    return any(a <= c.W and b <= c.H and e <= c.D for a, b, e in orientations(w, h, d, vert_ok))
+
+
+def compute_bounds(inst: Instance) -> Bounds:
+    c = inst.container
+    cap = c.W * c.H * c.D
+    vols = []
+    for t in inst.types:
+        if t.q > 0 and fits_container(inst, t.w, t.h, t.d, t.vert_ok):
+            vols.extend([t.w * t.h * t.d] * int(t.q))
+    n_fit = len(vols)
+    V_volume = min(1.0, sum(vols) / cap) if cap > 0 else 0.0
+
+    V_pattern = float("nan")
+    pats = [normal_patterns(inst, axis) for axis in "xyz"]
+    if cap > 0 and all(p is not None for p in pats):
+        W_, H_, D_ = (p[-1] for p in pats)  # type: ignore[index]
+        V_pattern = W_ * H_ * D_ / cap
+
+    placed_ub, acc = 0, 0.0
+    for v in sorted(vols):
+        if acc + v > cap * (1.0 + BOUND_TOL):
+            break
+        acc += v
+        placed_ub += 1
+
+    V_ub = V_volume if V_pattern != V_pattern else min(V_volume, V_pattern)
+    return Bounds(V_ub=V_ub, placed_ub=placed_ub, n_fit=n_fit, V_volume=V_volume, V_pattern=V_pattern)
+
+
+_CACHE: "InstanceCache[Bounds]" = InstanceCache(compute_bounds)
+
+
+def instance_bounds(inst: Instance) -> Bounds:
+    """Bounds of `inst` (computed once per Instance object, see InstanceCache)."""
+    return _CACHE(inst)
@@ -0,0 +1,186 @@
+"""Single-file, memory-mapped instance bundles.
+
+A bundle packs many instances into one binary file so that sweeps (and every worker
+process in them) open one file instead of parsing hundreds of JSON documents. Item
+data is stored per box type, so a bundle scales with the number of types.
+
+Layout (little-endian)::
+
+    b"RKBUNDL1"
+    for each instance, 8-byte aligned:
+        dims     float64[T, 3]   (w, h, d)
+        q        int64[T]
+        vert_ok  uint8[T, 3]
+    index    UTF-8 JSON: {"version": 1, "instances": [{name, W, H, D, n_items, n_types, offset}, ...]}
+    trailer  uint64 index_offset, uint64 index_length, b"RKBUNDL1"
+
+The index sits at the end so bundles can be written in one streaming pass.
+`InstanceBundle` memory-maps the file; `entry()` returns zero-copy array views and
+`instance()` builds an `Instance` on demand.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+import numpy as np
+
+from .instance import BoxType, Container, Instance
+
+MAGIC = b"RKBUNDL1"
+VERSION = 1
+_TRAILER = struct.Struct("<QQ8s")
+BUNDLE_SUFFIX = ".rkb"
+
+
+@dataclass
+class PackedInstance:
+    """Array view of one bundled instance (arrays are read-only views into the mapping)."""
+    name: str
+    container: Container
+    dims: np.ndarray      # float64[T, 3]
+    q: np.ndarray         # int64[T]
+    vert_ok: np.ndarray   # uint8[T, 3]
+
+    @property
+    def n(self) -> int:
+        return int(self.q.sum())
+
+    def to_instance(self) -> Instance:
+        types = [
+            BoxType(w=float(w), h=float(h), d=float(d), vert_ok=(int(a), int(b), int(c)), q=int(k))
+            for (w, h, d), (a, b, c), k in zip(self.dims.tolist(), self.vert_ok.tolist(), self.q.tolist())
+        ]
+        return Instance(name=self.name, container=Container(W=self.container.W, H=self.container.H, D=self.container.D), types=types)
+
+
+class BundleWriter:
+    """Stream instances into a bundle file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "wb")
+        self._f.write(MAGIC)
+        self._index: List[Dict[str, Any]] = []
+        self._names: set = set()
+
+    def _align(self) -> None:
+        pad = (-self._f.tell()) % 8
+        if pad:
+            self._f.write(b"\0" * pad)
+
+    def add(self, inst: Instance) -> None:
+        """Append one instance; names must be unique within a bundle (ValueError otherwise)."""
+        if inst.name in self._names:
+            raise ValueError(f"Duplicate instance name in bundle {self.path}: {inst.name!r}")
+        self._names.add(inst.name)
+        types = inst.types
+        dims = np.array([(t.w, t.h, t.d) for t in types], dtype="<f8").reshape(-1, 3)
+        q = np.array([int(t.q) for t in types], dtype="<i8")
+        vo = np.array([tuple(t.vert_ok) for t in types], dtype=np.uint8).reshape(-1, 3)
+        self._align()
+        offset = self._f.tell()
+        self._f.write(dims.tobytes())
+        self._f.write(q.tobytes())
+        self._f.write(vo.tobytes())
+        c = inst.container
+        self._index.append({
+            "name": inst.name,
+            "W": float(c.W), "H": float(c.H), "D": float(c.D),
+            "n_items": int(q.sum()),
+            "n_types": len(types),
+            "offset": offset,
+        })
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self._align()
+        idx_off = self._f.tell()
+        raw = json.dumps({"version": VERSION, "instances": self._index}).encode("utf-8")
+        self._f.write(raw)
+        self._f.write(_TRAILER.pack(idx_off, len(raw), MAGIC))
+        self._f.close()
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_bundle(instances: Iterable[Instance], path: Union[str, Path]) -> int:
+    n = 0
+    with BundleWriter(path) as w:
+        for inst in instances:
+            w.add(inst)
+            n += 1
+    return n
+
+
+class InstanceBundle:
+    """Read-only, memory-mapped view of a bundle file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if self._mm.size < len(MAGIC) + _TRAILER.size or bytes(self._mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Not an instance bundle: {self.path}")
+        idx_off, idx_len, magic = _TRAILER.unpack(bytes(self._mm[-_TRAILER.size:]))
+        if magic != MAGIC:
+            raise ValueError(f"Truncated instance bundle: {self.path}")
+        meta = json.loads(bytes(self._mm[idx_off:idx_off + idx_len]).decode("utf-8"))
+        if int(meta.get("version", 0)) != VERSION:
+            raise ValueError(f"Unsupported bundle version {meta.get('version')} in {self.path}")
+        self.index: List[Dict[str, Any]] = meta["instances"]
+        self._by_name: Dict[str, int] = {}
+        self._dup_names: set = set()  # bundles written before names were checked may repeat them
+        for k, rec in enumerate(self.index):
+            if rec["name"] in self._by_name:
+                self._dup_names.add(rec["name"])
+            else:
+                self._by_name[rec["name"]] = k
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def names(self) -> List[str]:
+        return [rec["name"] for rec in self.index]
+
+    def _pos(self, key: Union[int, str]) -> int:
+        if not isinstance(key, str):
+            return int(key)
+        if key in self._dup_names:
+            raise KeyError(f"Instance name {key!r} occurs more than once in {self.path}; look it up by index")
+        return self._by_name[key]
+
+    def entry(self, key: Union[int, str]) -> PackedInstance:
+        rec = self.index[self._pos(key)]
+        T = int(rec["n_types"])
+        off = int(rec["offset"])
+        mm = self._mm
+        dims = mm[off:off + 24 * T].view("<f8").reshape(T, 3)
+        off += 24 * T
+        q = mm[off:off + 8 * T].view("<i8")
+        off += 8 * T
+        vo = mm[off:off + 3 * T].reshape(T, 3)
+        return PackedInstance(
+            name=rec["name"],
+            container=Container(W=rec["W"], H=rec["H"], D=rec["D"]),
+            dims=dims, q=q, vert_ok=vo,
+        )
+
+    def instance(self, key: Union[int, str]) -> Instance:
+        return self.entry(key).to_instance()
+
+    def __getitem__(self, key: Union[int, str]) -> Instance:
+        return self.instance(key)
+
+    def __iter__(self) -> Iterator[Instance]:
+        for k in range(len(self)):
+            yield self.instance(k)
@@ -0,0 +1,150 @@
+"""Metadata catalog over an instance directory.
+
+The catalog (`catalog.csv` next to the instances) stores one row of summary
+statistics per JSON file so subsets can be selected without loading every
+instance. It is refreshed incrementally: a file is only re-parsed when its
+size or mtime differs from the cached row.
+
+Columns:
+  name, file, family, W, H, D, n_items, n_types, vol_ratio (total item volume /
+  container volume), dim_min, dim_mean, dim_max (over item edges),
+  n_restricted (items with any vert_ok == 0), n_single_vertical (items with exactly
+  one dimension allowed vertically), sha1, size, mtime
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .instance import Instance
+
+CATALOG_NAME = "catalog.csv"
+CATALOG_COLUMNS = [
+    "name", "file", "family", "W", "H", "D", "n_items", "n_types", "vol_ratio",
+    "dim_min", "dim_mean", "dim_max", "n_restricted", "n_single_vertical",
+    "sha1", "size", "mtime",
+]
+_INT_COLUMNS = {"n_items", "n_types", "n_restricted", "n_single_vertical", "size"}
+_STR_COLUMNS = {"name", "file", "family", "sha1"}
+
+
+def instance_family(name: str) -> str:
+    """Family label from an instance name: thpack3_p017_seed... -> thpack3, syn_004 -> syn."""
+    m = re.match(r"^(.*?)_p\d+", name)
+    if m:
+        return m.group(1)
+    return re.sub(r"[_-]?\d+$", "", name) or name
+
+
+def catalog_row(path: Union[str, Path]) -> Dict[str, Any]:
+    path = Path(path)
+    raw = path.read_bytes()
+    inst = Instance.from_dict(json.loads(raw))
+    name = inst.name or path.stem
+    c = inst.container
+    n_items = 0
+    vol = 0.0
+    dim_sum = 0.0
+    dim_min = float("inf")
+    dim_max = 0.0
+    n_restricted = 0
+    n_single = 0
+    for t in inst.types:
+        q = int(t.q)
+        if q <= 0:
+            continue
+        n_items += q
+        vol += q * t.w * t.h * t.d
+        dim_sum += q * (t.w + t.h + t.d)
+        dim_min = min(dim_min, t.w, t.h, t.d)
+        dim_max = max(dim_max, t.w, t.h, t.d)
+        allowed = sum(1 for f in t.vert_ok if int(f) == 1)
+        if allowed < 3:
+            n_restricted += q
+        if allowed == 1:
+            n_single += q
+    cvol = c.W * c.H * c.D
+    st = path.stat()
+    return {
+        "name": name,
+        "file": path.name,
+        "family": instance_family(name),
+        "W": float(c.W), "H": float(c.H), "D": float(c.D),
+        "n_items": n_items,
+        "n_types": inst.n_types,
+        "vol_ratio": vol / cvol if cvol > 0 else 0.0,
+        "dim_min": dim_min if n_items else 0.0,
+        "dim_mean": dim_sum / (3 * n_items) if n_items else 0.0,
+        "dim_max": dim_max,
+        "n_restricted": n_restricted,
+        "n_single_vertical": n_single,
+        "sha1": hashlib.sha1(raw).hexdigest(),
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+    }
+
+
+def _read_cached(cat_path: Path) -> Dict[str, Dict[str, Any]]:
+    if not cat_path.exists():
+        return {}
+    with open(cat_path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    if not rows or set(rows[0]) != set(CATALOG_COLUMNS):
+        return {}  # stale layout: rebuild
+    out = {}
+    for r in rows:
+        for k in CATALOG_COLUMNS:
+            if k in _INT_COLUMNS:
+                r[k] = int(r[k])
+            elif k not in _STR_COLUMNS:
+                r[k] = float(r[k])
+        out[r["file"]] = r
+    return out
+
+
+def update_catalog(inst_dir: Union[str, Path], catalog_path: Optional[Union[str, Path]] = None) -> List[Dict[str, Any]]:
+    """Refresh the catalog of `inst_dir` (re-parsing only new or modified files) and return its rows."""
+    inst_dir = Path(inst_dir)
+    cat_path = Path(catalog_path) if catalog_path is not None else inst_dir / CATALOG_NAME
+    cached = _read_cached(cat_path)
+    rows: List[Dict[str, Any]] = []
+    changed = False
+    files = sorted(inst_dir.glob("*.json"))
+    for p in files:
+        st = p.stat()
+        old = cached.get(p.name)
+        if old is not None and old["size"] == st.st_size and old["mtime"] == st.st_mtime:
+            rows.append(old)
+        else:
+            rows.append(catalog_row(p))
+            changed = True
+    if changed or len(rows) != len(cached) or not cat_path.exists():
+        tmp = cat_path.with_suffix(cat_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=CATALOG_COLUMNS)
+            w.writeheader()
+            for r in rows:
+                w.writerow({**r, "mtime": repr(float(r["mtime"]))})
+        tmp.replace(cat_path)
+    return rows
+
+
+def load_catalog(inst_dir: Union[str, Path], catalog_path: Optional[Union[str, Path]] = None):
+    """Up-to-date catalog as a pandas DataFrame."""
+    import pandas as pd
+
+    return pd.DataFrame(update_catalog(inst_dir, catalog_path), columns=CATALOG_COLUMNS)
+
+
+def select_instances(inst_dir: Union[str, Path], where: Optional[str] = None) -> List[Path]:
+    """Instance files matching a pandas query over the catalog columns, e.g.
+    ``"n_items > 150 and family == 'thpack3'"``. Returns all files if `where` is empty."""
+    inst_dir = Path(inst_dir)
+    df = load_catalog(inst_dir)
+    if where:
+        df = df.query(where)
+    return [inst_dir / f for f in sorted(df["file"])]
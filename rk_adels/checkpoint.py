@@ -0,0 +1,117 @@
+"""Periodic optimizer-state checkpoints for long runs.
+
+`Checkpoint(path, every)` is passed as `checkpoint=` to an optimizer generator (every
+iter_* in rk_adels.de, and iter_portfolio). At generation boundaries (for SA, PT and
+the decoder-only and random-search baselines: between moves, rounds or batches), at
+most once every `every` seconds of wall time, the optimizer writes its full state to
+one .npz file: population or chains, fitness arrays, step-size memories, RNG states,
+surrogate statistics, evaluation counter, incumbent and the budget used so far. The
+file is written to a temporary name and then renamed, so a kill leaves the last
+complete checkpoint. A portfolio gives each member its own file (`member(k)`).
+
+If the file exists when the run starts, the run resumes from it. It then continues
+with the same evaluations as the uninterrupted run, and only the time budget can cut
+it off at a different point (SA temperatures and the L-SHADE population size follow
+the elapsed budget when no evaluation limit is set, and portfolio members exchange
+incumbents by wall time, so those runs only resume close to the original). A finished
+run deletes its checkpoint. A cancelled run keeps it, so a re-run of the same job
+picks up where the cancelled one stopped.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# EvalInfo fields in column order of the stored evaluation arrays.
+EVAL_FIELDS = ("V", "f", "placed", "H_max", "D_max", "eval_time")
+
+
+def evals_to_array(E: List[Any]) -> np.ndarray:
+    return np.array([[getattr(e, k) for k in EVAL_FIELDS] for e in E], dtype=float).reshape(len(E), len(EVAL_FIELDS))
+
+
+def evals_from_array(A: np.ndarray) -> List[Any]:
+    from .de import EvalInfo
+
+    return [EvalInfo(V=float(a[0]), f=float(a[1]), placed=int(a[2]), H_max=float(a[3]), D_max=float(a[4]),
+                     eval_time=float(a[5])) for a in np.atleast_2d(A)]
+
+
+def _to_json(state) -> str:
+    # random.Random.getstate() nests tuples; JSON turns them into lists (see _py_state).
+    return json.dumps(state)
+
+
+def _py_state(s):
+    return tuple(_py_state(v) for v in s) if isinstance(s, list) else s
+
+
+class Checkpoint:
+    """Checkpoint file of one run; `every` is the minimum wall time between two saves."""
+
+    def __init__(self, path, every: float = 60.0):
+        self.path = Path(path)
+        self.every = float(every)
+        self._last = time.time()
+        self.n_saved = 0
+
+    def due(self) -> bool:
+        return time.time() - self._last >= self.every
+
+    def member(self, k: int) -> "Checkpoint":
+        """Checkpoint of member k of a portfolio (file <stem>_m<k><suffix> next to this one)."""
+        return Checkpoint(self.path.with_name(f"{self.path.stem}_m{k}{self.path.suffix}"), self.every)
+
+    def save(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray], np_rng: Optional[np.random.Generator] = None,
+             py_rng=None) -> None:
+        """Write `arrays` plus JSON `meta` and the RNG states atomically.
+
+        `py_rng` is a random.Random or a list of them (one per chain).
+        """
+        meta = dict(meta)
+        if np_rng is not None:
+            meta["np_rng"] = np_rng.bit_generator.state
+        if py_rng is not None:
+            meta["py_rng"] = [r.getstate() for r in py_rng] if isinstance(py_rng, list) else py_rng.getstate()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:  # a file object keeps np.savez from appending ".npz"
+            np.savez_compressed(f, meta=np.array(_to_json(meta)), **arrays)
+        os.replace(tmp, self.path)
+        self._last = time.time()
+        self.n_saved += 1
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Stored state (arrays by name, "meta" as a dict), or None without a checkpoint file."""
+        if not self.path.exists():
+            return None
+        with np.load(self.path, allow_pickle=False) as z:
+            state = {k: z[k] for k in z.files if k != "meta"}
+            state["meta"] = json.loads(str(z["meta"]))
+        return state
+
+    def restore_rngs(self, meta: Dict[str, Any], np_rng: Optional[np.random.Generator] = None, py_rng=None) -> None:
+        if np_rng is not None:
+            np_rng.bit_generator.state = meta["np_rng"]
+        if isinstance(py_rng, list):
+            for r, st in zip(py_rng, meta["py_rng"]):
+                r.setstate(_py_state(st))
+        elif py_rng is not None:
+            py_rng.setstate(_py_state(meta["py_rng"]))
+
+    @staticmethod
+    def check(meta: Dict[str, Any], **expected) -> None:
+        """Raise ValueError if the checkpoint belongs to a different run configuration."""
+        bad = {k: (meta.get(k), v) for k, v in expected.items() if meta.get(k) != v}
+        if bad:
+            raise ValueError(f"Checkpoint does not match this run (stored vs requested): {bad}")
+
+    def finish(self, stop: str) -> None:
+        """End of run: keep the file after a cancel (to resume), delete it otherwise."""
+        if stop != "cancelled" and self.path.exists():
+            self.path.unlink()
@@ -1,13 +1,19 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import os
 import time
 import random
 import math
 import numpy as np
 
 from .instance import Instance
-from .decoder import decode_wall_heightmap
+from .decoder import DecodeResult, decode_wall_heightmap
 from .local_search import perm_from_keys, rplan_from_okeys, local_search_step, reencode_from_perm_and_r
+from .surrogate import RidgeSurrogate, ScreenStats
+from .anytime import CancelToken, RunControl, StopRun, drain
+from .checkpoint import Checkpoint, evals_from_array, evals_to_array
+from .genotype import Genotype
 
 @dataclass
 class EvalInfo:
@@ -25,17 +31,62 @@ def reflect01(x: np.ndarray) -> np.ndarray:
         y = np.where(y > 1.0, 2.0 - y, y)
     return np.clip(y, 0.0, 1.0)
 
-def evaluate(inst: Instance, x: np.ndarray, eps_P=1e-4, eps_H=1e-6, eps_D=1e-6) -> EvalInfo:
-    n = len(inst.items)
+# Set RK_ADELS_VALIDATE=1 to re-decode and check every new incumbent of the optimizers with
+# rk_adels.validate (meant for tests and debugging new decoder backends).
+VALIDATE_INCUMBENTS = os.environ.get("RK_ADELS_VALIDATE", "") not in ("", "0")
+
+# Set while a rk_adels.resources.ResourceMeter samples decoder allocations.
+ALLOC_SAMPLER = None
+
+# Decoder seconds spent by `evaluate` in this process (read by rk_adels.metrics).
+DECODE_SECONDS = 0.0
+
+def _keys_to_plan(x: np.ndarray, n: int):
     k = x[:n]
     o = x[n:]
     perm = list(np.argsort(k, kind="mergesort"))
     r_plan = (np.floor(6.0 * np.clip(o, 0.0, 1.0 - 1e-12))).astype(int) + 1
     r_plan = np.clip(r_plan, 1, 6).tolist()
+    return perm, r_plan
+
+# A decoder is any callable with the signature of decode_wall_heightmap(inst, order, r_plan,
+# eps_P, eps_H, eps_D) -> DecodeResult (e.g. rk_adels.sections.SectionDecoder); None = full decode.
+Decoder = Callable[..., DecodeResult]
+
+# `genotype` (rk_adels.genotype.Genotype) selects the compact layout of x; None = 2n keys.
+
+def _plan(inst: Instance, x: np.ndarray, genotype: Optional[Genotype] = None):
+    return genotype.plan(x) if genotype is not None else _keys_to_plan(x, inst.n)
+
+def decode_x(inst: Instance, x: np.ndarray, eps_P=1e-4, eps_H=1e-6, eps_D=1e-6, decoder: Optional[Decoder] = None,
+             genotype: Optional[Genotype] = None) -> DecodeResult:
+    """Full decode (with placements) of a random-key vector, as scored by `evaluate`."""
+    perm, r_plan = _plan(inst, x, genotype)
+    return (decoder or decode_wall_heightmap)(inst, perm, r_plan, eps_P=eps_P, eps_H=eps_H, eps_D=eps_D)
+
+def _incumbent_check(inst: Instance, decoder: Optional[Decoder] = None, genotype: Optional[Genotype] = None):
+    """RunControl `check` validating each new incumbent (None unless RK_ADELS_VALIDATE is set)."""
+    if not VALIDATE_INCUMBENTS:
+        return None
+    from .validate import validate_packing
+
+    def check(x: np.ndarray) -> None:
+        validate_packing(inst, decode_x(inst, x, decoder=decoder, genotype=genotype)).raise_if_invalid()
+    return check
+
+def evaluate(inst: Instance, x: np.ndarray, eps_P=1e-4, eps_H=1e-6, eps_D=1e-6, decoder: Optional[Decoder] = None,
+             genotype: Optional[Genotype] = None) -> EvalInfo:
+    perm, r_plan = _plan(inst, x, genotype)
 
     t0 = time.time()
-    res = decode_wall_heightmap(inst, perm, r_plan, eps_P=eps_P, eps_H=eps_H, eps_D=eps_D)
+    dec = decoder or decode_wall_heightmap
+    if ALLOC_SAMPLER is not None:
+        res = ALLOC_SAMPLER.decode(dec, inst, perm, r_plan, eps_P=eps_P, eps_H=eps_H, eps_D=eps_D)
+    else:
+        res = dec(inst, perm, r_plan, eps_P=eps_P, eps_H=eps_H, eps_D=eps_D)
     t1 = time.time()
+    global DECODE_SECONDS
+    DECODE_SECONDS += t1 - t0
     return EvalInfo(V=res.V, f=res.f, placed=res.placed_count, H_max=res.H_max, D_max=res.D_max, eval_time=t1-t0)
 
 @dataclass
@@ -44,39 +95,100 @@ class DEResult:
     best_eval: EvalInfo
     n_evals: int
     seconds: float
-
-def run_decoder_only(inst: Instance, seconds: float, seed: int) -> DEResult:
+    stats: Optional[Dict[str, Any]] = None  # optional per-run extras (e.g. surrogate screening)
+    stop: str = "budget"  # "budget", "cancelled", "target" or "bound" (rk_adels.bounds)
+
+# Each optimizer is a generator iter_* (see rk_adels.anytime) yielding a Progress after
+# every evaluation; run_* drains it. `cancel` (CancelToken) and `target_V` stop it early,
+# as does reaching the instance's upper bound on V (rk_adels.bounds), and `decoder`
+# replaces the full decode (see Decoder above).
+
+def _result(ctl: RunControl, stats: Optional[Dict[str, Any]] = None) -> DEResult:
+    return DEResult(best_x=ctl.best_x, best_eval=ctl.best_eval, n_evals=ctl.n_evals,
+                    seconds=ctl.elapsed(), stats=stats, stop=ctl.stop)
+
+def _resume(checkpoint: Checkpoint, state: Dict[str, Any], config: Dict[str, Any], ctl: RunControl,
+            np_rng: Optional[np.random.Generator] = None, py_rng=None) -> Dict[str, Any]:
+    """Check a loaded checkpoint against `config`, restore the RNGs and charge the budget
+    it had used; returns its meta."""
+    meta = state["meta"]
+    Checkpoint.check(meta, **config)
+    checkpoint.restore_rngs(meta, np_rng, py_rng)
+    ctl.start_budget()
+    ctl.charge(meta["elapsed"])
+    return meta
+
+def _eval_population(inst: Instance, X: np.ndarray, ctl: RunControl, n_evals: int, eps_P=1e-4, eps_H=1e-6, eps_D=1e-6,
+                     decoder: Optional[Decoder] = None, genotype: Optional[Genotype] = None):
+    """Evaluate the rows of X in order, reporting the running best; returns their EvalInfos."""
+    E = []
+    best = None
+    for i in range(len(X)):
+        e = evaluate(inst, X[i], eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+        E.append(e)
+        improved = best is None or e.f > best.f
+        if improved:
+            best, best_x = e, X[i].copy()
+        yield from ctl.step(n_evals + i + 1, best_x, best, improved)
+    return E
+
+def iter_decoder_only(inst: Instance, seconds: float, seed: int,
+                      decoder: Optional[Decoder] = None,
+                      genotype: Optional[Genotype] = None,
+                      cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+                      checkpoint: Optional[Checkpoint] = None):
     rng = random.Random(seed)
-    n = len(inst.items)
+    n = inst.n
 
-    volumes = [(i, inst.items[i].w*inst.items[i].h*inst.items[i].d) for i in range(n)]
-    perm_vol = [i for i,_ in sorted(volumes, key=lambda t: -t[1])]
+    volumes = [t.w*t.h*t.d for t in inst.types for _ in range(int(t.q))]
+    perm_vol = sorted(range(n), key=lambda i: -volumes[i])
 
     def rand_rplan():
         return [rng.randrange(1,7) for _ in range(n)]
 
-    start = time.time()
-    best_x = None
-    best_eval = None
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
     n_evals = 0
+    config = dict(algorithm="decoder_only", instance=inst.name, seed=seed, dim=genotype.dim if genotype is not None else 2*n)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, py_rng=rng)
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+        else:
+            x0 = _encode(n, perm_vol, rand_rplan(), genotype)
+            e0 = evaluate(inst, x0, decoder=decoder, genotype=genotype)
+            best_x, best_eval = x0, e0
+            n_evals += 1
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+
+        while not ctl.expired():
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(dict(config, n_evals=n_evals, elapsed=ctl.elapsed()),
+                                dict(best_x=best_x, best_E=evals_to_array([best_eval])), py_rng=rng)
 
-    x0 = reencode_from_perm_and_r(n, perm_vol, rand_rplan())
-    e0 = evaluate(inst, x0)
-    best_x, best_eval = x0, e0
-    n_evals += 1
+            perm = list(range(n))
+            rng.shuffle(perm)
+            x = _encode(n, perm, rand_rplan(), genotype)
+            ev = evaluate(inst, x, decoder=decoder, genotype=genotype)
+            n_evals += 1
+            improved = ev.f > best_eval.f
+            if improved:
+                best_x, best_eval = x, ev
+            yield from ctl.step(n_evals, best_x, best_eval, improved)
+    except StopRun:
+        pass
 
-    while time.time() - start < seconds:
-        perm = list(range(n))
-        rng.shuffle(perm)
-        x = reencode_from_perm_and_r(n, perm, rand_rplan())
-        ev = evaluate(inst, x)
-        n_evals += 1
-        if ev.f > best_eval.f:
-            best_x, best_eval = x, ev
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
 
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time()-start)
+def run_decoder_only(inst: Instance, seconds: float, seed: int, **kw) -> DEResult:
+    return drain(iter_decoder_only(inst, seconds, seed, **kw))
 
-def run_rk_de(
+def iter_rk_de(
     inst: Instance,
     seconds: float,
     seed: int,
@@ -84,49 +196,121 @@ def run_rk_de(
     F: float = 0.5,
     CR: float = 0.9,
     eps_P=1e-4, eps_H=1e-6, eps_D=1e-6,
-) -> DEResult:
+    decoder: Optional[Decoder] = None,
+    genotype: Optional[Genotype] = None,
+    cancel: Optional[CancelToken] = None,
+    target_V: Optional[float] = None,
+    checkpoint: Optional[Checkpoint] = None,
+):
     rng = np.random.default_rng(seed)
-    n = len(inst.items)
-    dim = 2*n
-
-    X = rng.random((NP, dim))
-    E = [evaluate(inst, X[i], eps_P, eps_H, eps_D) for i in range(NP)]
-    n_evals = NP
-
-    best_idx = int(np.argmax([e.f for e in E]))
-    best_x = X[best_idx].copy()
-    best_eval = E[best_idx]
-
-    start = time.time()
-
-    while time.time() - start < seconds:
-        for i in range(NP):
-            if time.time() - start >= seconds:
-                break
-            idxs = list(range(NP))
-            idxs.remove(i)
-            r0, r1, r2 = rng.choice(idxs, size=3, replace=False)
-            v = X[r0] + F*(X[r1] - X[r2])
-            v = reflect01(v)
-
-            j_rand = int(rng.integers(0, dim))
-            cross_mask = rng.random(dim) < CR
-            cross_mask[j_rand] = True
-            u = np.where(cross_mask, v, X[i])
-            u = reflect01(u)
-
-            eu = evaluate(inst, u, eps_P, eps_H, eps_D)
+    n = inst.n
+    dim = genotype.dim if genotype is not None else 2*n
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
+    config = dict(algorithm="rk_de", instance=inst.name, seed=seed, NP=NP, dim=dim)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, rng)
+            X, E = state["X"], evals_from_array(state["E"])
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+        else:
+            X = rng.random((NP, dim))
+            E = yield from _eval_population(inst, X, ctl, 0, eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+            n_evals = NP
+
+            best_idx = int(np.argmax([e.f for e in E]))
+            best_x = X[best_idx].copy()
+            best_eval = E[best_idx]
+
+            ctl.start_budget()  # the initial population is not charged to the budget
+
+        while not ctl.expired():
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(dict(config, n_evals=n_evals, elapsed=ctl.elapsed()),
+                                dict(X=X, E=evals_to_array(E), best_x=best_x, best_E=evals_to_array([best_eval])), rng)
+
+            for i in range(NP):
+                if ctl.expired():
+                    break
+                idxs = list(range(NP))
+                idxs.remove(i)
+                r0, r1, r2 = rng.choice(idxs, size=3, replace=False)
+                v = X[r0] + F*(X[r1] - X[r2])
+                v = reflect01(v)
+
+                j_rand = int(rng.integers(0, dim))
+                cross_mask = rng.random(dim) < CR
+                cross_mask[j_rand] = True
+                u = np.where(cross_mask, v, X[i])
+                u = reflect01(u)
+
+                eu = evaluate(inst, u, eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+                n_evals += 1
+                improved = False
+                if eu.f >= E[i].f:
+                    X[i] = u
+                    E[i] = eu
+                    if eu.f > best_eval.f:
+                        best_eval = eu
+                        best_x = u.copy()
+                        improved = True
+                yield from ctl.step(n_evals, best_x, best_eval, improved)
+    except StopRun:
+        pass
+
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
+
+def run_rk_de(inst: Instance, seconds: float, seed: int, NP: int = 50, **kw) -> DEResult:
+    """Blocking RK-DE; keyword arguments as for iter_rk_de."""
+    return drain(iter_rk_de(inst, seconds, seed, NP=NP, **kw))
+
+def _local_search_phase(inst: Instance, X: np.ndarray, E: list, ctl: RunControl, n_evals: int,
+                        best_x: np.ndarray, best_eval: EvalInfo, py_rng: random.Random,
+                        ls_frac: float, ls_moves: int, eps_P=1e-4, eps_H=1e-6, eps_D=1e-6,
+                        decoder: Optional[Decoder] = None, genotype: Optional[Genotype] = None):
+    """First-improvement moves (rk_adels.local_search) on the top `ls_frac` of the population,
+    updating X and E in place; returns (n_evals, best_x, best_eval)."""
+    n = inst.n
+    scores = np.array([e.f for e in E])
+    K = max(1, int(math.ceil(ls_frac * len(E))))
+    top_idx = scores.argsort()[::-1][:K]
+    for idx in top_idx:
+        if ctl.expired():
+            break
+        x = X[idx]
+        ev = E[idx]
+
+        if genotype is not None:
+            perm, r_plan = genotype.plan(x)
+        else:
+            perm = perm_from_keys(x[:n])
+            r_plan = rplan_from_okeys(x[n:])
+
+        for _ in range(ls_moves):
+            perm2, r2 = local_search_step(perm, r_plan, py_rng, _arity(genotype))
+            x2 = _encode(n, perm2, r2, genotype)
+            ev2 = evaluate(inst, x2, eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
             n_evals += 1
-            if eu.f >= E[i].f:
-                X[i] = u
-                E[i] = eu
-                if eu.f > best_eval.f:
-                    best_eval = eu
-                    best_x = u.copy()
-
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time()-start)
-
-def run_rk_ade(
+            improved = False
+            if ev2.f > ev.f:
+                perm, r_plan = perm2, r2
+                x, ev = x2, ev2
+                if ev.f > best_eval.f:
+                    best_eval = ev
+                    best_x = x.copy()
+                    improved = True
+            yield from ctl.step(n_evals, best_x, best_eval, improved)
+
+        X[idx] = x
+        E[idx] = ev
+    return n_evals, best_x, best_eval
+
+def iter_rk_ade(
     inst: Instance,
     seconds: float,
     seed: int,
@@ -140,34 +324,63 @@ def run_rk_ade(
     use_local_search: bool = False,
     ls_frac: float = 0.1,
     ls_moves: int = 30,
-) -> DEResult:
+    surrogate_frac: Optional[float] = None,
+    decoder: Optional[Decoder] = None,
+    genotype: Optional[Genotype] = None,
+    cancel: Optional[CancelToken] = None,
+    target_V: Optional[float] = None,
+    checkpoint: Optional[Checkpoint] = None,
+):
+    """RK-ADE (jDE-style F_i/CR_i, current-to-pbest/1) with optional local search.
+
+    With `surrogate_frac` in (0, 1), a ridge surrogate (rk_adels.surrogate) is trained on
+    every decode; once warm, each generation builds all NP trials, ranks them by predicted
+    f and decodes only the top fraction (the other parents survive unchanged).
+
+    With a `checkpoint` (rk_adels.checkpoint) the state is saved at generation boundaries,
+    and the run resumes from the checkpoint file if it already exists.
+    """
     rng = np.random.default_rng(seed)
     py_rng = random.Random(seed + 99991)
-    n = len(inst.items)
-    dim = 2*n
-
-    X = rng.random((NP, dim))
-    F_i = rng.uniform(F_l, F_u, size=NP)
-    CR_i = rng.random(NP)
-
-    E = [evaluate(inst, X[i], eps_P, eps_H, eps_D) for i in range(NP)]
-    n_evals = NP
-
-    best_idx = int(np.argmax([e.f for e in E]))
-    best_x = X[best_idx].copy()
-    best_eval = E[best_idx]
-
-    start = time.time()
-
-    while time.time() - start < seconds:
-        scores = np.array([e.f for e in E])
-        elite_k = max(2, int(math.ceil(p * NP)))
-        elite_idx = scores.argsort()[::-1][:elite_k]
-
-        for i in range(NP):
-            if time.time() - start >= seconds:
-                break
-
+    n = inst.n
+    dim = genotype.dim if genotype is not None else 2*n
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
+
+    surr = RidgeSurrogate(inst, genotype) if surrogate_frac is not None else None
+    screen = ScreenStats() if surr is not None else None
+    config = dict(algorithm="rk_ade", instance=inst.name, seed=seed, NP=NP, dim=dim,
+                  use_local_search=use_local_search, surrogate_frac=surrogate_frac)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, rng, py_rng)
+            X, F_i, CR_i = state["X"], state["F_i"], state["CR_i"]
+            E = evals_from_array(state["E"])
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+            if surr is not None:
+                surr.set_state(state, meta)
+                screen.set_state(meta["screen"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+        else:
+            X = rng.random((NP, dim))
+            F_i = rng.uniform(F_l, F_u, size=NP)
+            CR_i = rng.random(NP)
+
+            E = yield from _eval_population(inst, X, ctl, 0, eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+            n_evals = NP
+
+            best_idx = int(np.argmax([e.f for e in E]))
+            best_x = X[best_idx].copy()
+            best_eval = E[best_idx]
+
+            if surr is not None:
+                surr.add(X, [e.f for e in E])
+
+            ctl.start_budget()  # the initial population is not charged to the budget
+
+        def make_trial(i: int, elite_idx) -> np.ndarray:
             if rng.random() < tau1:
                 F_i[i] = float(F_l + rng.random()*(F_u - F_l))
             if rng.random() < tau2:
@@ -186,46 +399,246 @@ def run_rk_ade(
             cross_mask = rng.random(dim) < float(CR_i[i])
             cross_mask[j_rand] = True
             u = np.where(cross_mask, v, X[i])
-            u = reflect01(u)
+            return reflect01(u)
+
+        while not ctl.expired():
+            if checkpoint is not None and checkpoint.due():
+                arrays = dict(X=X, F_i=F_i, CR_i=CR_i, E=evals_to_array(E), best_x=best_x,
+                              best_E=evals_to_array([best_eval]))
+                meta = dict(config, n_evals=n_evals, elapsed=ctl.elapsed())
+                if surr is not None:
+                    arrays.update(surr.get_state())
+                    meta.update(surr_samples=surr.n_samples, screen=screen.get_state())
+                checkpoint.save(meta, arrays, rng, py_rng)
+
+            inj = ctl.take_injected(best_eval.f)
+            if inj is not None:  # replace the worst member by the offered incumbent
+                worst = int(np.argmin([e.f for e in E]))
+                X[worst], E[worst] = inj[0], inj[1]
+                best_x, best_eval = inj[0].copy(), inj[1]
 
-            eu = evaluate(inst, u, eps_P, eps_H, eps_D)
-            n_evals += 1
-            if eu.f >= E[i].f:
-                X[i] = u
-                E[i] = eu
-                if eu.f > best_eval.f:
-                    best_eval = eu
-                    best_x = u.copy()
-
-        if use_local_search:
             scores = np.array([e.f for e in E])
-            K = max(1, int(math.ceil(ls_frac * NP)))
-            top_idx = scores.argsort()[::-1][:K]
-            for idx in top_idx:
-                if time.time() - start >= seconds:
-                    break
-                x = X[idx]
-                ev = E[idx]
+            elite_k = max(2, int(math.ceil(p * NP)))
+            elite_idx = scores.argsort()[::-1][:elite_k]
+
+            if surr is not None and surr.ready:
+                U = np.array([make_trial(i, elite_idx) for i in range(NP)])
+                pred = surr.predict(U)
+                K = max(1, int(math.ceil(surrogate_frac * NP)))
+                chosen = sorted(np.argsort(-pred, kind="mergesort")[:K].tolist())
+                got, got_f = [], []
+                try:
+                    for i in chosen:
+                        if ctl.expired():
+                            break
+                        eu = evaluate(inst, U[i], eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+                        n_evals += 1
+                        got.append(i)
+                        got_f.append(eu.f)
+                        surr.add(U[i], eu.f)
+                        improved = False
+                        if eu.f >= E[i].f:
+                            X[i] = U[i]
+                            E[i] = eu
+                            if eu.f > best_eval.f:
+                                best_eval = eu
+                                best_x = U[i].copy()
+                                improved = True
+                        yield from ctl.step(n_evals, best_x, best_eval, improved)
+                finally:
+                    screen.record(NP, pred[got], got_f)
+            else:
+                for i in range(NP):
+                    if ctl.expired():
+                        break
 
-                perm = perm_from_keys(x[:n])
-                r_plan = rplan_from_okeys(x[n:])
+                    u = make_trial(i, elite_idx)
 
-                for _ in range(ls_moves):
-                    perm2, r2 = local_search_step(perm, r_plan, py_rng)
-                    x2 = reencode_from_perm_and_r(n, perm2, r2)
-                    ev2 = evaluate(inst, x2, eps_P, eps_H, eps_D)
+                    eu = evaluate(inst, u, eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
                     n_evals += 1
-                    if ev2.f > ev.f:
-                        perm, r_plan = perm2, r2
-                        x, ev = x2, ev2
-                        if ev.f > best_eval.f:
-                            best_eval = ev
-                            best_x = x.copy()
-
-                X[idx] = x
-                E[idx] = ev
-
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time()-start)
+                    if surr is not None:
+                        surr.add(u, eu.f)
+                    improved = False
+                    if eu.f >= E[i].f:
+                        X[i] = u
+                        E[i] = eu
+                        if eu.f > best_eval.f:
+                            best_eval = eu
+                            best_x = u.copy()
+                            improved = True
+                    yield from ctl.step(n_evals, best_x, best_eval, improved)
+
+            if use_local_search:
+                n_evals, best_x, best_eval = yield from _local_search_phase(
+                    inst, X, E, ctl, n_evals, best_x, best_eval, py_rng, ls_frac, ls_moves,
+                    eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+    except StopRun:
+        pass
+
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl, screen.as_dict() if screen is not None else None)
+
+def run_rk_ade(inst: Instance, seconds: float, seed: int, NP: int = 50, **kw) -> DEResult:
+    """Blocking RK-ADE; keyword arguments as for iter_rk_ade."""
+    return drain(iter_rk_ade(inst, seconds, seed, NP=NP, **kw))
+
+def iter_lshade(
+    inst: Instance,
+    seconds: float,
+    seed: int,
+    NP: int = 50,
+    NP_min: int = 4,
+    H: int = 6,
+    p: float = 0.11,
+    arc_rate: float = 2.6,
+    max_evals: Optional[int] = None,
+    eps_P=1e-4, eps_H=1e-6, eps_D=1e-6,
+    use_local_search: bool = False,
+    ls_frac: float = 0.1,
+    ls_moves: int = 30,
+    decoder: Optional[Decoder] = None,
+    genotype: Optional[Genotype] = None,
+    cancel: Optional[CancelToken] = None,
+    target_V: Optional[float] = None,
+    checkpoint: Optional[Checkpoint] = None,
+):
+    """L-SHADE (Tanabe and Fukunaga): success-history F/CR, archive-assisted
+    current-to-pbest/1 and linear population size reduction from NP to NP_min.
+
+    F and CR are sampled around one of H memory cells (Cauchy / normal, scale 0.1); after
+    each generation the next cell gets the improvement-weighted Lehmer mean of the
+    successful F and the weighted mean of the successful CR. Replaced parents go to an
+    archive of at most arc_rate * NP vectors that supplies the second difference vector.
+    The population shrinks linearly over `max_evals` evaluations, or over the time budget
+    when max_evals is None. `use_local_search` adds the RK-ADE local-search phase.
+    `checkpoint` saves and resumes the state as in iter_rk_ade.
+    """
+    rng = np.random.default_rng(seed)
+    py_rng = random.Random(seed + 99991)
+    dim = genotype.dim if genotype is not None else 2 * inst.n
+    NP_min = max(3, int(NP_min))  # current-to-pbest/1 needs i, r1 and r2 distinct
+    NP_init = max(int(NP), NP_min)
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
+
+    M_F = np.full(H, 0.5)
+    M_CR = np.full(H, 0.5)  # nan marks a terminal CR cell (CR = 0 from then on)
+    k_mem = 0
+    archive: list = []
+    config = dict(algorithm="lshade", instance=inst.name, seed=seed, NP=NP_init, NP_min=NP_min, H=H, dim=dim,
+                  max_evals=max_evals, use_local_search=use_local_search)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, rng, py_rng)
+            X, E = state["X"], evals_from_array(state["E"])
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            M_F, M_CR, k_mem = state["M_F"], state["M_CR"], int(meta["k_mem"])
+            archive = [a.copy() for a in state["archive"]]
+            n_evals = int(meta["n_evals"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+        else:
+            X = rng.random((NP_init, dim))
+            E = yield from _eval_population(inst, X, ctl, 0, eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+            n_evals = NP_init
+
+            best_idx = int(np.argmax([e.f for e in E]))
+            best_x = X[best_idx].copy()
+            best_eval = E[best_idx]
+
+            ctl.start_budget()  # the initial population is not charged to the budget
+
+        while not ctl.expired() and (max_evals is None or n_evals < max_evals):
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(dict(config, n_evals=n_evals, k_mem=k_mem, elapsed=ctl.elapsed()),
+                                dict(X=X, E=evals_to_array(E), best_x=best_x, best_E=evals_to_array([best_eval]),
+                                     M_F=M_F, M_CR=M_CR, archive=np.array(archive).reshape(len(archive), dim)),
+                                rng, py_rng)
+
+            NPg = len(E)
+            scores = np.array([e.f for e in E])
+            elite_k = max(2, int(round(p * NPg)))
+            elite_idx = scores.argsort()[::-1][:elite_k]
+            pool = np.vstack([X, np.array(archive)]) if archive else X
+
+            S_F, S_CR, S_w = [], [], []
+            U = np.empty_like(X)
+            Fs = np.empty(NPg)
+            CRs = np.empty(NPg)
+            for i in range(NPg):
+                r = int(rng.integers(0, H))
+                CRs[i] = 0.0 if np.isnan(M_CR[r]) else float(np.clip(rng.normal(M_CR[r], 0.1), 0.0, 1.0))
+                F = 0.0
+                while F <= 0.0:
+                    F = M_F[r] + 0.1 * math.tan(math.pi * (rng.random() - 0.5))
+                Fs[i] = min(F, 1.0)
+
+                pbest = int(rng.choice(elite_idx))
+                r1 = int(rng.integers(0, NPg - 1))
+                r1 += r1 >= i
+                r2 = int(rng.integers(0, len(pool)))
+                while r2 == i or r2 == r1:
+                    r2 = int(rng.integers(0, len(pool)))
+                v = reflect01(X[i] + Fs[i] * (X[pbest] - X[i]) + Fs[i] * (X[r1] - pool[r2]))
+
+                j_rand = int(rng.integers(0, dim))
+                cross_mask = rng.random(dim) < CRs[i]
+                cross_mask[j_rand] = True
+                U[i] = np.where(cross_mask, v, X[i])
+
+            for i in range(NPg):
+                if ctl.expired() or (max_evals is not None and n_evals >= max_evals):
+                    break
+                eu = evaluate(inst, U[i], eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+                n_evals += 1
+                improved = False
+                if eu.f >= E[i].f:
+                    if eu.f > E[i].f:
+                        archive.append(X[i].copy())
+                        S_F.append(Fs[i])
+                        S_CR.append(CRs[i])
+                        S_w.append(eu.f - E[i].f)
+                    X[i] = U[i]
+                    E[i] = eu
+                    if eu.f > best_eval.f:
+                        best_eval = eu
+                        best_x = U[i].copy()
+                        improved = True
+                yield from ctl.step(n_evals, best_x, best_eval, improved)
+
+            if S_F:
+                w = np.array(S_w) / sum(S_w)
+                sf, scr = np.array(S_F), np.array(S_CR)
+                M_F[k_mem] = float((w * sf**2).sum() / max((w * sf).sum(), 1e-12))
+                M_CR[k_mem] = np.nan if np.isnan(M_CR[k_mem]) or scr.max() == 0.0 else float((w * scr).sum())
+                k_mem = (k_mem + 1) % H
+
+            if use_local_search:
+                n_evals, best_x, best_eval = yield from _local_search_phase(
+                    inst, X, E, ctl, n_evals, best_x, best_eval, py_rng, ls_frac, ls_moves,
+                    eps_P, eps_H, eps_D, decoder=decoder, genotype=genotype)
+
+            # Linear population size reduction: drop the worst down to the planned size.
+            frac = n_evals / max_evals if max_evals is not None else ctl.elapsed() / max(ctl.seconds, 1e-9)
+            NP_next = max(NP_min, int(round(NP_init + (NP_min - NP_init) * min(1.0, frac))))
+            if NP_next < len(E):
+                keep = np.sort(np.argsort([-e.f for e in E], kind="mergesort")[:NP_next])
+                X = X[keep]
+                E = [E[j] for j in keep]
+            arc_max = int(round(arc_rate * len(E)))
+            while len(archive) > arc_max:
+                archive.pop(int(rng.integers(0, len(archive))))
+    except StopRun:
+        pass
+
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
+
+def run_lshade(inst: Instance, seconds: float, seed: int, NP: int = 50, **kw) -> DEResult:
+    """Blocking L-SHADE; keyword arguments as for iter_lshade."""
+    return drain(iter_lshade(inst, seconds, seed, NP=NP, **kw))
 
 # =========================================================
 # Additional baselines for comparison (matched-budget)
@@ -239,31 +652,67 @@ def _decode_perm_rplan(x: np.ndarray, n: int):
     r_plan = list(1 + np.minimum(5, np.floor(6 * o)).astype(int))
     return perm, r_plan
 
-def run_random_search(inst: Instance, *, seconds: float, seed: int, batch: int = 32) -> DEResult:
+def _move_plan(x: np.ndarray, n: int, genotype: Optional[Genotype] = None):
+    return genotype.plan(x) if genotype is not None else _decode_perm_rplan(x, n)
+
+def _encode(n: int, perm, r_plan, genotype: Optional[Genotype] = None) -> np.ndarray:
+    return genotype.encode(perm, r_plan) if genotype is not None else reencode_from_perm_and_r(n, perm, r_plan)
+
+def _arity(genotype: Optional[Genotype]):
+    return genotype.arity if genotype is not None else None
+
+def iter_random_search(inst: Instance, *, seconds: float, seed: int, batch: int = 32,
+                       decoder: Optional[Decoder] = None,
+                       genotype: Optional[Genotype] = None,
+                       cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+                       checkpoint: Optional[Checkpoint] = None):
     """Pure random search in the same random-key space (anytime)."""
     rng = np.random.default_rng(seed)
-    dim = 2 * inst.n
-    start = time.time()
+    dim = genotype.dim if genotype is not None else 2 * inst.n
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
     best_x = None
     best_eval = None
     n_evals = 0
-
-    while time.time() - start < seconds:
-        X = rng.random((batch, dim))
-        for i in range(batch):
-            ev = evaluate(inst, X[i])
+    config = dict(algorithm="random_search", instance=inst.name, seed=seed, batch=batch, dim=dim)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, rng)
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+
+        while not ctl.expired():
+            if checkpoint is not None and best_eval is not None and checkpoint.due():
+                checkpoint.save(dict(config, n_evals=n_evals, elapsed=ctl.elapsed()),
+                                dict(best_x=best_x, best_E=evals_to_array([best_eval])), rng)
+
+            X = rng.random((batch, dim))
+            for i in range(batch):
+                ev = evaluate(inst, X[i], decoder=decoder, genotype=genotype)
+                n_evals += 1
+                improved = (best_eval is None) or (ev.f > best_eval.f)
+                if improved:
+                    best_eval = ev
+                    best_x = X[i].copy()
+                yield from ctl.step(n_evals, best_x, best_eval, improved)
+
+        if best_eval is None:
+            # fall back to a single evaluation (should not happen)
+            best_x = rng.random(dim)
+            best_eval = evaluate(inst, best_x, decoder=decoder, genotype=genotype)
             n_evals += 1
-            if (best_eval is None) or (ev.f > best_eval.f):
-                best_eval = ev
-                best_x = X[i].copy()
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+    except StopRun:
+        pass
 
-    if best_eval is None:
-        # fall back to a single evaluation (should not happen)
-        best_x = rng.random(dim)
-        best_eval = evaluate(inst, best_x)
-        n_evals += 1
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
 
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time() - start)
+def run_random_search(inst: Instance, *, seconds: float, seed: int, **kw) -> DEResult:
+    return drain(iter_random_search(inst, seconds=seconds, seed=seed, **kw))
 
 def _reflect01(x: np.ndarray) -> np.ndarray:
     x = np.asarray(x, dtype=float)
@@ -271,21 +720,27 @@ def _reflect01(x: np.ndarray) -> np.ndarray:
     x = np.where(x > 1.0, 2.0 - x, x)
     return np.clip(x, 0.0, 1.0)
 
-def run_ga(inst: Instance, *, seconds: float, seed: int, NP: int = 50,
-           cx_rate: float = 0.9, mut_rate: float = 0.05, sigma: float = 0.1,
-           tourn_k: int = 3) -> DEResult:
-    """Simple GA baseline operating directly on random keys."""
+def iter_ga(inst: Instance, *, seconds: float, seed: int, NP: int = 50,
+            cx_rate: float = 0.9, mut_rate: float = 0.05, sigma: float = 0.1,
+            tourn_k: int = 3, surrogate_frac: Optional[float] = None,
+            decoder: Optional[Decoder] = None,
+            genotype: Optional[Genotype] = None,
+            cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+            checkpoint: Optional[Checkpoint] = None):
+    """Simple GA baseline operating directly on random keys.
+
+    With `surrogate_frac`, children are ranked by a ridge surrogate once it is warm and only
+    the top fraction is decoded; the remaining slots keep their first parent (and its fitness).
+    `checkpoint` saves and resumes the state as in iter_rk_ade.
+    """
     rng = np.random.default_rng(seed)
-    dim = 2 * inst.n
-    start = time.time()
-
-    pop = rng.random((NP, dim))
-    E = [evaluate(inst, pop[i]) for i in range(NP)]
-    n_evals = NP
+    dim = genotype.dim if genotype is not None else 2 * inst.n
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
 
-    best_idx = int(np.argmax([e.f for e in E]))
-    best_x = pop[best_idx].copy()
-    best_eval = E[best_idx]
+    surr = RidgeSurrogate(inst, genotype) if surrogate_frac is not None else None
+    screen = ScreenStats() if surr is not None else None
+    config = dict(algorithm="ga", instance=inst.name, seed=seed, NP=NP, dim=dim, surrogate_frac=surrogate_frac)
+    state = checkpoint.load() if checkpoint is not None else None
 
     def tournament() -> int:
         idx = rng.integers(0, NP, size=tourn_k)
@@ -297,81 +752,340 @@ def run_ga(inst: Instance, *, seconds: float, seed: int, NP: int = 50,
                 bf = E[j].f
         return best
 
-    while time.time() - start < seconds:
-        # elitism
-        elite = best_x.copy()
-        new_pop = [elite]
-
-        while len(new_pop) < NP:
-            p1 = pop[tournament()]
-            p2 = pop[tournament()]
-
-            if rng.random() < cx_rate:
-                alpha = rng.random(dim)
-                child = alpha * p1 + (1.0 - alpha) * p2
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, rng)
+            pop, E = state["pop"], evals_from_array(state["E"])
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+            if surr is not None:
+                surr.set_state(state, meta)
+                screen.set_state(meta["screen"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+        else:
+            pop = rng.random((NP, dim))
+            E = yield from _eval_population(inst, pop, ctl, 0, decoder=decoder, genotype=genotype)
+            n_evals = NP
+
+            best_idx = int(np.argmax([e.f for e in E]))
+            best_x = pop[best_idx].copy()
+            best_eval = E[best_idx]
+
+            if surr is not None:
+                surr.add(pop, [e.f for e in E])
+
+        while not ctl.expired():
+            if checkpoint is not None and checkpoint.due():
+                arrays = dict(pop=pop, E=evals_to_array(E), best_x=best_x, best_E=evals_to_array([best_eval]))
+                meta = dict(config, n_evals=n_evals, elapsed=ctl.elapsed())
+                if surr is not None:
+                    arrays.update(surr.get_state())
+                    meta.update(surr_samples=surr.n_samples, screen=screen.get_state())
+                checkpoint.save(meta, arrays, rng)
+
+            inj = ctl.take_injected(best_eval.f)
+            if inj is not None:  # an offered incumbent becomes the elite
+                best_x, best_eval = inj[0].copy(), inj[1]
+
+            # elitism
+            elite = best_x.copy()
+            new_pop = [elite]
+            parents = [-1]
+
+            while len(new_pop) < NP:
+                i1 = tournament()
+                p1 = pop[i1]
+                p2 = pop[tournament()]
+
+                if rng.random() < cx_rate:
+                    alpha = rng.random(dim)
+                    child = alpha * p1 + (1.0 - alpha) * p2
+                else:
+                    child = p1.copy()
+
+                mask = rng.random(dim) < mut_rate
+                if np.any(mask):
+                    child = child.copy()
+                    child[mask] += rng.normal(0.0, sigma, size=mask.sum())
+
+                child = _reflect01(child)
+                new_pop.append(child)
+                parents.append(int(i1))
+
+            if surr is not None and surr.ready:
+                children = np.array(new_pop[1:])
+                pred = surr.predict(children)
+                K = max(1, int(math.ceil(surrogate_frac * len(children))))
+                chosen = set(np.argsort(-pred, kind="mergesort")[:K].tolist())
+                new_E = [best_eval]
+                got, got_f = [], []
+                try:
+                    for c in range(len(children)):
+                        if c in chosen:
+                            ev = evaluate(inst, children[c], decoder=decoder, genotype=genotype)
+                            n_evals += 1
+                            surr.add(children[c], ev.f)
+                            got.append(c)
+                            got_f.append(ev.f)
+                            new_E.append(ev)
+                            improved = ev.f > best_eval.f
+                            if improved:
+                                best_eval = ev
+                                best_x = children[c].copy()
+                            yield from ctl.step(n_evals, best_x, best_eval, improved)
+                        else:
+                            new_pop[c + 1] = pop[parents[c + 1]].copy()
+                            new_E.append(E[parents[c + 1]])
+                finally:
+                    screen.record(len(children), pred[got], got_f)
+                pop = np.array(new_pop)
+                E = new_E
             else:
-                child = p1.copy()
-
-            mask = rng.random(dim) < mut_rate
-            if np.any(mask):
-                child = child.copy()
-                child[mask] += rng.normal(0.0, sigma, size=mask.sum())
-
-            child = _reflect01(child)
-            new_pop.append(child)
-
-        pop = np.array(new_pop)
-        E = [evaluate(inst, pop[i]) for i in range(NP)]
-        n_evals += NP
-
-        idx = int(np.argmax([e.f for e in E]))
-        if E[idx].f > best_eval.f:
-            best_eval = E[idx]
-            best_x = pop[idx].copy()
-
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time() - start)
-
-def run_sa(inst: Instance, *, seconds: float, seed: int,
-           T0: float = 1e-2, Tend: float = 1e-4) -> DEResult:
+                pop = np.array(new_pop)
+                E = []
+                for i in range(NP):
+                    ev = evaluate(inst, pop[i], decoder=decoder, genotype=genotype)
+                    n_evals += 1
+                    E.append(ev)
+                    improved = ev.f > best_eval.f
+                    if improved:
+                        best_eval = ev
+                        best_x = pop[i].copy()
+                    yield from ctl.step(n_evals, best_x, best_eval, improved)
+                if surr is not None:
+                    surr.add(pop, [e.f for e in E])
+    except StopRun:
+        pass
+
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl, screen.as_dict() if screen is not None else None)
+
+def run_ga(inst: Instance, *, seconds: float, seed: int, NP: int = 50, **kw) -> DEResult:
+    """Blocking GA; keyword arguments as for iter_ga."""
+    return drain(iter_ga(inst, seconds=seconds, seed=seed, NP=NP, **kw))
+
+def iter_sa(inst: Instance, *, seconds: float, seed: int,
+            T0: float = 1e-2, Tend: float = 1e-4,
+            decoder: Optional[Decoder] = None,
+            genotype: Optional[Genotype] = None,
+            cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+            checkpoint: Optional[Checkpoint] = None):
     """Simulated annealing baseline in (perm, orientation) space with re-encoding."""
     np_rng = np.random.default_rng(seed)
     py_rng = random.Random(seed)
-    dim = 2 * inst.n
-    start = time.time()
-
-    x = np_rng.random(dim)
-    ev = evaluate(inst, x)
-    n_evals = 1
-
-    best_x = x.copy()
-    best_eval = ev
-
-    while True:
-        t = time.time() - start
-        if t >= seconds:
-            break
-
-        frac = min(1.0, t / max(seconds, 1e-9))
-        T = T0 * ((Tend / T0) ** frac)
-
-        perm, rplan = _decode_perm_rplan(x, inst.n)
-        perm2, rplan2 = local_search_step(perm, rplan, py_rng)
-        x2 = reencode_from_perm_and_r(inst.n, perm2, rplan2)
+    dim = genotype.dim if genotype is not None else 2 * inst.n
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
+    config = dict(algorithm="sa", instance=inst.name, seed=seed, dim=dim)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, np_rng, py_rng)
+            x, (ev,) = state["x"], evals_from_array(state["E"])
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+        else:
+            x = np_rng.random(dim)
+            ev = evaluate(inst, x, decoder=decoder, genotype=genotype)
+            n_evals = 1
+
+            best_x = x.copy()
+            best_eval = ev
+        yield from ctl.step(n_evals, best_x, best_eval, True)
+
+        while True:
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(dict(config, n_evals=n_evals, elapsed=ctl.elapsed()),
+                                dict(x=x, E=evals_to_array([ev]), best_x=best_x, best_E=evals_to_array([best_eval])),
+                                np_rng, py_rng)
+
+            t = ctl.elapsed()
+            if t >= seconds:
+                break
 
-        ev2 = evaluate(inst, x2)
-        n_evals += 1
+            frac = min(1.0, t / max(seconds, 1e-9))
+            T = T0 * ((Tend / T0) ** frac)
 
-        d = ev2.f - ev.f
-        if d >= 0.0 or (T > 0 and py_rng.random() < float(np.exp(d / T))):
-            x, ev = x2, ev2
-            if ev.f > best_eval.f:
-                best_eval = ev
-                best_x = x.copy()
+            inj = ctl.take_injected(best_eval.f)
+            if inj is not None:  # continue the chain from the offered incumbent
+                x, ev = inj[0].copy(), inj[1]
+                best_x, best_eval = inj[0].copy(), inj[1]
 
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time() - start)
+            perm, rplan = _move_plan(x, inst.n, genotype)
+            perm2, rplan2 = local_search_step(perm, rplan, py_rng, _arity(genotype))
+            x2 = _encode(inst.n, perm2, rplan2, genotype)
 
+            ev2 = evaluate(inst, x2, decoder=decoder, genotype=genotype)
+            n_evals += 1
 
-def run_pso(
+            improved = False
+            d = ev2.f - ev.f
+            if d >= 0.0 or (T > 0 and py_rng.random() < float(np.exp(d / T))):
+                x, ev = x2, ev2
+                if ev.f > best_eval.f:
+                    best_eval = ev
+                    best_x = x.copy()
+                    improved = True
+            yield from ctl.step(n_evals, best_x, best_eval, improved)
+    except StopRun:
+        pass
+
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
+
+def run_sa(inst: Instance, *, seconds: float, seed: int, **kw) -> DEResult:
+    return drain(iter_sa(inst, seconds=seconds, seed=seed, **kw))
+
+class _Replica:
+    """State of one parallel-tempering chain (picklable, so a worker process can advance it)."""
+
+    def __init__(self, x: np.ndarray, seed: int):
+        self.x = x
+        self.ev: Optional[EvalInfo] = None
+        self.best_x = x
+        self.best_ev: Optional[EvalInfo] = None
+        self.rng = random.Random(seed)
+
+def _pt_moves(inst: Instance, rep: _Replica, T: float, moves: int, decoder: Optional[Decoder] = None, genotype: Optional[Genotype] = None):
+    """Metropolis moves of one replica at temperature T; yields each evaluation."""
+    if rep.ev is None:
+        rep.ev = rep.best_ev = evaluate(inst, rep.x, decoder=decoder, genotype=genotype)
+        yield rep.ev
+    for _ in range(moves):
+        perm, rplan = _move_plan(rep.x, inst.n, genotype)
+        perm2, rplan2 = local_search_step(perm, rplan, rep.rng, _arity(genotype))
+        x2 = _encode(inst.n, perm2, rplan2, genotype)
+        ev2 = evaluate(inst, x2, decoder=decoder, genotype=genotype)
+        d = ev2.f - rep.ev.f
+        if d >= 0.0 or (T > 0 and rep.rng.random() < math.exp(d / T)):
+            rep.x, rep.ev = x2, ev2
+            if ev2.f > rep.best_ev.f:
+                rep.best_x, rep.best_ev = x2.copy(), ev2
+        yield ev2
+
+_PT_WORKER: Dict[str, Any] = {}
+
+def _pt_worker_init(inst: Instance, decoder: Optional[Decoder], genotype: Optional[Genotype] = None) -> None:
+    _PT_WORKER["inst"] = inst
+    _PT_WORKER["decoder"] = decoder
+    _PT_WORKER["genotype"] = genotype
+
+def _pt_worker_sweep(rep: _Replica, T: float, moves: int):
+    n = sum(1 for _ in _pt_moves(_PT_WORKER["inst"], rep, T, moves, _PT_WORKER["decoder"],
+                                    _PT_WORKER["genotype"]))
+    return rep, n
+
+def pt_ladder(M: int, T_min: float = 1e-4, T_max: float = 1e-2) -> List[float]:
+    """Geometric temperature ladder, coldest first."""
+    if M <= 1:
+        return [T_min]
+    return [T_min * (T_max / T_min) ** (m / (M - 1)) for m in range(M)]
+
+def iter_pt(inst: Instance, *, seconds: float, seed: int,
+            M: Optional[int] = None, T_min: float = 1e-4, T_max: float = 1e-2,
+            sweep: int = 10, workers: int = 0,
+            decoder: Optional[Decoder] = None,
+            genotype: Optional[Genotype] = None,
+            cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+            checkpoint: Optional[Checkpoint] = None):
+    """Parallel tempering: the SA moves of iter_sa on M replicas at fixed temperatures.
+
+    Every round each replica makes `sweep` Metropolis moves at its temperature, then
+    neighbouring temperatures (alternately even and odd pairs) swap states with the
+    replica-exchange acceptance min(1, exp((1/T_i - 1/T_j) (f_j - f_i))), and the coldest
+    replica takes over the global best if it has fallen behind it.
+
+    `workers` > 1 advances the replicas of a round in that many processes (M defaults to
+    max(4, workers)); results then arrive once per sweep instead of per evaluation. The
+    search itself is the same as in-process: every replica carries its own RNG.
+    `checkpoint` saves the replicas (with their RNG states) between rounds and resumes them.
+    """
+    M = max(2, int(M) if M else max(4, int(workers)))
+    temps = pt_ladder(M, T_min, T_max)
+    np_rng = np.random.default_rng(seed)
+    swap_rng = random.Random(seed)
+    dim = genotype.dim if genotype is not None else 2 * inst.n
+    reps = [_Replica(np_rng.random(dim), seed + 7919 * (m + 1)) for m in range(M)]
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=min(int(workers), M), initializer=_pt_worker_init,
+                                   initargs=(inst, decoder, genotype))
+    n_evals = 0
+    best_x, best_eval = None, None
+    rnd = 0
+    config = dict(algorithm="pt", instance=inst.name, seed=seed, M=M, temps=temps, sweep=sweep, dim=dim)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, np_rng)
+            evs, best_evs = evals_from_array(state["rep_E"]), evals_from_array(state["rep_best_E"])
+            for m, rep in enumerate(reps):
+                rep.x, rep.ev, rep.best_x, rep.best_ev = state["rep_x"][m], evs[m], state["rep_best_x"][m], best_evs[m]
+            checkpoint.restore_rngs(meta, py_rng=[swap_rng] + [rep.rng for rep in reps])
+            best_x, (best_eval,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals, rnd = int(meta["n_evals"]), int(meta["round"])
+            yield from ctl.step(n_evals, best_x, best_eval, True)
+
+        while not ctl.expired():
+            if checkpoint is not None and rnd > 0 and checkpoint.due():  # replicas are evaluated after round 0
+                checkpoint.save(dict(config, n_evals=n_evals, round=rnd, elapsed=ctl.elapsed()),
+                                dict(rep_x=np.array([rep.x for rep in reps]), rep_E=evals_to_array([rep.ev for rep in reps]),
+                                     rep_best_x=np.array([rep.best_x for rep in reps]),
+                                     rep_best_E=evals_to_array([rep.best_ev for rep in reps]),
+                                     best_x=best_x, best_E=evals_to_array([best_eval])),
+                                np_rng, [swap_rng] + [rep.rng for rep in reps])
+
+            if pool is not None:
+                done = list(pool.map(_pt_worker_sweep, reps, temps, [sweep] * M))
+                for m, (rep, k) in enumerate(done):
+                    reps[m] = rep
+                    n_evals += k
+                    improved = best_eval is None or rep.best_ev.f > best_eval.f
+                    if improved:
+                        best_x, best_eval = rep.best_x.copy(), rep.best_ev
+                    yield from ctl.step(n_evals, best_x, best_eval, improved)
+            else:
+                for m, rep in enumerate(reps):
+                    for ev in _pt_moves(inst, rep, temps[m], sweep, decoder, genotype):
+                        n_evals += 1
+                        improved = best_eval is None or ev.f > best_eval.f
+                        if improved:
+                            best_x, best_eval = rep.best_x.copy(), rep.best_ev
+                        yield from ctl.step(n_evals, best_x, best_eval, improved)
+                        if ctl.expired():
+                            raise StopRun
+
+            # Replica exchange between neighbouring temperatures.
+            for m in range(rnd % 2, M - 1, 2):
+                a, b = reps[m], reps[m + 1]
+                arg = (1.0 / temps[m] - 1.0 / temps[m + 1]) * (b.ev.f - a.ev.f)
+                if arg >= 0.0 or swap_rng.random() < math.exp(arg):
+                    reps[m], reps[m + 1] = b, a
+            cold = reps[0]
+            if best_eval is not None and best_eval.f > cold.ev.f:
+                cold.x, cold.ev = best_x.copy(), best_eval
+            rnd += 1
+    except StopRun:
+        pass
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
+
+def run_pt(inst: Instance, *, seconds: float, seed: int, **kw) -> DEResult:
+    """Blocking parallel tempering; keyword arguments as for iter_pt."""
+    return drain(iter_pt(inst, seconds=seconds, seed=seed, **kw))
+
+
+def iter_pso(
     inst: Instance,
     *,
     seconds: float,
@@ -381,7 +1095,12 @@ def run_pso(
     c1: float = 1.49,
     c2: float = 1.49,
     vmax: float = 0.2,
-) -> DEResult:
+    decoder: Optional[Decoder] = None,
+    genotype: Optional[Genotype] = None,
+    cancel: Optional[CancelToken] = None,
+    target_V: Optional[float] = None,
+    checkpoint: Optional[Checkpoint] = None,
+):
     """Particle Swarm Optimization baseline in random-key space.
 
     Notes
@@ -389,61 +1108,95 @@ def run_pso(
     - Operates directly on the same [0,1]^{2n} encoding used by RK-ADELS.
     - Bound handling uses reflection (same helper as DE).
     - Fitness is the utilization-dominant score f (Eq. 5 / Algorithm 1).
+    - `checkpoint` saves and resumes the swarm as in iter_rk_ade.
     """
     rng = np.random.default_rng(seed)
-    dim = 2 * inst.n
-    start = time.time()
-
-    # Initialize swarm
-    X = rng.random((NP, dim), dtype=np.float64)
-    V = rng.uniform(-vmax, vmax, size=(NP, dim)).astype(np.float64)
-
-    pbest = X.copy()
-    pbest_eval = np.full(NP, -1e18, dtype=np.float64)
-    gbest = None
-    gbest_eval = -1e18
-
-    n_evals = 0
-
-    # Initial evaluation
-    for i in range(NP):
-        ev = evaluate(inst, X[i])
-        n_evals += 1
-        pbest_eval[i] = ev.f
-        if ev.f > gbest_eval:
-            gbest_eval = ev.f
-            gbest = X[i].copy()
-
-    assert gbest is not None
-
-    # Main loop (time-budgeted)
-    while (time.time() - start) < seconds:
-        r1 = rng.random((NP, dim))
-        r2 = rng.random((NP, dim))
-
-        # Velocity + position update
-        V = w * V + c1 * r1 * (pbest - X) + c2 * r2 * (gbest[None, :] - X)
-        V = np.clip(V, -vmax, vmax)
-        X = X + V
-        X = _reflect01(X)
-
-        # Evaluate and update bests
-        for i in range(NP):
-            ev = evaluate(inst, X[i])
-            n_evals += 1
-            if ev.f > pbest_eval[i]:
+    dim = genotype.dim if genotype is not None else 2 * inst.n
+    ctl = RunControl(seconds, cancel, target_V, inst, _incumbent_check(inst, decoder, genotype))
+
+    config = dict(algorithm="pso", instance=inst.name, seed=seed, NP=NP, dim=dim)
+    state = checkpoint.load() if checkpoint is not None else None
+
+    try:
+        if state is not None:
+            meta = _resume(checkpoint, state, config, ctl, rng)
+            X, V, pbest, pbest_eval = state["X"], state["V"], state["pbest"], state["pbest_f"]
+            gbest, (gbest_ev,) = state["best_x"], evals_from_array(state["best_E"])
+            n_evals = int(meta["n_evals"])
+            yield from ctl.step(n_evals, gbest, gbest_ev, True)
+        else:
+            # Initialize swarm
+            X = rng.random((NP, dim), dtype=np.float64)
+            V = rng.uniform(-vmax, vmax, size=(NP, dim)).astype(np.float64)
+
+            pbest = X.copy()
+            pbest_eval = np.full(NP, -1e18, dtype=np.float64)
+            gbest = None
+            gbest_ev = None
+
+            n_evals = 0
+
+            # Initial evaluation
+            for i in range(NP):
+                ev = evaluate(inst, X[i], decoder=decoder, genotype=genotype)
+                n_evals += 1
                 pbest_eval[i] = ev.f
-                pbest[i] = X[i].copy()
-                if ev.f > gbest_eval:
-                    gbest_eval = ev.f
+                improved = gbest_ev is None or ev.f > gbest_ev.f
+                if improved:
+                    gbest_ev = ev
                     gbest = X[i].copy()
+                yield from ctl.step(n_evals, gbest, gbest_ev, improved)
+
+        assert gbest is not None
+
+        # Main loop (time-budgeted)
+        while not ctl.expired():
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(dict(config, n_evals=n_evals, elapsed=ctl.elapsed()),
+                                dict(X=X, V=V, pbest=pbest, pbest_f=pbest_eval, best_x=gbest,
+                                     best_E=evals_to_array([gbest_ev])), rng)
+
+            inj = ctl.take_injected(gbest_ev.f)
+            if inj is not None:  # the worst particle jumps to the offered incumbent
+                worst = int(np.argmin(pbest_eval))
+                X[worst] = inj[0]
+                pbest[worst] = inj[0]
+                pbest_eval[worst] = inj[1].f
+                gbest, gbest_ev = inj[0].copy(), inj[1]
+
+            r1 = rng.random((NP, dim))
+            r2 = rng.random((NP, dim))
+
+            # Velocity + position update
+            V = w * V + c1 * r1 * (pbest - X) + c2 * r2 * (gbest[None, :] - X)
+            V = np.clip(V, -vmax, vmax)
+            X = X + V
+            X = _reflect01(X)
+
+            # Evaluate and update bests
+            for i in range(NP):
+                ev = evaluate(inst, X[i], decoder=decoder, genotype=genotype)
+                n_evals += 1
+                improved = False
+                if ev.f > pbest_eval[i]:
+                    pbest_eval[i] = ev.f
+                    pbest[i] = X[i].copy()
+                    if ev.f > gbest_ev.f:
+                        gbest_ev = ev
+                        gbest = X[i].copy()
+                        improved = True
+                yield from ctl.step(n_evals, gbest, gbest_ev, improved)
+
+            # Safety: if time is exceeded during the inner loop, stop early
+            if ctl.expired():
+                break
+    except StopRun:
+        pass
 
-        # Safety: if time is exceeded during the inner loop, stop early
-        if (time.time() - start) >= seconds:
-            break
-
-    best_x = gbest
-    best_eval = evaluate(inst, best_x)
-    n_evals += 1
-    return DEResult(best_x=best_x, best_eval=best_eval, n_evals=n_evals, seconds=time.time() - start)
+    if checkpoint is not None:
+        checkpoint.finish(ctl.stop)
+    return _result(ctl)
 
+def run_pso(inst: Instance, *, seconds: float, seed: int, NP: int = 60, **kw) -> DEResult:
+    """Blocking PSO; keyword arguments as for iter_pso."""
+    return drain(iter_pso(inst, seconds=seconds, seed=seed, NP=NP, **kw))
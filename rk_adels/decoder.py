@@ -1,10 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import bisect
 import numpy as np
 
-from .instance import Instance, orientations
+from .instance import Instance, InstanceCache, orientations
 
 @dataclass
 class Placement:
@@ -15,6 +15,7 @@ class Placement:
     h: float
     d: float
     r: int  # 1..6
+    item: int = -1  # index into inst.items (-1 if unknown)
 
 @dataclass
 class DecodeResult:
@@ -24,14 +25,57 @@ class DecodeResult:
     D_max: float
     f: float
     placements: List[Placement]
+    hm_peak_bytes: int = 0  # largest heightmap buffer during the decode
+    hm_allocs: int = 0      # heightmap buffer allocations during the decode
+    n_anchors: int = 0      # (x, z) anchors offered to the scans, summed over items
 
 class HeightMap2D:
-    def __init__(self, W: float, D: float):
+    """Piecewise-constant height field over the container floor.
+
+    Breakpoints X (along W) and Z (along D) split the floor into cells; S[i, j] is the
+    height of cell [X[i], X[i+1]) x [Z[j], Z[j+1]). The cells live in a pre-allocated
+    buffer whose capacity grows by doubling up to `max_breaks` per axis (2 per placed
+    item + 2), and a new breakpoint shifts only the rows/columns after it in place
+    instead of copying the whole grid. `n_allocs`, `n_shifts` and `peak_bytes` count
+    buffer allocations, in-place shifts and the largest buffer size.
+    """
+
+    def __init__(self, W: float, D: float, max_breaks: Optional[int] = None, init_capacity: int = 32):
         self.W = float(W)
         self.D = float(D)
         self.X = [0.0, self.W]
         self.Z = [0.0, self.D]
-        self.S = np.zeros((1,1), dtype=float)
+        self.max_cells = max(1, int(max_breaks) - 1) if max_breaks is not None else None
+        cap = max(1, int(init_capacity))
+        if self.max_cells is not None:
+            cap = min(cap, self.max_cells)
+        self._buf = np.zeros((cap, cap), dtype=float)
+        self._nx = 1
+        self._nz = 1
+        self._hmax: Optional[float] = 0.0
+        self.n_allocs = 1
+        self.n_shifts = 0
+        self.peak_bytes = self._buf.nbytes
+
+    @property
+    def S(self) -> np.ndarray:
+        """Cell heights (a view into the buffer)."""
+        return self._buf[:self._nx, :self._nz]
+
+    def _grow(self, rows: int, cols: int) -> None:
+        cx, cz = self._buf.shape
+        if rows <= cx and cols <= cz:
+            return
+        def _cap(need: int, cur: int) -> int:
+            new = max(need, 2 * cur)
+            if self.max_cells is not None:
+                new = max(need, min(new, self.max_cells))
+            return new
+        buf = np.zeros((_cap(rows, cx) if rows > cx else cx, _cap(cols, cz) if cols > cz else cz), dtype=float)
+        buf[:self._nx, :self._nz] = self._buf[:self._nx, :self._nz]
+        self._buf = buf
+        self.n_allocs += 1
+        self.peak_bytes = max(self.peak_bytes, buf.nbytes)
 
     def _insert_breakpoint_axis(self, axis: str, value: float):
         value = float(value)
@@ -43,8 +87,15 @@ class HeightMap2D:
             if idx < len(arr) and abs(arr[idx] - value) < 1e-12:
                 return
             arr.insert(idx, value)
-            old_row = idx - 1
-            self.S = np.insert(self.S, idx, self.S[old_row, :], axis=0)
+            # Row idx-1 splits in two: shift rows idx.. down by one and duplicate idx-1.
+            self._grow(self._nx + 1, self._nz)
+            nx, nz = self._nx, self._nz
+            b = self._buf
+            if idx < nx:
+                b[idx + 1:nx + 1, :nz] = b[idx:nx, :nz]
+                self.n_shifts += 1
+            b[idx, :nz] = b[idx - 1, :nz]
+            self._nx = nx + 1
         elif axis == "z":
             arr = self.Z
             if value <= 0.0 or value >= self.D:
@@ -53,8 +104,14 @@ class HeightMap2D:
             if idx < len(arr) and abs(arr[idx] - value) < 1e-12:
                 return
             arr.insert(idx, value)
-            old_col = idx - 1
-            self.S = np.insert(self.S, idx, self.S[:, old_col], axis=1)
+            self._grow(self._nx, self._nz + 1)
+            nx, nz = self._nx, self._nz
+            b = self._buf
+            if idx < nz:
+                b[:nx, idx + 1:nz + 1] = b[:nx, idx:nz]
+                self.n_shifts += 1
+            b[:nx, idx] = b[:nx, idx - 1]
+            self._nz = nz + 1
         else:
             raise ValueError("axis must be 'x' or 'z'")
 
@@ -74,15 +131,100 @@ class HeightMap2D:
     def max_over(self, x0: float, x1: float, z0: float, z1: float) -> float:
         ix0, ix1 = self._interval_range(self.X, x0, x1)
         iz0, iz1 = self._interval_range(self.Z, z0, z1)
-        return float(np.max(self.S[ix0:ix1, iz0:iz1]))
+        return float(np.max(self._buf[ix0:ix1, iz0:iz1]))
 
     def set_over(self, x0: float, x1: float, z0: float, z1: float, value: float):
         ix0, ix1 = self._interval_range(self.X, x0, x1)
         iz0, iz1 = self._interval_range(self.Z, z0, z1)
-        self.S[ix0:ix1, iz0:iz1] = float(value)
+        value = float(value)
+        self._buf[ix0:ix1, iz0:iz1] = value
+        if self._hmax is not None and value >= self._hmax:
+            self._hmax = value
+        else:
+            self._hmax = None  # may have lowered the maximum: recompute on demand
 
     def H_max(self) -> float:
-        return float(np.max(self.S))
+        if self._hmax is None:
+            self._hmax = float(np.max(self.S))
+        return self._hmax
+
+def _scan_exhaustive(hm: HeightMap2D, Xc: List[float], Zc: List[float],
+                     w: float, h: float, d: float, W: float, H: float, D: float):
+    """Reference scan over the full Xc x Zc product (the original decoder loop)."""
+    best_key = None
+    best_xyz = None
+
+    for x in Xc:
+        if x + w > W + 1e-12:
+            continue
+        for z in Zc:
+            if z + d > D + 1e-12:
+                continue
+
+            y = hm.max_over(x, x+w, z, z+d)
+            if y + h > H + 1e-12:
+                continue
+
+            Hprime = max(hm.H_max(), y + h)
+            key = (y, z, x, Hprime)  # bottom-left-front + peak tie-break
+
+            if best_key is None or key < best_key:
+                best_key = key
+                best_xyz = (x,y,z)
+
+    return best_xyz
+
+def _scan_best_first(hm: HeightMap2D, Xc: List[float], Zc: List[float],
+                     w: float, h: float, d: float, W: float, H: float, D: float):
+    """Same anchor as `_scan_exhaustive`, visiting anchors best-first with an early exit.
+
+    The height of the cell under an anchor's corner is a lower bound on its resting height
+    y, so (lb, z, x) lower-bounds the (y, z, x) key that the exhaustive scan minimizes
+    (H' only depends on y, and anchors are unique in (x, z)). Anchors whose bound alone
+    overflows H are dropped, the rest are scanned in increasing (lb, z, x) order, and the
+    scan stops once the next bound exceeds the incumbent key.
+    """
+    xa = np.asarray(Xc, dtype=float)
+    za = np.asarray(Zc, dtype=float)
+    xa = xa[xa + w <= W + 1e-12]
+    za = za[za + d <= D + 1e-12]
+    if len(xa) == 0 or len(za) == 0:
+        return None
+
+    S = hm.S
+    ix = np.minimum(np.searchsorted(hm.X, xa, side="right") - 1, S.shape[0] - 1)
+    iz = np.minimum(np.searchsorted(hm.Z, za, side="right") - 1, S.shape[1] - 1)
+    lb = S[np.ix_(ix, iz)].ravel()
+    xg = np.repeat(xa, len(za))
+    zg = np.tile(za, len(xa))
+    ok = lb + h <= H + 1e-12
+    if not np.any(ok):
+        return None
+    lb, xg, zg = lb[ok], xg[ok], zg[ok]
+    seq = np.lexsort((xg, zg, lb)).tolist()
+    lbs, xs, zs = lb.tolist(), xg.tolist(), zg.tolist()
+
+    best_key = None
+    for k in seq:
+        x, z = xs[k], zs[k]
+        if best_key is not None and (lbs[k], z, x) > best_key:
+            break
+        y = hm.max_over(x, x+w, z, z+d)
+        if y + h > H + 1e-12:
+            continue
+        key = (y, z, x)
+        if best_key is None or key < best_key:
+            best_key = key
+
+    if best_key is None:
+        return None
+    y, z, x = best_key
+    return (x, y, z)
+
+def _insort_unique(arr: List[float], seen: set, v: float) -> None:
+    if v not in seen:
+        seen.add(v)
+        bisect.insort(arr, v)
 
 def decode_wall_heightmap(
     inst: Instance,
@@ -91,50 +233,87 @@ def decode_wall_heightmap(
     eps_P: float = 1e-4,
     eps_H: float = 1e-6,
     eps_D: float = 1e-6,
+    exhaustive: bool = False,
 ) -> DecodeResult:
-    W,H,D = inst.container.W, inst.container.H, inst.container.D
-    n = len(inst.items)
+    """Wall/heightmap decoder: place items in `order` at the lowest, then front-most, then
+    left-most anchor (x from {0} U right edges, z from {0} U back edges of placed boxes).
 
-    hm = HeightMap2D(W, D)
-    placements: List[Placement] = []
-    V_placed = 0.0
-    D_max = 0.0
+    `exhaustive=True` scans every anchor (reference semantics); the default best-first scan
+    returns the identical placement with far fewer heightmap queries. It also drops anchors
+    that no item still to be packed can use (x + w > W for the smallest remaining w, likewise
+    for z and d; see rk_adels.raster), which leaves every placement unchanged.
+    """
+    c = inst.container
+    return _decode_heightmap(c.W, c.H, c.D, inst.n, inst.type_offsets, type_orientations(inst), order, r_plan,
+                             eps_P=eps_P, eps_H=eps_H, eps_D=eps_D, exhaustive=exhaustive)
 
-    for idx in order:
-        it = inst.items[idx]
-        r = int(r_plan[idx])
-        orients = orientations(it.w, it.h, it.d, getattr(it, 'vert_ok', (1,1,1)))
-        w,h,d = orients[(r-1) % len(orients)]
 
-        Xc = [0.0]
-        Zc = [0.0]
-        for pl in placements:
-            Xc.append(pl.x + pl.w)
-            Zc.append(pl.z + pl.d)
+def _type_orientations(inst: Instance) -> List[List[Tuple[float, float, float]]]:
+    return [orientations(t.w, t.h, t.d, t.vert_ok) for t in inst.types]
 
-        Xc = sorted(set([x for x in Xc if x <= W]))
-        Zc = sorted(set([z for z in Zc if z <= D]))
 
-        best_key = None
-        best_xyz = None
+_ORIENTS: "InstanceCache[List[List[Tuple[float, float, float]]]]" = InstanceCache(_type_orientations)
 
-        for x in Xc:
-            if x + w > W + 1e-12:
-                continue
-            for z in Zc:
-                if z + d > D + 1e-12:
-                    continue
 
-                y = hm.max_over(x, x+w, z, z+d)
-                if y + h > H + 1e-12:
-                    continue
+def type_orientations(inst: Instance) -> List[List[Tuple[float, float, float]]]:
+    """Feasible orientations of every box type (computed once per Instance object)."""
+    return _ORIENTS(inst)
+
+
+def _decode_heightmap(
+    W: float,
+    H: float,
+    D: float,
+    n: int,
+    offsets: List[int],
+    type_orients: List[List[Tuple[float, float, float]]],
+    order: List[int],
+    r_plan: List[int],
+    eps_P: float = 1e-4,
+    eps_H: float = 1e-6,
+    eps_D: float = 1e-6,
+    exhaustive: bool = False,
+) -> DecodeResult:
+    """decode_wall_heightmap on a W x H x D container, with the per-instance setup given:
+    `n` items, type `offsets` and `type_orients` (see Instance.type_offsets)."""
+    scan = _scan_exhaustive if exhaustive else _scan_best_first
+
+    hm = HeightMap2D(W, D, max_breaks=2*n + 2)
+    placements: List[Placement] = []
+    V_placed = 0.0
+    D_max = 0.0
+
+    # Candidate anchor coordinates, kept sorted and duplicate-free as boxes are placed.
+    Xc: List[float] = [0.0]
+    Zc: List[float] = [0.0]
+    x_seen = {0.0}
+    z_seen = {0.0}
 
-                Hprime = max(hm.H_max(), y + h)
-                key = (y, z, x, Hprime)  # bottom-left-front + peak tie-break
+    dims = []
+    for idx in order:
+        orients = type_orients[bisect.bisect_right(offsets, idx) - 1]
+        dims.append(orients[(int(r_plan[idx]) - 1) % len(orients)])
+    # Smallest w and d among the items from step k on: anchors beyond W - w_min / D - d_min are dead.
+    w_min = [0.0] * len(dims)
+    d_min = [0.0] * len(dims)
+    mw = md = float("inf")
+    for k in range(len(dims) - 1, -1, -1):
+        mw = min(mw, dims[k][0])
+        md = min(md, dims[k][2])
+        w_min[k], d_min[k] = mw, md
+    n_anchors = 0
+
+    for k, idx in enumerate(order):
+        r = int(r_plan[idx])
+        w,h,d = dims[k]
 
-                if best_key is None or key < best_key:
-                    best_key = key
-                    best_xyz = (x,y,z)
+        if not exhaustive:
+            while len(Xc) > 1 and Xc[-1] + w_min[k] > W + 1e-12:
+                Xc.pop()
+            while len(Zc) > 1 and Zc[-1] + d_min[k] > D + 1e-12:
+                Zc.pop()
+        n_anchors += len(Xc) * len(Zc)
+        best_xyz = scan(hm, Xc, Zc, w, h, d, W, H, D)
 
         if best_xyz is None:
             continue
@@ -143,13 +322,18 @@ def decode_wall_heightmap(
         hm.insert_breakpoints([x, x+w], [z, z+d])
         hm.set_over(x, x+w, z, z+d, y + h)
 
-        placements.append(Placement(x=x,y=y,z=z,w=w,h=h,d=d,r=r))
+        placements.append(Placement(x=x,y=y,z=z,w=w,h=h,d=d,r=r,item=int(idx)))
         V_placed += w*h*d
         D_max = max(D_max, z + d)
+        if x + w <= W:
+            _insort_unique(Xc, x_seen, x + w)
+        if z + d <= D:
+            _insort_unique(Zc, z_seen, z + d)
 
     V = V_placed/(W*H*D) if W*H*D > 0 else 0.0
     placed_count = len(placements)
     H_max = hm.H_max()
     f = V + eps_P*(placed_count/n) - eps_H*(H_max/H) - eps_D*(D_max/D)
 
-    return DecodeResult(V=V, placed_count=placed_count, H_max=H_max, D_max=D_max, f=f, placements=placements)
+    return DecodeResult(V=V, placed_count=placed_count, H_max=H_max, D_max=D_max, f=f, placements=placements,
+                        hm_peak_bytes=hm.peak_bytes, hm_allocs=hm.n_allocs, n_anchors=n_anchors)
@@ -0,0 +1,252 @@
+"""Differential testing of decoder backends against the reference decoder.
+
+The reference semantics are `decode_wall_heightmap(..., exhaustive=True)`. A
+candidate backend (anything with the decoder call signature, see
+`rk_adels.de.Decoder`) must reproduce its placements one by one: same item, same
+position, same oriented size, in the same order, and the same V / H_max / D_max.
+
+Cases per instance are random (perm, r_plan) pairs plus adversarial ones (volume
+and height sorted orders, reversed orders, constant orientation plans). The
+synthetic `edge_instances` add single-orientation items, exact fits, float
+dimensions, oversized items and heavy ties. The first divergence of an instance is
+shrunk with delta debugging (ddmin over the packing order) to a small stand-alone
+reproducer.
+"""
+from __future__ import annotations
+
+import functools
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .decoder import DecodeResult, Placement, decode_wall_heightmap
+from .instance import BoxType, Container, Instance, Item
+
+reference_decoder = functools.partial(decode_wall_heightmap, exhaustive=True)
+
+TOL = 1e-9
+
+
+@dataclass
+class Divergence:
+    step: int                        # index into the placement sequence (-1: summary metrics only)
+    message: str
+    reference: Optional[Placement] = None
+    candidate: Optional[Placement] = None
+
+
+@dataclass
+class Case:
+    label: str
+    order: List[int]
+    r_plan: List[int]
+
+
+@dataclass
+class Finding:
+    instance: str
+    case: str
+    divergence: Divergence
+    reproducer: Dict[str, Any]       # {"instance": Instance.to_dict(), "order": [...], "r_plan": [...]}
+
+
+@dataclass
+class InstanceReport:
+    instance: str
+    n_cases: int = 0
+    findings: List[Finding] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.findings and self.error is None
+
+
+def _same_placement(a: Placement, b: Placement, tol: float) -> bool:
+    return (a.item == b.item and int(a.r) == int(b.r)
+            and all(abs(u - v) <= tol for u, v in zip((a.x, a.y, a.z, a.w, a.h, a.d), (b.x, b.y, b.z, b.w, b.h, b.d))))
+
+
+def compare(ref: DecodeResult, cand: DecodeResult, tol: float = TOL) -> Optional[Divergence]:
+    """First difference between two decodes, or None if they agree."""
+    for k, (a, b) in enumerate(zip(ref.placements, cand.placements)):
+        if not _same_placement(a, b, tol):
+            return Divergence(step=k, message=f"placement {k} differs", reference=a, candidate=b)
+    na, nb = len(ref.placements), len(cand.placements)
+    if na != nb:
+        k = min(na, nb)
+        return Divergence(step=k, message=f"{na} vs {nb} placements",
+                          reference=ref.placements[k] if k < na else None,
+                          candidate=cand.placements[k] if k < nb else None)
+    for name in ("V", "H_max", "D_max", "f"):
+        a, b = getattr(ref, name), getattr(cand, name)
+        if not math.isclose(a, b, rel_tol=tol, abs_tol=tol):
+            return Divergence(step=-1, message=f"{name}: {a!r} vs {b!r}")
+    if ref.placed_count != cand.placed_count:
+        return Divergence(step=-1, message=f"placed_count: {ref.placed_count} vs {cand.placed_count}")
+    return None
+
+
+def _run(decoder: Callable[..., DecodeResult], inst: Instance, order: List[int], r_plan: List[int]):
+    try:
+        return decoder(inst, order, r_plan)
+    except Exception as e:  # a crash is a divergence too
+        return e
+
+
+def diverges(inst: Instance, order: List[int], r_plan: List[int], candidate: Callable[..., DecodeResult],
+             reference: Callable[..., DecodeResult] = reference_decoder, tol: float = TOL) -> Optional[Divergence]:
+    ref = _run(reference, inst, order, r_plan)
+    cand = _run(candidate, inst, order, r_plan)
+    if isinstance(ref, Exception) or isinstance(cand, Exception):
+        if isinstance(ref, Exception) and isinstance(cand, Exception) and type(ref) is type(cand):
+            return None
+        return Divergence(step=-1, message=f"reference: {ref!r}" if isinstance(ref, Exception) else f"candidate raised {cand!r}")
+    return compare(ref, cand, tol)
+
+
+def cases_for(inst: Instance, n_random: int, rng: random.Random) -> Iterator[Case]:
+    """Adversarial cases first, then `n_random` random (perm, r_plan) pairs."""
+    n = inst.n
+    items = inst.items
+    vol = [it.w * it.h * it.d for it in items]
+    ones = [1] * n
+    by_vol = sorted(range(n), key=lambda i: -vol[i])
+    yield Case("volume_desc", by_vol, ones)
+    yield Case("volume_asc", by_vol[::-1], ones)
+    yield Case("height_desc", sorted(range(n), key=lambda i: -items[i].h), [6] * n)
+    yield Case("identity_r3", list(range(n)), [3] * n)
+    yield Case("reverse_cycle", list(range(n))[::-1], [i % 6 + 1 for i in range(n)])
+    for k in range(n_random):
+        perm = list(range(n))
+        rng.shuffle(perm)
+        yield Case(f"random{k}", perm, [rng.randrange(1, 7) for _ in range(n)])
+
+
+def edge_instances() -> List[Instance]:
+    """Small synthetic instances for the corner cases of the anchor and orientation logic."""
+    C = Container
+    out = [
+        # One allowed orientation per item (cubes, and only one vertical edge of equal others).
+        Instance("edge_cubes", C(W=10, H=10, D=10), types=[BoxType(w=5, h=5, d=5, q=9), BoxType(w=3, h=3, d=3, q=5)]),
+        Instance("edge_single_vert", C(W=12, H=7, D=9), types=[BoxType(w=4, h=2, d=4, vert_ok=(0, 1, 0), q=12),
+                                                               BoxType(w=3, h=3, d=1, vert_ok=(0, 0, 1), q=6)]),
+        # Exact fits: the boxes tile the container with no slack.
+        Instance("edge_exact_tile", C(W=10, H=10, D=10), types=[BoxType(w=2.5, h=5, d=10, q=8)]),
+        Instance("edge_exact_one", C(W=7, H=3, D=5), types=[BoxType(w=7, h=3, d=5, q=2)]),
+        # Float dimensions whose sums are not exact in binary.
+        Instance("edge_float", C(W=1.0, H=1.0, D=1.0), types=[BoxType(w=0.1, h=0.3, d=0.7, q=20),
+                                                              BoxType(w=1 / 3, h=1 / 3, d=1 / 3, q=10),
+                                                              BoxType(w=0.2, h=0.2, d=0.6, q=15)]),
+        # Items that cannot be placed in any orientation, mixed with ones that can.
+        Instance("edge_oversized", C(W=5, H=5, D=5), types=[BoxType(w=6, h=1, d=1, q=3), BoxType(w=2, h=2, d=2, q=10)]),
+        # Many equal anchors: ties decide everything.
+        Instance("edge_ties", C(W=6, H=6, D=6), types=[BoxType(w=1, h=2, d=3, q=40)]),
+        Instance("edge_empty", C(W=5, H=5, D=5), types=[]),
+    ]
+    return out
+
+
+def _subset_instance(inst: Instance, order: List[int], r_plan: List[int]) -> Tuple[Instance, List[int], List[int]]:
+    """Stand-alone instance holding only the items in `order`, renumbered 0..k-1."""
+    items = inst.items
+    sub = Instance(name=f"{inst.name}_repro", container=inst.container,
+                   items=[Item(w=items[i].w, h=items[i].h, d=items[i].d, vert_ok=items[i].vert_ok) for i in order])
+    return sub, list(range(len(order))), [int(r_plan[i]) for i in order]
+
+
+def minimize(inst: Instance, order: List[int], r_plan: List[int], candidate: Callable[..., DecodeResult],
+             reference: Callable[..., DecodeResult] = reference_decoder, tol: float = TOL,
+             max_tests: int = 2000) -> Tuple[Instance, List[int], List[int]]:
+    """ddmin over the packing order (items left out are simply not decoded), then reset
+    orientation keys to 1 where that keeps the divergence. Returns a small stand-alone
+    (instance, order, r_plan) that still diverges."""
+    tests = [0]
+
+    def fails(o: List[int], r: List[int]) -> bool:
+        tests[0] += 1
+        return diverges(inst, o, r, candidate, reference, tol) is not None
+
+    cur = list(order)
+    r = list(r_plan)
+    gran = 2
+    while len(cur) >= 2 and tests[0] < max_tests:
+        size = int(math.ceil(len(cur) / gran))
+        chunks = [cur[i:i + size] for i in range(0, len(cur), size)]
+        reduced = False
+        for k, chunk in enumerate(chunks):
+            if len(chunks) > 2 and fails(chunk, r):           # reduce to a subset
+                cur, gran, reduced = chunk, 2, True
+                break
+            rest = [i for j, c in enumerate(chunks) if j != k for i in c]
+            if fails(rest, r):                                # reduce to a complement
+                cur, gran, reduced = rest, max(gran - 1, 2), True
+                break
+        if not reduced:
+            if gran >= len(cur):
+                break
+            gran = min(len(cur), 2 * gran)
+    for i in cur:
+        if r[i] != 1 and tests[0] < max_tests:
+            old, r[i] = r[i], 1
+            if not fails(cur, r):
+                r[i] = old
+    sub = _subset_instance(inst, cur, r)
+    if diverges(*sub, candidate, reference, tol) is None:  # candidate depends on item numbering
+        return inst, cur, [int(v) for v in r]
+    return sub
+
+
+def check_instance(inst: Instance, candidate: Callable[..., DecodeResult], n_random: int = 8, seed: int = 0,
+                   reference: Callable[..., DecodeResult] = reference_decoder, tol: float = TOL,
+                   max_findings: int = 1, shrink: bool = True) -> InstanceReport:
+    """Run all cases of one instance; stops after `max_findings` divergences."""
+    rep = InstanceReport(instance=inst.name)
+    rng = random.Random(f"{seed}:{inst.name}")
+    for case in cases_for(inst, n_random, rng):
+        rep.n_cases += 1
+        div = diverges(inst, case.order, case.r_plan, candidate, reference, tol)
+        if div is None:
+            continue
+        if shrink:
+            sub, o, r = minimize(inst, case.order, case.r_plan, candidate, reference, tol)
+            div = diverges(sub, o, r, candidate, reference, tol) or div
+        else:
+            sub, o, r = inst, case.order, case.r_plan
+        rep.findings.append(Finding(instance=inst.name, case=case.label, divergence=div,
+                                    reproducer={"instance": sub.to_dict(), "order": list(o), "r_plan": list(r)}))
+        if len(rep.findings) >= max_findings:
+            break
+    return rep
+
+
+def replay(reproducer: Dict[str, Any], candidate: Callable[..., DecodeResult],
+           reference: Callable[..., DecodeResult] = reference_decoder, tol: float = TOL) -> Optional[Divergence]:
+    """Re-run a saved reproducer."""
+    inst = Instance.from_dict(reproducer["instance"])
+    return diverges(inst, reproducer["order"], reproducer["r_plan"], candidate, reference, tol)
+
+
+def load_decoder(spec: str) -> Callable[..., DecodeResult]:
+    """Decoder from an import path "package.module:attr" (called with no arguments first
+    when `attr` is a class, e.g. "rk_adels.sections:SectionDecoder")."""
+    import importlib
+    import inspect
+
+    mod, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Decoder spec must look like 'module:attr', got {spec!r}")
+    obj = getattr(importlib.import_module(mod), attr)
+    return obj() if inspect.isclass(obj) else obj
+
+
+def check_source(src: Any, candidate: str, n_random: int = 8, seed: int = 0, tol: float = TOL,
+                 shrink: bool = True) -> InstanceReport:
+    """Process-pool job: `src` is a JSON path or an `Instance.to_dict()`, `candidate` a
+    `load_decoder` spec (decoders are imported in the worker instead of pickled)."""
+    inst = Instance.from_dict(src) if isinstance(src, dict) else Instance.load_json(str(src))
+    try:
+        return check_instance(inst, load_decoder(candidate), n_random=n_random, seed=seed, tol=tol, shrink=shrink)
+    except Exception as e:  # report and keep going with the rest of the corpus
+        return InstanceReport(instance=inst.name, error=repr(e))
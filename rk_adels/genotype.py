@@ -0,0 +1,47 @@
+"""Compact random-key genotype with variable-arity orientation genes.
+
+The default genotype has 2n keys: n order keys and n orientation keys mapped to r in
+1..6, which the decoder reduces with `orients[(r-1) % len(orients)]`. For an item with
+k feasible orientations (`vert_ok` restrictions, equal sides, cubes) that mapping is
+biased whenever k does not divide 6, and for k = 1 the key is inert.
+
+`Genotype(inst)` keeps the n order keys and one orientation key per item with k > 1,
+decoded uniformly to r = floor(k * o) + 1 in 1..k. Pass it as `genotype=` to
+`rk_adels.de.evaluate` / `decode_x` and the optimizers; their search dimension becomes
+`genotype.dim`.
+"""
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+from .instance import Instance, orientations
+from .local_search import perm_from_keys, reencode_from_perm_and_r, rplan_from_okeys
+
+
+class Genotype:
+    def __init__(self, inst: Instance):
+        self.n = inst.n
+        arity: List[int] = []
+        for t in inst.types:
+            arity.extend([max(1, len(orientations(t.w, t.h, t.d, t.vert_ok)))] * int(t.q))
+        self.arity = arity
+        self._a = np.asarray(arity, dtype=int)
+        self.live = np.flatnonzero(self._a > 1)  # items that carry an orientation key
+        self.dim = self.n + len(self.live)
+
+    def plan(self, x: np.ndarray) -> Tuple[List[int], List[int]]:
+        """(perm, r_plan) of a genotype vector."""
+        return perm_from_keys(x[:self.n]), rplan_from_okeys(x[self.n:], self.arity)
+
+    def encode(self, perm: List[int], r_plan: List[int]) -> np.ndarray:
+        return reencode_from_perm_and_r(self.n, perm, r_plan, self.arity)
+
+    def orient_index(self, X: np.ndarray) -> np.ndarray:
+        """(m, n) zero-based orientation indices (r - 1) of the rows of X."""
+        X = np.atleast_2d(X)
+        R = np.zeros((len(X), self.n), dtype=int)
+        a = self._a[self.live]
+        R[:, self.live] = np.minimum(np.floor(a * np.clip(X[:, self.n:], 0.0, 1.0 - 1e-12)).astype(int), a - 1)
+        return R
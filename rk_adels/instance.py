@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Dict, Any, Tuple
+from typing import Callable, List, Dict, Any, Generic, Iterable, Optional, Tuple, TypeVar
+import bisect
 import json
+import weakref
 
 @dataclass
 class Container:
@@ -25,44 +27,204 @@ class Item:
     vert_ok: Tuple[int, int, int] = (1, 1, 1)
 
 @dataclass
+class BoxType:
+    # One distinct box (same fields as Item) together with its quantity q.
+    w: float
+    h: float
+    d: float
+    vert_ok: Tuple[int, int, int] = (1, 1, 1)
+    q: int = 1
+
+    def item(self) -> Item:
+        return Item(w=self.w, h=self.h, d=self.d, vert_ok=self.vert_ok)
+
+def _type_key(w: float, h: float, d: float, vert_ok) -> Tuple[float, float, float, Tuple[int, int, int]]:
+    return (float(w), float(h), float(d), tuple(int(x) for x in vert_ok))  # type: ignore[return-value]
+
+def _types_from_records(records: Iterable[Tuple[float, float, float, Tuple[int, int, int]]]) -> List[BoxType]:
+    """Run-length encode consecutive identical boxes into box types (item order is preserved)."""
+    types: List[BoxType] = []
+    last = None
+    for key in records:
+        if key == last:
+            types[-1].q += 1
+        else:
+            w, h, d, vo = key
+            types.append(BoxType(w=w, h=h, d=d, vert_ok=vo, q=1))
+            last = key
+    return types
+
+@dataclass(init=False, repr=False, eq=False)
 class Instance:
+    """A container and the boxes to load into it.
+
+    Boxes are stored either item by item (`items`) or as box types with quantities
+    (`types`); the other view is derived lazily on first access. Box type k covers the
+    consecutive item indices `type_offsets[k] .. type_offsets[k+1]-1`, so random-key
+    genotypes and placements index items exactly as in the per-item representation.
+    Solver code works on `types` so memory scales with the number of distinct boxes.
+
+    Both views are tuples: change an instance by assigning `container`, `items` or
+    `types`, which resets the derived view and invalidates InstanceCache entries (do not
+    mutate the Container or BoxType objects in place). Instances compare equal when their
+    `to_dict(compact=True)` forms are equal; like any mutable dataclass they are not
+    hashable. The dataclass fields are (name, container, types), so
+    `dataclasses.replace` and `asdict` work on the box-type view.
+    """
+
     name: str
     container: Container
-    items: List[Item]
+    types: Tuple[BoxType, ...]
+
+    def __init__(
+        self,
+        name: str,
+        container: Container,
+        items: Optional[List[Item]] = None,
+        types: Optional[List[BoxType]] = None,
+    ):
+        if items is not None and types is not None:
+            raise ValueError("Give either items or types, not both")
+        self._version = 0
+        self.name = name
+        self.container = container
+        self._items: Optional[Tuple[Item, ...]] = tuple(items) if items is not None else None
+        self._types: Optional[Tuple[BoxType, ...]] = tuple(types) if types is not None else (() if items is None else None)
+        self._offsets: Optional[List[int]] = None
+
+    def __repr__(self) -> str:
+        return f"Instance(name={self.name!r}, container={self.container!r}, n={self.n}, n_types={self.n_types})"
+
+    def _key(self) -> Tuple[Any, ...]:
+        """What to_dict(compact=True) serializes, as a hashable tuple."""
+        c = self.container
+        return (self.name, c.W, c.H, c.D, tuple(_type_key(t.w, t.h, t.d, t.vert_ok) + (int(t.q),) for t in self.types))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Instance):
+            return NotImplemented
+        return self is other or self._key() == other._key()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def container(self) -> Container:
+        return self._container
+
+    @container.setter
+    def container(self, container: Container) -> None:
+        self._container = container
+        self._version += 1
+
+    @property
+    def items(self) -> Tuple[Item, ...]:
+        """Per-item view (expanded from the box types on first access)."""
+        if self._items is None:
+            self._items = tuple(t.item() for t in self.types for _ in range(int(t.q)))
+        return self._items
+
+    @items.setter
+    def items(self, items: Iterable[Item]) -> None:
+        self._items = tuple(items)
+        self._types = None
+        self._offsets = None
+        self._version += 1
+
+    @property
+    def types(self) -> Tuple[BoxType, ...]:
+        """Box-type view (consecutive identical items merged)."""
+        if self._types is None:
+            self._types = tuple(_types_from_records(_type_key(it.w, it.h, it.d, it.vert_ok) for it in self._items or ()))
+        return self._types
+
+    @types.setter
+    def types(self, types: Iterable[BoxType]) -> None:
+        self._types = tuple(types)
+        self._items = None
+        self._offsets = None
+        self._version += 1
+
+    @property
+    def type_offsets(self) -> List[int]:
+        """Cumulative quantities: item indices of type k are offsets[k] .. offsets[k+1]-1."""
+        if self._offsets is None:
+            off = [0]
+            for t in self.types:
+                off.append(off[-1] + int(t.q))
+            self._offsets = off
+        return self._offsets
 
     @property
     def n(self) -> int:
         """Number of items."""
-        return len(self.items)
+        if self._items is not None:
+            return len(self._items)
+        return self.type_offsets[-1]
 
-    def to_dict(self) -> Dict[str, Any]:
-        items_out: List[Dict[str, Any]] = []
-        for it in self.items:
-            d = {"w": it.w, "h": it.h, "d": it.d}
-            if tuple(it.vert_ok) != (1, 1, 1):
-                d["vert_ok"] = list(it.vert_ok)
-            items_out.append(d)
-        return {
+    @property
+    def n_types(self) -> int:
+        """Number of box types."""
+        return len(self.types)
+
+    def type_of(self, i: int) -> int:
+        """Box-type index of item i."""
+        return bisect.bisect_right(self.type_offsets, i) - 1
+
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        """Serialize per item (default, readable by every version) or per box type (compact)."""
+        out: Dict[str, Any] = {
             "name": self.name,
             "container": {"W": self.container.W, "H": self.container.H, "D": self.container.D},
-            "items": items_out,
         }
+        if compact:
+            types_out: List[Dict[str, Any]] = []
+            for t in self.types:
+                d = {"w": t.w, "h": t.h, "d": t.d, "q": int(t.q)}
+                if tuple(t.vert_ok) != (1, 1, 1):
+                    d["vert_ok"] = list(t.vert_ok)
+                types_out.append(d)
+            out["types"] = types_out
+            return out
+        items_out: List[Dict[str, Any]] = []
+        for t in self.types:
+            d = {"w": t.w, "h": t.h, "d": t.d}
+            if tuple(t.vert_ok) != (1, 1, 1):
+                d["vert_ok"] = list(t.vert_ok)
+            items_out.extend(dict(d) for _ in range(int(t.q)))
+        out["items"] = items_out
+        return out
 
     @staticmethod
     def from_dict(d: Dict[str, Any]) -> "Instance":
+        """Load either schema: {"types": [{w,h,d,q,vert_ok?}]} or the per-item {"items": [...]}.
+
+        Per-item files are run-length encoded into box types while reading, so no
+        Item objects are built unless the item view is requested.
+        """
         c = d["container"]
-        items: List[Item] = []
-        for it in d["items"]:
-            if "vert_ok" in it and it["vert_ok"] is not None:
-                vo = tuple(int(x) for x in it["vert_ok"])
-                items.append(Item(w=float(it["w"]), h=float(it["h"]), d=float(it["d"]), vert_ok=vo))  # type: ignore[arg-type]
-            else:
-                items.append(Item(w=float(it["w"]), h=float(it["h"]), d=float(it["d"])))
-        return Instance(name=d.get("name", "instance"), container=Container(**c), items=items)
+        if "types" in d:
+            types = [
+                BoxType(
+                    w=float(t["w"]), h=float(t["h"]), d=float(t["d"]),
+                    vert_ok=tuple(int(x) for x in t["vert_ok"]) if t.get("vert_ok") is not None else (1, 1, 1),  # type: ignore[arg-type]
+                    q=int(t.get("q", 1)),
+                )
+                for t in d["types"]
+            ]
+        else:
+            types = _types_from_records(
+                _type_key(it["w"], it["h"], it["d"], it["vert_ok"] if it.get("vert_ok") is not None else (1, 1, 1))
+                for it in d["items"]
+            )
+        return Instance(name=d.get("name", "instance"), container=Container(**c), types=types)
 
-    def save_json(self, path: str) -> None:
+    def save_json(self, path: str, compact: bool = False) -> None:
+        """Indented per-item JSON, or minified per-type JSON with compact=True."""
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, indent=2)
+            if compact:
+                json.dump(self.to_dict(compact=True), f, separators=(",", ":"))
+            else:
+                json.dump(self.to_dict(), f, indent=2)
 
     @staticmethod
     def load_json(path: str) -> "Instance":
@@ -96,3 +258,33 @@ def orientations(w: float, h: float, d: float, vert_ok: Tuple[int, int, int] = (
             out.append(tup)
             seen.add(tup)
     return out
+
+
+V = TypeVar("V")
+
+
+class InstanceCache(Generic[V]):
+    """Values derived from an Instance, keyed by object identity.
+
+    An entry is dropped when its instance is garbage collected and recomputed after
+    the instance's container, items or types are reassigned. Equal but distinct
+    instances get separate entries, so renaming or mutating one never affects another.
+    """
+
+    def __init__(self, compute: Callable[[Instance], V]):
+        self.compute = compute
+        self._entries: Dict[int, Tuple[int, V]] = {}
+
+    def __call__(self, inst: Instance) -> V:
+        key = id(inst)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == inst._version:
+            return entry[1]
+        value = self.compute(inst)
+        if entry is None:
+            weakref.finalize(inst, self._entries.pop, key, None)
+        self._entries[key] = (inst._version, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
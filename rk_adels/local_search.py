@@ -1,12 +1,19 @@
 from __future__ import annotations
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 import random
 import numpy as np
 
-def reencode_from_perm_and_r(n: int, perm: List[int], r_plan: List[int]) -> np.ndarray:
+# `arity` (see rk_adels.genotype.Genotype) switches to the compact layout: one orientation
+# key per item with arity > 1 (its number of feasible orientations), r in 1..arity.
+
+def reencode_from_perm_and_r(n: int, perm: List[int], r_plan: List[int],
+                             arity: Optional[Sequence[int]] = None) -> np.ndarray:
     k = np.zeros(n, dtype=float)
     for pos, idx in enumerate(perm):
         k[idx] = (pos + 0.5) / n
+    if arity is not None:
+        o = [((int(r_plan[i]) - 1) % a + 0.5) / a for i, a in enumerate(arity) if a > 1]
+        return np.concatenate([k, np.asarray(o, dtype=float)])
     o = np.zeros(n, dtype=float)
     for i in range(n):
         r = int(r_plan[i])
@@ -16,12 +23,19 @@ def reencode_from_perm_and_r(n: int, perm: List[int], r_plan: List[int]) -> np.n
 def perm_from_keys(k: np.ndarray) -> List[int]:
     return list(np.argsort(k, kind="mergesort"))
 
-def rplan_from_okeys(o: np.ndarray) -> List[int]:
+def rplan_from_okeys(o: np.ndarray, arity: Optional[Sequence[int]] = None) -> List[int]:
+    if arity is not None:
+        a = np.asarray(arity, dtype=int)
+        r = np.ones(len(a), dtype=int)
+        live = a > 1
+        r[live] = np.minimum(np.floor(a[live] * np.clip(o, 0.0, 1.0 - 1e-12)).astype(int), a[live] - 1) + 1
+        return list(map(int, r.tolist()))
     r = (np.floor(6.0 * np.clip(o, 0.0, 1.0 - 1e-12))).astype(int) + 1
     r = np.clip(r, 1, 6)
     return list(map(int, r.tolist()))
 
-def local_search_step(perm: List[int], r_plan: List[int], rng: random.Random) -> Tuple[List[int], List[int]]:
+def local_search_step(perm: List[int], r_plan: List[int], rng: random.Random,
+                      arity: Optional[Sequence[int]] = None) -> Tuple[List[int], List[int]]:
     n = len(perm)
     move = rng.choice(["swap","insert","reverse","rot"])
     perm2 = perm[:]
@@ -42,6 +56,14 @@ def local_search_step(perm: List[int], r_plan: List[int], rng: random.Random) ->
         j = rng.randrange(i+1, min(n, i+1+rng.randint(2, 6)))
         perm2[i:j] = list(reversed(perm2[i:j]))
 
+    elif move == "rot" and arity is not None:
+        # Only items with a choice; the new orientation always differs from the current one.
+        live = [i for i in range(n) if arity[i] > 1]
+        if live:
+            item = live[rng.randrange(len(live))]
+            a = arity[item]
+            r2[item] = (r2[item] - 1 + rng.randrange(1, a)) % a + 1
+
     elif move == "rot":
         item = rng.randrange(n)
         cur = r2[item]
@@ -0,0 +1,193 @@
+"""Live metrics of a running sweep: a JSON-lines stream and a Prometheus text file.
+
+`MetricsExporter` is fed by the sweep (`start_job` / `end_job`) and by the optimizer
+progress callback (`progress`, see rk_adels.anytime). At most every `interval` seconds,
+and at the end of every job, it appends a record to `metrics.jsonl` and rewrites
+`metrics.prom` (Prometheus text exposition format, written atomically so that a
+node-exporter textfile collector or `watch cat` never sees half a file).
+
+Per worker (default label host:pid) it reports the running job (instance, variant,
+trial, evals/s, best V, seconds since the last improvement, decoder time share), the
+mean evals/s and decoder share per variant over finished jobs, jobs done and queued,
+and an ETA from the mean duration of finished jobs. The decoder time share is the
+fraction of solver time spent in `rk_adels.de.evaluate`'s decode; runs that decode in
+child processes (PT with workers, PF) are not covered.
+
+Used as a context manager, the exporter writes a final "done" snapshot when the sweep
+ends, or "aborted" if it raised. The final snapshot has no running job, zero jobs
+queued and `rk_sweep_running` 0.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .anytime import Progress
+
+PathLike = Union[str, Path]
+
+
+def _decode_seconds() -> float:
+    from . import de
+
+    return de.DECODE_SECONDS
+
+
+def _label_value(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**kw: Any) -> str:
+    return ",".join(f'{k}="{_label_value(v)}"' for k, v in kw.items())
+
+
+class MetricsExporter:
+    def __init__(self, out_dir: PathLike, jobs_planned: int = 0, interval: float = 5.0, worker: Optional[str] = None):
+        self.dir = Path(out_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.jsonl_path = self.dir / "metrics.jsonl"
+        self.prom_path = self.dir / "metrics.prom"
+        self.interval = float(interval)
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self.jobs_planned = int(jobs_planned)
+        self.jobs_done = 0
+        self.t_start = time.time()
+        self.job_seconds = 0.0
+        self._job: Optional[Dict[str, Any]] = None
+        self._variants: Dict[str, Dict[str, float]] = {}
+        self._last_write = 0.0
+        self.running = True
+
+    # --- sweep bookkeeping -------------------------------------------------------------
+
+    def cancel_jobs(self, n: int) -> None:
+        """Remove planned jobs that will not run (e.g. variants dropped by racing)."""
+        self.jobs_planned = max(self.jobs_done, self.jobs_planned - int(n))
+
+    def start_job(self, instance: str, variant: str, trial: int) -> None:
+        now = time.time()
+        self._job = dict(instance=instance, variant=variant, trial=trial, t0=now, dec0=_decode_seconds(),
+                         n_evals=0, elapsed=0.0, best_V=float("nan"), t_improved=now)
+
+    def progress(self, p: Progress) -> None:
+        """Optimizer progress callback (pass as `callback=` to run_variant / solve_variant)."""
+        job = self._job
+        if job is None:
+            return
+        job["n_evals"] = p.n_evals
+        job["elapsed"] = p.elapsed
+        if p.improved or job["best_V"] != job["best_V"]:
+            job["best_V"] = p.best_eval.V
+            job["t_improved"] = time.time()
+        if time.time() - self._last_write >= self.interval:
+            self.write("progress")
+
+    def end_job(self, row: Dict[str, Any]) -> None:
+        job = self._job
+        if job is None:
+            return
+        wall = time.time() - job["t0"]
+        job["n_evals"] = int(row.get("n_evals", job["n_evals"]))
+        job["elapsed"] = float(row.get("seconds_used", job["elapsed"]))
+        job["best_V"] = float(row.get("V_best", job["best_V"]))
+        self.jobs_done += 1
+        self.job_seconds += wall
+        v = self._variants.setdefault(job["variant"], dict(jobs=0, evals=0.0, seconds=0.0, decode=0.0))
+        v["jobs"] += 1
+        v["evals"] += job["n_evals"]
+        v["seconds"] += wall
+        v["decode"] += _decode_seconds() - job["dec0"]
+        self.write("end")
+        self._job = None
+
+    def close(self, event: str = "done") -> None:
+        """Final snapshot ("done" or "aborted"): no running job, nothing left queued."""
+        if not self.running:
+            return
+        self._job = None
+        self.jobs_planned = self.jobs_done
+        self.running = False
+        self.write(event)
+
+    def __enter__(self) -> "MetricsExporter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self.close("aborted" if exc_type is not None else "done")
+
+    # --- snapshot ----------------------------------------------------------------------
+
+    def snapshot(self, event: str = "progress") -> Dict[str, Any]:
+        now = time.time()
+        queued = max(0, self.jobs_planned - self.jobs_done)
+        mean_job = self.job_seconds / self.jobs_done if self.jobs_done else float("nan")
+        rec: Dict[str, Any] = {
+            "t": now, "event": event, "worker": self.worker, "running": self.running,
+            "jobs_done": self.jobs_done, "jobs_queued": queued,
+            "eta_seconds": queued * mean_job if self.jobs_done else float("nan"),
+            "uptime_seconds": now - self.t_start,
+        }
+        job = self._job
+        if job is not None:
+            wall = max(now - job["t0"], 1e-9)
+            rec.update(
+                instance=job["instance"], variant=job["variant"], trial=job["trial"],
+                n_evals=job["n_evals"], elapsed=job["elapsed"],
+                evals_per_sec=job["n_evals"] / max(job["elapsed"], 1e-9),
+                best_V=job["best_V"], since_improvement=now - job["t_improved"],
+                decode_share=(_decode_seconds() - job["dec0"]) / wall,
+            )
+        rec["variants"] = {
+            k: dict(jobs=int(v["jobs"]), evals_per_sec=v["evals"] / max(v["seconds"], 1e-9),
+                    decode_share=v["decode"] / max(v["seconds"], 1e-9))
+            for k, v in self._variants.items()
+        }
+        return rec
+
+    def write(self, event: str = "progress") -> None:
+        rec = self.snapshot(event)
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+        tmp = self.prom_path.with_suffix(".prom.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus(rec))
+        os.replace(tmp, self.prom_path)
+        self._last_write = time.time()
+
+    def prometheus(self, rec: Dict[str, Any]) -> str:
+        w = self.worker
+        out = []
+
+        def metric(name: str, kind: str, help_: str, samples):
+            out.append(f"# HELP rk_{name} {help_}")
+            out.append(f"# TYPE rk_{name} {kind}")
+            for labels, value in samples:
+                out.append(f"rk_{name}{{{labels}}} {float(value)!r}")
+
+        metric("sweep_running", "gauge", "1 while the sweep runs, 0 after it finished or aborted",
+               [(_labels(worker=w), int(rec["running"]))])
+        metric("jobs_done_total", "counter", "Finished runs", [(_labels(worker=w), rec["jobs_done"])])
+        metric("jobs_queued", "gauge", "Planned runs not finished yet", [(_labels(worker=w), rec["jobs_queued"])])
+        metric("eta_seconds", "gauge", "Queued runs times the mean run duration", [(_labels(worker=w), rec["eta_seconds"])])
+        metric("last_update_timestamp_seconds", "gauge", "Time of this snapshot", [(_labels(worker=w), rec["t"])])
+        if "instance" in rec:
+            job = _labels(worker=w, instance=rec["instance"], variant=rec["variant"], trial=rec["trial"])
+            metric("job_evals_per_second", "gauge", "Evaluations per second of the running job", [(job, rec["evals_per_sec"])])
+            metric("job_best_V", "gauge", "Best utilization of the running job", [(job, rec["best_V"])])
+            metric("job_evals", "gauge", "Evaluations of the running job", [(job, rec["n_evals"])])
+            metric("job_seconds_since_improvement", "gauge", "Seconds since the running job last improved",
+                   [(job, rec["since_improvement"])])
+            metric("job_decode_share", "gauge", "Fraction of the running job's time spent decoding", [(job, rec["decode_share"])])
+        vs = rec["variants"]
+        if vs:
+            metric("variant_evals_per_second", "gauge", "Mean evaluations per second of finished runs",
+                   [(_labels(worker=w, variant=k), v["evals_per_sec"]) for k, v in vs.items()])
+            metric("variant_decode_share", "gauge", "Decoder time share of finished runs",
+                   [(_labels(worker=w, variant=k), v["decode_share"]) for k, v in vs.items()])
+            metric("variant_jobs_total", "counter", "Finished runs per variant",
+                   [(_labels(worker=w, variant=k), v["jobs"]) for k, v in vs.items()])
+        return "\n".join(out) + "\n"
@@ -0,0 +1,168 @@
+"""Cooperative portfolio: several optimizers on one instance, sharing an incumbent.
+
+Each member variant (by default A3, GA, PSO and SA) runs in its own process on the
+same wall-clock budget. Members publish every new best into a shared-memory
+incumbent and, every `sync_every` seconds, send a better shared incumbent into their
+own optimizer generator (see rk_adels.anytime), which adopts it into its population
+or chain. The portfolio reports the shared incumbent and the summed evaluations.
+
+Members compete for cores: the portfolio pays off with at least as many free cores
+as members.
+
+With a `checkpoint`, member k checkpoints to `checkpoint.member(k)` and resumes from
+it. Incumbent exchange follows wall time, so a resumed portfolio does not repeat the
+original run exactly.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .anytime import CancelToken, RunControl, StopRun, drain
+from .checkpoint import Checkpoint
+from .de import DEResult, Decoder, EvalInfo, _result
+from .genotype import Genotype
+from .instance import Instance
+
+PORTFOLIO = ("A3", "GA", "PSO", "SA")
+
+_VERSION, _F, _V, _PLACED, _HMAX, _DMAX, _STOP = range(7)
+_HEADER = 7
+
+
+class SharedIncumbent:
+    """Best (x, EvalInfo) so far plus per-member evaluation counters in one shared array."""
+
+    def __init__(self, arr, n: int, n_members: int):
+        # n: length of x (2 * inst.n, or Genotype.dim)
+        self.arr = arr
+        self.n = n
+        self.n_members = n_members
+
+    @staticmethod
+    def create(ctx, n: int, n_members: int) -> "SharedIncumbent":
+        arr = ctx.Array("d", _HEADER + n_members + n)
+        arr[_F] = -np.inf
+        return SharedIncumbent(arr, n, n_members)
+
+    def _x(self) -> np.ndarray:
+        off = _HEADER + self.n_members
+        return np.frombuffer(self.arr.get_obj(), dtype=np.float64)[off:off + self.n]
+
+    def publish(self, x: np.ndarray, ev: EvalInfo) -> bool:
+        with self.arr.get_lock():
+            if ev.f <= self.arr[_F]:
+                return False
+            self._x()[:] = x
+            self.arr[_F], self.arr[_V], self.arr[_PLACED] = ev.f, ev.V, ev.placed
+            self.arr[_HMAX], self.arr[_DMAX] = ev.H_max, ev.D_max
+            self.arr[_VERSION] += 1
+            return True
+
+    def snapshot(self) -> Tuple[int, Optional[np.ndarray], Optional[EvalInfo]]:
+        """(version, x, EvalInfo); x and EvalInfo are None before the first publish."""
+        with self.arr.get_lock():
+            ver = int(self.arr[_VERSION])
+            if ver == 0:
+                return 0, None, None
+            ev = EvalInfo(V=self.arr[_V], f=self.arr[_F], placed=int(self.arr[_PLACED]),
+                          H_max=self.arr[_HMAX], D_max=self.arr[_DMAX], eval_time=0.0)
+            return ver, self._x().copy(), ev
+
+    def count(self, member: int, n_evals: int) -> None:
+        self.arr[_HEADER + member] = n_evals
+
+    def total_evals(self) -> int:
+        return int(sum(self.arr[_HEADER:_HEADER + self.n_members]))
+
+    def stop(self) -> None:
+        self.arr[_STOP] = 1.0
+
+    @property
+    def stopped(self) -> bool:
+        return self.arr[_STOP] != 0.0
+
+
+def _member(inst: Instance, variant: str, seconds: float, NP: int, seed: int, decoder: Optional[Decoder],
+            genotype: Optional[Genotype], inc: SharedIncumbent, member: int, sync_every: float,
+            checkpoint: Optional[Checkpoint] = None) -> None:
+    from .runner import iter_variant
+
+    gen = iter_variant(inst, variant, seconds, NP, seed, decoder=decoder, genotype=genotype, checkpoint=checkpoint)
+    last_sync = time.time()
+    offer = None
+    try:
+        while True:
+            try:
+                p = gen.send(offer) if offer is not None else next(gen)
+            except StopIteration:
+                return
+            offer = None
+            inc.count(member, p.n_evals)
+            if p.improved:
+                inc.publish(p.best_x, p.best_eval)
+            if inc.stopped:
+                return
+            now = time.time()
+            if now - last_sync >= sync_every:
+                last_sync = now
+                _, x, ev = inc.snapshot()
+                if ev is not None and ev.f > p.best_eval.f:
+                    offer = (x, ev)
+    finally:
+        gen.close()
+
+
+def iter_portfolio(inst: Instance, *, seconds: float, seed: int, NP: int = 50,
+                   members: Sequence[str] = PORTFOLIO, sync_every: float = 0.5, poll: float = 0.05,
+                   decoder: Optional[Decoder] = None, genotype: Optional[Genotype] = None,
+                   cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+                   checkpoint: Optional[Checkpoint] = None):
+    """Run `members` (runner variant names) in parallel processes; yields a Progress for
+    every new shared incumbent and returns it as the DEResult (n_evals summed over members)."""
+    ctx = mp.get_context()
+    inc = SharedIncumbent.create(ctx, genotype.dim if genotype is not None else 2 * inst.n, len(members))
+    ckpts = [checkpoint.member(k) if checkpoint is not None else None for k in range(len(members))]
+    procs = [ctx.Process(target=_member, daemon=True,
+                         args=(inst, v, seconds, NP, seed + 7919 * k, decoder, genotype, inc, k, sync_every, ckpts[k]))
+             for k, v in enumerate(members)]
+    ctl = RunControl(seconds, cancel, target_V, inst)
+    used = [st["meta"]["elapsed"] for st in (c.load() for c in ckpts if c is not None) if st is not None]
+    if used:  # resumed members count their used budget, so does the portfolio
+        ctl.charge(max(used))
+    for pr in procs:
+        pr.start()
+    seen = 0
+
+    try:
+        while any(pr.is_alive() for pr in procs):
+            time.sleep(poll)
+            if cancel is not None and cancel.cancelled:
+                ctl.stop = "cancelled"
+                raise StopRun
+            ver, x, ev = inc.snapshot()
+            if ver != seen and ev is not None:
+                seen = ver
+                yield from ctl.step(inc.total_evals(), x, ev, True)
+    except StopRun:
+        pass
+    finally:
+        inc.stop()
+        for pr in procs:
+            pr.join(5.0)
+            if pr.is_alive():
+                pr.terminate()
+
+    ver, x, ev = inc.snapshot()
+    if ev is None:
+        raise RuntimeError("portfolio members finished without a single evaluation")
+    ctl.n_evals, ctl.best_x, ctl.best_eval = inc.total_evals(), x, ev
+    return _result(ctl)
+
+
+def run_portfolio(inst: Instance, *, seconds: float, seed: int, **kw) -> DEResult:
+    """Blocking portfolio; keyword arguments as for iter_portfolio."""
+    return drain(iter_portfolio(inst, seconds=seconds, seed=seed, **kw))
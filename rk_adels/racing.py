@@ -0,0 +1,167 @@
+"""F-race style elimination of dominated variants.
+
+Trials of one instance are run in rounds; each trial is a block in which every
+surviving variant is run once (with paired seeds). After each round with at least
+`first_test` blocks, the Friedman test is applied to the blocks x variants matrix
+of results. If it rejects equality at level `alpha`, every variant whose rank sum
+differs from the best one by more than the Conover post-hoc critical difference is
+dropped (Birattari et al., "A racing algorithm for configuring metaheuristics").
+
+Only the standard library and NumPy are used: the chi-square tail comes from the
+regularized incomplete gamma function and the Student-t quantile from a
+Cornish-Fisher expansion of the normal quantile.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+RACE_COLUMNS = ("race_dropped", "race_dropped_at", "race_p")
+
+
+def _gammq(a: float, x: float) -> float:
+    """Regularized upper incomplete gamma Q(a, x)."""
+    if x <= 0.0:
+        return 1.0
+    lg = math.lgamma(a)
+    if x < a + 1.0:
+        # Series for P(a, x)
+        ap, s, d = a, 1.0 / a, 1.0 / a
+        for _ in range(1000):
+            ap += 1.0
+            d *= x / ap
+            s += d
+            if abs(d) < abs(s) * 1e-15:
+                break
+        return max(0.0, 1.0 - s * math.exp(-x + a * math.log(x) - lg))
+    # Continued fraction for Q(a, x) (modified Lentz)
+    tiny = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return min(1.0, math.exp(-x + a * math.log(x) - lg) * h)
+
+
+def chi2_sf(x: float, df: float) -> float:
+    return _gammq(0.5 * df, 0.5 * x)
+
+
+def t_ppf(q: float, df: float) -> float:
+    """Student-t quantile (Cornish-Fisher expansion around the normal quantile)."""
+    z = NormalDist().inv_cdf(q)
+    if df <= 0:
+        return float("nan")
+    g1 = (z**3 + z) / 4.0
+    g2 = (5 * z**5 + 16 * z**3 + 3 * z) / 96.0
+    g3 = (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384.0
+    g4 = (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160.0
+    return z + g1 / df + g2 / df**2 + g3 / df**3 + g4 / df**4
+
+
+def _ranks(Y: np.ndarray) -> np.ndarray:
+    """Within-row ranks 1..k (k = best, i.e. largest value), ties averaged."""
+    b, k = Y.shape
+    R = np.empty((b, k), dtype=float)
+    for i in range(b):
+        order = np.argsort(Y[i], kind="mergesort")
+        vals = Y[i, order]
+        r = np.empty(k, dtype=float)
+        j = 0
+        while j < k:
+            m = j
+            while m + 1 < k and vals[m + 1] == vals[j]:
+                m += 1
+            r[j:m + 1] = 0.5 * (j + m) + 1.0
+            j = m + 1
+        R[i, order] = r
+    return R
+
+
+@dataclass
+class RaceStep:
+    p_value: float
+    best: int
+    drop: List[int] = field(default_factory=list)
+
+
+def friedman_race_step(Y: np.ndarray, alpha: float = 0.05) -> RaceStep:
+    """Friedman test plus Conover post-hoc against the best column of Y (blocks x variants,
+    larger is better). Returns the test's p-value, the best column and the columns to drop."""
+    Y = np.asarray(Y, dtype=float)
+    b, k = Y.shape
+    if b < 2 or k < 2:
+        return RaceStep(p_value=float("nan"), best=int(np.argmax(Y.mean(axis=0))) if k else -1)
+    R = _ranks(Y)
+    Rj = R.sum(axis=0)
+    best = int(np.argmax(Rj))
+    A = float((R**2).sum())
+    C = b * k * (k + 1) ** 2 / 4.0
+    if A - C <= 1e-12:  # all rows tied: nothing to tell apart
+        return RaceStep(p_value=1.0, best=best)
+    T = (k - 1) * float(((Rj - b * (k + 1) / 2.0) ** 2).sum()) / (A - C)
+    p = chi2_sf(T, k - 1)
+    step = RaceStep(p_value=p, best=best)
+    if p >= alpha:
+        return step
+    dof = (b - 1) * (k - 1)
+    crit = t_ppf(1.0 - alpha / 2.0, dof) * math.sqrt(
+        max(0.0, 2.0 * b * (1.0 - T / (b * (k - 1))) * (A - C) / dof)
+    )
+    step.drop = [j for j in range(k) if j != best and Rj[best] - Rj[j] > crit]
+    return step
+
+
+class Race:
+    """Racing state for one instance: which variants are still running."""
+
+    def __init__(self, variants: Sequence[str], alpha: float = 0.05, first_test: int = 5):
+        self.variants = list(variants)
+        self.alpha = float(alpha)
+        self.first_test = max(2, int(first_test))
+        self.alive = list(variants)
+        self.dropped_at: Dict[str, int] = {}
+        self.p_at_drop: Dict[str, float] = {}
+        self._scores: Dict[str, List[float]] = {v: [] for v in variants}
+
+    def add(self, variant: str, score: float) -> None:
+        self._scores[variant].append(float(score))
+
+    def end_round(self, trial: int) -> List[str]:
+        """Test after a completed block; returns the variants dropped now."""
+        b = min(len(self._scores[v]) for v in self.alive) if self.alive else 0
+        if len(self.alive) < 2 or b < self.first_test:
+            return []
+        Y = np.array([self._scores[v][-b:] for v in self.alive]).T
+        step = friedman_race_step(Y, self.alpha)
+        dropped = [self.alive[j] for j in step.drop]
+        for v in dropped:
+            self.dropped_at[v] = trial
+            self.p_at_drop[v] = step.p_value
+        self.alive = [v for v in self.alive if v not in dropped]
+        return dropped
+
+    def flags(self, variant: str) -> Dict[str, object]:
+        """Race columns for the run rows of `variant` (see RACE_COLUMNS)."""
+        dropped = variant in self.dropped_at
+        return {
+            "race_dropped": dropped,
+            "race_dropped_at": self.dropped_at.get(variant, -1),
+            "race_p": self.p_at_drop.get(variant, float("nan")),
+        }
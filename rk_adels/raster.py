@@ -0,0 +1,88 @@
+"""Raster points (normal patterns) of an instance along the container floor axes.
+
+For integer data, a box in a packing can always be pushed towards the origin until it
+touches a wall or another box, so the only x positions worth trying are the normal
+patterns: sums of the x extents of a subset of the other boxes that stay within W
+(Herz; Christofides and Whitlock). Each box contributes at most once and only with the
+extents of its `vert_ok`-feasible orientations. Raster points are the normal patterns
+reduced to {<W - r> : r normal}, where <s> is the largest normal pattern <= s
+(Scheithauer and Terno).
+
+`decode_wall_heightmap` already generates only normal patterns: its anchors are 0 and
+the far edges of placed boxes, i.e. sums of placed extents. What the raster view adds
+is the upper end: a position is useless once no box still to be packed fits between it
+and the wall, and the decoder drops such anchors (see `decode_wall_heightmap`). The
+sets here are for analysis (`scripts.bench_decoder --raster`) and for search
+heuristics that want the position grid up front.
+"""
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .instance import Instance, InstanceCache, orientations
+
+MAX_RASTER_LENGTH = 1 << 20  # bitset DP only for integer containers up to this length
+
+
+def _is_integral(v: float) -> bool:
+    return float(v).is_integer()
+
+
+def normal_patterns(inst: Instance, axis: str = "x") -> Optional[List[int]]:
+    """Sorted normal patterns along W ("x"), H ("y") or D ("z"); None for non-integer data."""
+    c = inst.container
+    k = "xyz".index(axis)
+    L = (c.W, c.H, c.D)[k]
+    if not _is_integral(L) or L > MAX_RASTER_LENGTH:
+        return None
+    L = int(L)
+    mask = (1 << (L + 1)) - 1
+    reach = 1  # bit p set <=> p is a reachable sum
+    for t in inst.types:
+        ext = sorted({o[k] for o in orientations(t.w, t.h, t.d, t.vert_ok)})
+        if any(not _is_integral(e) for e in ext):
+            return None
+        ext = [int(e) for e in ext if e <= L]
+        for _ in range(int(t.q)):
+            nxt = reach
+            for e in ext:
+                nxt |= (reach << e) & mask
+            if nxt == reach:  # saturated: more copies of this type add nothing
+                break
+            reach = nxt
+    return [p for p in range(L + 1) if reach >> p & 1]
+
+
+def reduce_patterns(patterns: List[int], L: int) -> List[int]:
+    """Raster points {<L - r> : r in patterns}, <s> = largest pattern <= s."""
+    out = {patterns[bisect.bisect_right(patterns, L - r) - 1] for r in patterns}
+    return sorted(out)
+
+
+@dataclass
+class RasterPoints:
+    x: Optional[List[int]]   # raster points along W (None: not an integer instance)
+    z: Optional[List[int]]   # raster points along D
+    x_normal: int = 0        # number of normal patterns before reduction
+    z_normal: int = 0
+
+
+def _compute_raster_points(inst: Instance) -> RasterPoints:
+    c = inst.container
+    nx, nz = normal_patterns(inst, "x"), normal_patterns(inst, "z")
+    return RasterPoints(
+        x=reduce_patterns(nx, int(c.W)) if nx is not None else None,
+        z=reduce_patterns(nz, int(c.D)) if nz is not None else None,
+        x_normal=len(nx or []),
+        z_normal=len(nz or []),
+    )
+
+
+_CACHE: "InstanceCache[RasterPoints]" = InstanceCache(_compute_raster_points)
+
+
+def raster_points(inst: Instance) -> RasterPoints:
+    """Per-instance raster points (computed once per Instance object, see InstanceCache)."""
+    return _CACHE(inst)
@@ -0,0 +1,129 @@
+"""Per-run resource accounting.
+
+`ResourceMeter` wraps one optimizer run and reports, as run-table columns:
+
+  cpu_user, cpu_sys    CPU seconds of the process and of the child processes it
+                       reaped during the run (os.times deltas; all threads)
+  cpu_children         the part of cpu_user + cpu_sys spent in child processes (PT
+                       with workers, PF members); 0 for in-process runs
+  cpu_util             (cpu_user + cpu_sys) / wall seconds; well below 1 on a
+                       single-threaded run means the process was waiting (contention),
+                       above 1 means child processes ran in parallel
+  peak_rss_mb          process peak resident set size at the end of the run (a
+                       high-water mark over the whole process, not just this run;
+                       nan where the `resource` module is unavailable)
+  child_peak_rss_mb    largest peak RSS of any reaped child process so far (also a
+                       high-water mark over the whole process; 0 without children)
+  gc_collections       garbage collections (all generations) during the run
+  alloc_sampled        decodes traced with tracemalloc (0 unless sampling is on)
+  alloc_peak_kb        mean Python-level allocation peak of a sampled decode
+  hm_allocs_per_decode mean heightmap buffer allocations of a sampled decode
+
+Allocation sampling is opt-in (`alloc_every=k` traces every k-th decode) because
+tracemalloc slows the traced decodes down several times.
+"""
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+RESOURCE_COLUMNS = (
+    "cpu_user", "cpu_sys", "cpu_children", "cpu_util", "peak_rss_mb", "child_peak_rss_mb", "gc_collections",
+    "alloc_sampled", "alloc_peak_kb", "hm_allocs_per_decode",
+)
+
+try:
+    import resource as _resource
+except ImportError:  # pragma: no cover - Windows
+    _resource = None
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    if _resource is None:
+        return float("nan")
+    kb = _resource.getrusage(_resource.RUSAGE_CHILDREN if children else _resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return kb / (1024.0 * 1024.0) if sys.platform == "darwin" else kb / 1024.0
+
+
+def _gc_collections() -> int:
+    return sum(s.get("collections", 0) for s in gc.get_stats())
+
+
+class AllocSampler:
+    """Traces every `every`-th decode with tracemalloc (installed into rk_adels.de)."""
+
+    def __init__(self, every: int):
+        self.every = max(1, int(every))
+        self.calls = 0
+        self.sampled = 0
+        self.peak_bytes = 0
+        self.hm_allocs = 0
+
+    def decode(self, fn: Callable[..., Any], *args, **kwargs):
+        self.calls += 1
+        if (self.calls - 1) % self.every or tracemalloc.is_tracing():
+            return fn(*args, **kwargs)
+        tracemalloc.start()
+        try:
+            res = fn(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.sampled += 1
+        self.peak_bytes += peak
+        self.hm_allocs += getattr(res, "hm_allocs", 0)
+        return res
+
+
+class ResourceMeter:
+    """Context manager measuring one run; `as_dict()` gives the RESOURCE_COLUMNS."""
+
+    def __init__(self, alloc_every: int = 0):
+        self.alloc_every = int(alloc_every)
+        self.sampler = AllocSampler(alloc_every) if alloc_every > 0 else None
+        self._prev_sampler = None
+        self.stats: Dict[str, float] = {k: float("nan") for k in RESOURCE_COLUMNS}
+
+    def __enter__(self) -> "ResourceMeter":
+        from . import de
+
+        if self.sampler is not None:
+            self._prev_sampler, de.ALLOC_SAMPLER = de.ALLOC_SAMPLER, self.sampler
+        self._t = os.times()
+        self._wall = time.perf_counter()
+        self._gc = _gc_collections()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        from . import de
+
+        t = os.times()
+        wall = time.perf_counter() - self._wall
+        if self.sampler is not None:
+            de.ALLOC_SAMPLER = self._prev_sampler
+        # Children count once they have been waited for; PT and PF join theirs before returning.
+        c_user = t.children_user - self._t.children_user
+        c_sys = t.children_system - self._t.children_system
+        user = t.user - self._t.user + c_user
+        sys_ = t.system - self._t.system + c_sys
+        s = self.sampler
+        self.stats = {
+            "cpu_user": user,
+            "cpu_sys": sys_,
+            "cpu_children": c_user + c_sys,
+            "cpu_util": (user + sys_) / wall if wall > 0 else float("nan"),
+            "peak_rss_mb": peak_rss_mb(),
+            "child_peak_rss_mb": peak_rss_mb(children=True),
+            "gc_collections": float(_gc_collections() - self._gc),
+            "alloc_sampled": float(s.sampled) if s is not None else 0.0,
+            "alloc_peak_kb": s.peak_bytes / 1024.0 / s.sampled if s is not None and s.sampled else float("nan"),
+            "hm_allocs_per_decode": s.hm_allocs / s.sampled if s is not None and s.sampled else float("nan"),
+        }
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(self.stats)
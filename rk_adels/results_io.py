@@ -0,0 +1,211 @@
+"""Run-table I/O for ablation campaigns.
+
+`runs.csv` stays the default. For large campaigns the same rows can be written
+as a columnar Parquet or Feather (Arrow IPC) file, appended in row groups while
+the sweep runs, and read back with column projection so aggregation only touches
+the columns it needs. Campaign-level metadata (CLI arguments, start time) is kept
+in the file's schema metadata for the columnar formats.
+
+pyarrow is only needed for the columnar formats and is imported lazily.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+RUN_FORMATS = ("csv", "parquet", "feather")
+_SUFFIX = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+_META_KEY = b"rk_adels"
+
+PathLike = Union[str, Path]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa  # noqa: F401
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise ImportError("Parquet/Feather run tables need pyarrow (pip install pyarrow)") from e
+    return pa
+
+
+def format_from_path(path: PathLike) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".feather", ".arrow", ".ipc"):
+        return "feather"
+    return "csv"
+
+
+def runs_path(out_dir: PathLike, fmt: str = "csv", stem: str = "runs") -> Path:
+    if fmt not in RUN_FORMATS:
+        raise ValueError(f"Unknown run-table format: {fmt} (expected one of {RUN_FORMATS})")
+    return Path(out_dir) / f"{stem}{_SUFFIX[fmt]}"
+
+
+class RunsWriter:
+    """Append run rows (dicts) to a CSV, Parquet or Feather file in row groups.
+
+    The column set is `columns` if given, else the keys of the first flushed row group.
+    Later rows may leave columns out (nulls), but a key outside the column set raises
+    ValueError instead of being dropped. Arrow columns that are all null in the first
+    row group get the type from `types` (pyarrow type names, e.g. {"note": "string"}),
+    float64 by default.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        fmt: Optional[str] = None,
+        row_group_size: int = 1000,
+        metadata: Optional[Dict[str, Any]] = None,
+        columns: Optional[Sequence[str]] = None,
+        types: Optional[Dict[str, str]] = None,
+    ):
+        self.path = Path(path)
+        self.fmt = fmt or format_from_path(self.path)
+        if self.fmt not in RUN_FORMATS:
+            raise ValueError(f"Unknown run-table format: {self.fmt} (expected one of {RUN_FORMATS})")
+        self.row_group_size = max(1, int(row_group_size))
+        self.metadata = dict(metadata or {})
+        self.n_rows = 0
+        self._buf: List[Dict[str, Any]] = []
+        self._columns: Optional[List[str]] = list(columns) if columns is not None else None
+        self._types = dict(types or {})
+        self._schema = None
+        self._writer = None
+        self._sink = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt != "csv":
+            _require_pyarrow()
+
+    def _check(self, rows: Sequence[Dict[str, Any]]) -> None:
+        known = set(self._columns or ())
+        extra = sorted({k for r in rows for k in r if k not in known})
+        if extra:
+            raise ValueError(f"Run row has columns outside the table's column set: {extra} "
+                             f"(declare them with RunsWriter(columns=...))")
+
+    def append(self, row: Dict[str, Any]) -> None:
+        if self._columns is not None:
+            self._check([row])
+        self._buf.append(row)
+        if len(self._buf) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        if self._columns is None:
+            cols: List[str] = []
+            for r in self._buf:
+                for k in r:
+                    if k not in cols:
+                        cols.append(k)
+            self._columns = cols
+        self._check(self._buf)
+        rows = [{c: r.get(c) for c in self._columns} for r in self._buf]
+        if self.fmt == "csv":
+            self._flush_csv(rows)
+        else:
+            self._flush_arrow(rows)
+        self.n_rows += len(rows)
+        self._buf = []
+
+    def _flush_csv(self, rows: List[Dict[str, Any]]) -> None:
+        first = self._sink is None
+        if first:
+            self._sink = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.DictWriter(self._sink, fieldnames=self._columns)
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._sink.flush()
+
+    def _flush_arrow(self, rows: List[Dict[str, Any]]) -> None:
+        import pyarrow as pa
+
+        if self._schema is None:
+            inferred = pa.Table.from_pylist(rows).schema
+            fields = [pa.field(f.name, pa.type_for_alias(self._types.get(f.name, "float64")))
+                      if pa.types.is_null(f.type) else f for f in inferred]
+            meta = {_META_KEY: json.dumps(self.metadata, default=str).encode("utf-8")}
+            self._schema = pa.schema(fields, metadata=meta)
+            table = pa.Table.from_pylist(rows, schema=self._schema)
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(str(self.path), self._schema)
+            else:
+                self._sink = pa.OSFile(str(self.path), "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+        else:
+            table = pa.Table.from_pylist(rows, schema=self._schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(table, row_group_size=len(rows))
+        else:
+            self._writer.write_table(table)
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None and self.fmt != "csv":
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._writer = None
+        self._sink = None
+
+    def __enter__(self) -> "RunsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_runs(path: PathLike, columns: Optional[Sequence[str]] = None):
+    """Load a run (or summary) table as a DataFrame, reading only `columns` if given.
+
+    Requested columns that are missing from the file are skipped rather than raising,
+    so readers can project optional columns added by newer campaigns.
+    """
+    import pandas as pd
+
+    fmt = format_from_path(path)
+    if columns is not None:
+        avail = set(table_columns(path))
+        columns = [c for c in columns if c in avail]
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def table_columns(path: PathLike) -> List[str]:
+    """Column names of a run table without loading its data."""
+    fmt = format_from_path(path)
+    if fmt == "csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return next(csv.reader(f), [])
+    return list(_arrow_schema(path).names)
+
+
+def read_metadata(path: PathLike) -> Dict[str, Any]:
+    """Campaign metadata stored in a Parquet/Feather run table ({} for CSV)."""
+    if format_from_path(path) == "csv":
+        return {}
+    meta = _arrow_schema(path).metadata or {}
+    raw = meta.get(_META_KEY)
+    return json.loads(raw.decode("utf-8")) if raw else {}
+
+
+def _arrow_schema(path: PathLike):
+    pa = _require_pyarrow()
+    if format_from_path(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(str(path))
+    with pa.memory_map(str(path), "r") as src:
+        return pa.ipc.open_file(src).schema
+
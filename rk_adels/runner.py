@@ -1,20 +1,34 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
 import time
-import pandas as pd
 
 from .instance import Instance
+from .genotype import Genotype
+from .results_io import read_runs
+from .resources import ResourceMeter
+from .bounds import instance_bounds
+from .surrogate import SCREEN_COLUMNS
+from .anytime import CancelToken, Progress, drain
+from .checkpoint import Checkpoint
 from .de import (
-    run_decoder_only,
-    run_rk_de,
-    run_rk_ade,
-    run_random_search,
-    run_ga,
-    run_sa,
-    run_pso,
+    DEResult,
+    Decoder,
+    decode_x,
+    iter_decoder_only,
+    iter_rk_de,
+    iter_rk_ade,
+    iter_lshade,
+    iter_random_search,
+    iter_ga,
+    iter_sa,
+    iter_pso,
+    iter_pt,
 )
 
+if TYPE_CHECKING:  # pandas is only imported when runs are summarized
+    import pandas as pd
+
 @dataclass
 class RunConfig:
     seconds: float = 30.0
@@ -22,35 +36,96 @@ class RunConfig:
     seed: int = 123
     trials: int = 10
 
-def run_variant(inst: Instance, variant: str, seconds: float, NP: int, seed: int) -> Dict[str, Any]:
-    t0 = time.time()
+# Fraction of each generation's trials decoded by the surrogate-screened variants (A2S/A3S/GAS).
+SURROGATE_FRAC = 0.3
+
+def make_decoder(name: str = "full", section_items: int = 250) -> Optional[Decoder]:
+    """Decoder by name: "full" (None, i.e. decode_wall_heightmap) or "sections"
+    (rk_adels.sections.SectionDecoder with about `section_items` items per section)."""
+    if name == "full":
+        return None
+    if name == "sections":
+        from .sections import SectionDecoder
+        return SectionDecoder(section_items=section_items)
+    raise ValueError(f"Unknown decoder: {name}")
+
+# Variants whose optimizer can checkpoint and resume its state (rk_adels.checkpoint).
+CHECKPOINT_VARIANTS = ("H0", "A1", "A2", "A3", "A2S", "A3S", "SH", "SHLS", "GA", "GAS", "RS", "SA", "PSO", "PT", "PF")
+
+def make_genotype(name: str, inst: Instance) -> Optional[Genotype]:
+    """Genotype layout by name: "full" (None, 2n keys) or "compact" (rk_adels.genotype.Genotype,
+    one orientation key per item with more than one feasible orientation)."""
+    if name == "full":
+        return None
+    if name == "compact":
+        return Genotype(inst)
+    raise ValueError(f"Unknown genotype: {name}")
+
+def iter_variant(inst: Instance, variant: str, seconds: float, NP: int, seed: int,
+                 cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+                 decoder: Optional[Decoder] = None, workers: int = 0, genotype: Optional[Genotype] = None,
+                 checkpoint: Optional[Checkpoint] = None):
+    """Optimizer generator for one variant (yields Progress, returns DEResult; see rk_adels.anytime).
+    `workers` > 1 runs the replicas of PT in that many processes. `checkpoint`
+    (rk_adels.checkpoint) is supported by the variants in CHECKPOINT_VARIANTS."""
+    opts = dict(cancel=cancel, target_V=target_V, decoder=decoder, genotype=genotype)
+    if checkpoint is not None:
+        if variant not in CHECKPOINT_VARIANTS:
+            raise ValueError(f"Variant {variant} does not support checkpoints (only {', '.join(CHECKPOINT_VARIANTS)})")
+        opts["checkpoint"] = checkpoint
     if variant == "H0":
-        res = run_decoder_only(inst, seconds=seconds, seed=seed)
-    elif variant == "A1":
-        res = run_rk_de(inst, seconds=seconds, seed=seed, NP=NP)
-    elif variant == "A2":
-        res = run_rk_ade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=False)
-    elif variant == "A3":
-        res = run_rk_ade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=True)
-    elif variant == "RS":
-        res = run_random_search(inst, seconds=seconds, seed=seed)
-    elif variant == "GA":
-        res = run_ga(inst, seconds=seconds, seed=seed, NP=NP)
-    elif variant == "SA":
-        res = run_sa(inst, seconds=seconds, seed=seed)
-    elif variant == "PSO":
-        res = run_pso(inst, seconds=seconds, seed=seed, NP=NP)
-    else:
-        raise ValueError(f"Unknown variant: {variant}")
-    t1 = time.time()
+        return iter_decoder_only(inst, seconds=seconds, seed=seed, **opts)
+    if variant == "A1":
+        return iter_rk_de(inst, seconds=seconds, seed=seed, NP=NP, **opts)
+    if variant == "A2":
+        return iter_rk_ade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=False, **opts)
+    if variant == "A3":
+        return iter_rk_ade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=True, **opts)
+    if variant == "A2S":
+        return iter_rk_ade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=False, surrogate_frac=SURROGATE_FRAC, **opts)
+    if variant == "SH":
+        return iter_lshade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=False, **opts)
+    if variant == "SHLS":
+        return iter_lshade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=True, **opts)
+    if variant == "A3S":
+        return iter_rk_ade(inst, seconds=seconds, seed=seed, NP=NP, use_local_search=True, surrogate_frac=SURROGATE_FRAC, **opts)
+    if variant == "GAS":
+        return iter_ga(inst, seconds=seconds, seed=seed, NP=NP, surrogate_frac=SURROGATE_FRAC, **opts)
+    if variant == "RS":
+        return iter_random_search(inst, seconds=seconds, seed=seed, **opts)
+    if variant == "GA":
+        return iter_ga(inst, seconds=seconds, seed=seed, NP=NP, **opts)
+    if variant == "SA":
+        return iter_sa(inst, seconds=seconds, seed=seed, **opts)
+    if variant == "PSO":
+        return iter_pso(inst, seconds=seconds, seed=seed, NP=NP, **opts)
+    if variant == "PT":
+        return iter_pt(inst, seconds=seconds, seed=seed, workers=workers, **opts)
+    if variant == "PF":
+        from .portfolio import iter_portfolio
+        return iter_portfolio(inst, seconds=seconds, seed=seed, NP=NP, **opts)
+    raise ValueError(f"Unknown variant: {variant}")
+
+def solve_variant(inst: Instance, variant: str, seconds: float, NP: int, seed: int,
+                  cancel: Optional[CancelToken] = None, target_V: Optional[float] = None,
+                  callback: Optional[Callable[[Progress], None]] = None,
+                  decoder: Optional[Decoder] = None, workers: int = 0,
+                  genotype: Optional[Genotype] = None, checkpoint: Optional[Checkpoint] = None) -> DEResult:
+    """Run one variant and return the optimizer result; `callback` sees every Progress."""
+    return drain(iter_variant(inst, variant, seconds, NP, seed, cancel=cancel, target_V=target_V,
+                              decoder=decoder, workers=workers, genotype=genotype, checkpoint=checkpoint), callback)
+
+def result_row(inst: Instance, variant: str, seconds: float, NP: int, seed: int, res: DEResult, wallclock: float) -> Dict[str, Any]:
+    """One run-table row for an optimizer result."""
     e = res.best_eval
+    V_bound = instance_bounds(inst).V_ub
     return {
         "instance": inst.name,
         "variant": variant,
         "seed": seed,
         "seconds_budget": seconds,
         "seconds_used": res.seconds,
-        "wallclock": t1 - t0,
+        "wallclock": wallclock,
         "NP": NP,
         "V_best": e.V,
         "f_best": e.f,
@@ -59,9 +134,123 @@ def run_variant(inst: Instance, variant: str, seconds: float, NP: int, seed: int
         "D_max": e.D_max,
         "n_evals": res.n_evals,
         "evals_per_sec": res.n_evals / max(res.seconds, 1e-9),
+        "V_bound": V_bound,
+        "V_gap": V_bound - e.V,
+        "at_bound": res.stop == "bound",
+        # Same columns for every variant so streamed run tables keep one schema.
+        **{k: float("nan") for k in SCREEN_COLUMNS},
+        **(res.stats or {}),
     }
 
-def summarize_runs(df: pd.DataFrame) -> pd.DataFrame:
+def run_variant(inst: Instance, variant: str, seconds: float, NP: int, seed: int, validate: bool = False,
+                decoder: Optional[Decoder] = None, block_items: Optional[int] = None, alloc_every: int = 0,
+                genotype: str = "full", **anytime) -> Dict[str, Any]:
+    """Run one variant; with validate=True the best packing is re-decoded and checked
+    (raises rk_adels.validate.PackingError if it is infeasible or misreported).
+
+    With `block_items`, identical boxes are first aggregated into blocks of up to that many
+    boxes (rk_adels.blocks) and the optimizer searches over blocks; placed_best and f_best
+    then refer to the expanded per-box packing and the row gets n_blocks.
+    `genotype` is a make_genotype name; "compact" drops the inert orientation keys of the
+    searched instance (blocks included).
+    Rows carry the rk_adels.resources columns for the solve; `alloc_every=k` also traces
+    every k-th decode with tracemalloc. With `target_V` the run stops at that utilization and the
+    row gets evals_to_target / seconds_to_target (nan if not reached).
+    Extra keyword arguments (cancel, target_V, callback, workers, checkpoint) go to solve_variant."""
+    t0 = time.time()
+    plan = None
+    if block_items:
+        from .blocks import build_blocks
+        plan = build_blocks(inst, max_items=block_items)
+    search = plan.instance if plan else inst
+    gt = make_genotype(genotype, search)
+    with ResourceMeter(alloc_every=alloc_every) as meter:
+        res = solve_variant(search, variant, seconds=seconds, NP=NP, seed=seed,
+                            decoder=decoder, genotype=gt, **anytime)
+    t1 = time.time()
+    packed = None
+    if validate or plan is not None:
+        packed = decode_x(search, res.best_x, decoder=decoder, genotype=gt)
+        if plan is not None:
+            packed = plan.expand(packed)
+    if validate:
+        from .validate import validate_packing
+        validate_packing(inst, packed).raise_if_invalid()
+    row = result_row(inst, variant, seconds, NP, seed, res, t1 - t0)
+    row.update(meter.as_dict())
+    if plan is not None:
+        row.update(placed_best=packed.placed_count, f_best=packed.f, n_blocks=plan.n_blocks)
+    if anytime.get("target_V") is not None:
+        hit = res.stop == "target"
+        row.update(evals_to_target=res.n_evals if hit else float("nan"),
+                   seconds_to_target=res.seconds if hit else float("nan"))
+    return row
+
+SUMMARY_COLUMNS = ["instance", "variant", "V_best", "placed_best", "wallclock", "evals_per_sec"]
+# Present only in raced campaigns (run_ablation --race; see rk_adels.racing).
+RACE_SUMMARY_COLUMNS = ["race_dropped", "race_dropped_at"]
+# Present in run tables written since resource accounting was added (rk_adels.resources).
+RESOURCE_SUMMARY_COLUMNS = ["cpu_user", "cpu_sys", "cpu_util", "peak_rss_mb", "gc_collections", "alloc_peak_kb"]
+# Present in run tables written since child processes are accounted (PT with workers, PF).
+CHILD_SUMMARY_COLUMNS = ["cpu_children", "child_peak_rss_mb"]
+# Present in run tables written since upper bounds were added (rk_adels.bounds).
+BOUND_SUMMARY_COLUMNS = ["V_gap", "at_bound"]
+# Present in run tables of campaigns with a target utilization (run_variant(target_V=...)).
+TARGET_SUMMARY_COLUMNS = ["evals_to_target", "n_evals"]
+
+def summarize_runs(df) -> "pd.DataFrame":
+    """Instance x variant summary of a run table (DataFrame or path to runs.csv/.parquet/.feather).
+
+    For raced tables the summary also has n_runs, race_dropped and race_dropped_at
+    (trial after which the variant was eliminated on that instance, -1 if it survived).
+    With resource columns it has cpu_mean (user + sys seconds), cpu_sys_mean, cpu_util_mean,
+    rss_peak_mb (max), gc_mean and alloc_peak_kb_mean; newer tables add cpu_children_mean and
+    child_rss_peak_mb (cpu_mean then includes child processes). With a target utilization it has
+    target_hits, evals_to_target_mean (over the runs that hit) and ert_evals, the expected
+    decodes to target (all decodes spent, hit or not, divided by the hits; nan without hits).
+    With bound columns it has gap_mean / gap_min (V upper bound minus V_best) and bound_hits
+    (runs stopped early at a provably optimal V).
+    """
+    import pandas as pd
+
+    if not isinstance(df, pd.DataFrame):
+        df = read_runs(df, columns=SUMMARY_COLUMNS + RACE_SUMMARY_COLUMNS + RESOURCE_SUMMARY_COLUMNS + TARGET_SUMMARY_COLUMNS
+                      + BOUND_SUMMARY_COLUMNS + CHILD_SUMMARY_COLUMNS)
+    extra = {}
+    if all(c in df.columns for c in RACE_SUMMARY_COLUMNS):
+        extra.update(
+            n_runs=("V_best","size"),
+            race_dropped=("race_dropped","max"),
+            race_dropped_at=("race_dropped_at","max"),
+        )
+    if all(c in df.columns for c in RESOURCE_SUMMARY_COLUMNS):
+        df = df.assign(cpu_total=df["cpu_user"] + df["cpu_sys"])
+        extra.update(
+            cpu_mean=("cpu_total","mean"),
+            cpu_sys_mean=("cpu_sys","mean"),
+            cpu_util_mean=("cpu_util","mean"),
+            rss_peak_mb=("peak_rss_mb","max"),
+            gc_mean=("gc_collections","mean"),
+            alloc_peak_kb_mean=("alloc_peak_kb","mean"),
+        )
+    if all(c in df.columns for c in CHILD_SUMMARY_COLUMNS):
+        extra.update(
+            cpu_children_mean=("cpu_children","mean"),
+            child_rss_peak_mb=("child_peak_rss_mb","max"),
+        )
+    if all(c in df.columns for c in BOUND_SUMMARY_COLUMNS):
+        extra.update(
+            gap_mean=("V_gap","mean"),
+            gap_min=("V_gap","min"),
+            bound_hits=("at_bound","sum"),
+        )
+    target = all(c in df.columns for c in TARGET_SUMMARY_COLUMNS)
+    if target:
+        extra.update(
+            target_hits=("evals_to_target","count"),
+            evals_to_target_mean=("evals_to_target","mean"),
+            evals_total=("n_evals","sum"),
+        )
     g = df.groupby(["instance","variant"], as_index=False)
     out = g.agg(
         V_mean=("V_best","mean"),
@@ -72,5 +261,9 @@ def summarize_runs(df: pd.DataFrame) -> pd.DataFrame:
         time_mean=("wallclock","mean"),
         time_std=("wallclock","std"),
         evalsps_mean=("evals_per_sec","mean"),
+        **extra,
     )
+    if target:
+        out["ert_evals"] = out["evals_total"] / out["target_hits"].where(out["target_hits"] > 0)
+        out = out.drop(columns="evals_total")
     return out
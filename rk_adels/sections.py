@@ -0,0 +1,143 @@
+"""Depth-section decomposition decoder for very large loads.
+
+The container depth D is cut into consecutive sections (walls). The packing order
+is cut into as many chunks of equal item volume, chunk k goes to section k, and
+each section is decoded on its own with `decode_wall_heightmap` in a container of
+depth D_k (proportional to the chunk's volume). The section layouts are stitched
+together by shifting them by the section's z offset.
+
+Sections do not interact, so they can be decoded in parallel (`executor`) and a
+decode costs about S decodes of n/S items instead of one of n items. The price is
+some utilization at the section boundaries and items that do not fit their own
+section are dropped rather than moved on. Sections are kept at least a few box
+edges deep, so the number of sections (and the speed-up) grows with the depth of
+the container in boxes: long truck/container loads benefit most.
+
+Item volumes and the per-type orientation lists are computed once per Instance object;
+a decode only cuts the order into chunks and decodes each in its own depth.
+
+`SectionDecoder(...)` has the call signature of `decode_wall_heightmap`, so it
+can be passed as `decoder=` to `rk_adels.de.evaluate` and the optimizers.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .decoder import DecodeResult, Placement, _decode_heightmap, decode_wall_heightmap, type_orientations
+from .instance import Instance, InstanceCache
+
+SECTION_ITEMS = 250
+MIN_DEPTH_BOXES = 4.0
+
+
+def n_sections_for(inst: Instance, section_items: int = SECTION_ITEMS, min_depth_boxes: float = MIN_DEPTH_BOXES) -> int:
+    """Sections for `inst`: about `section_items` items each, but every section at least
+    `min_depth_boxes` mean box edges deep (thin walls waste their back face) and deep
+    enough for the box type with the largest smallest edge."""
+    n = inst.n
+    if n == 0:
+        return 1
+    S = int(math.ceil(n / max(1, int(section_items))))
+    live = [t for t in inst.types if t.q > 0]
+    if live:
+        thick = max(min(t.w, t.h, t.d) for t in live)
+        mean_edge = sum(t.q * (t.w + t.h + t.d) for t in live) / (3.0 * n)
+        min_depth = max(thick, min_depth_boxes * mean_edge)
+        if min_depth > 0:
+            S = min(S, int(inst.container.D // min_depth))
+    return max(1, S)
+
+
+@dataclass
+class _Setup:
+    # Per-instance data shared by every section decode (sections differ only in depth).
+    n: int
+    offsets: List[int]
+    type_orients: List[List[Tuple[float, float, float]]]
+    vol: np.ndarray  # item volumes by item index
+
+
+def _setup(inst: Instance) -> _Setup:
+    return _Setup(n=inst.n, offsets=inst.type_offsets, type_orients=type_orientations(inst),
+                  vol=np.repeat([t.w * t.h * t.d for t in inst.types], [int(t.q) for t in inst.types]))
+
+
+_SETUP: "InstanceCache[_Setup]" = InstanceCache(_setup)
+
+
+def _decode_section(setup: _Setup, W: float, H: float, D: float, order: List[int], r_plan: List[int],
+                    eps_P: float, eps_H: float, eps_D: float) -> DecodeResult:
+    return _decode_heightmap(W, H, D, setup.n, setup.offsets, setup.type_orients, order, r_plan,
+                             eps_P=eps_P, eps_H=eps_H, eps_D=eps_D)
+
+
+class SectionDecoder:
+    """Decoder callable: fixed `n_sections`, or as many as `n_sections_for` allows."""
+
+    def __init__(self, n_sections: Optional[int] = None, section_items: int = SECTION_ITEMS,
+                 min_depth_boxes: float = MIN_DEPTH_BOXES, executor=None):
+        self.n_sections = n_sections
+        self.section_items = int(section_items)
+        self.min_depth_boxes = float(min_depth_boxes)
+        self.executor = executor  # anything with .map (a process pool pays for pickling the instance)
+
+    def sections(self, inst: Instance) -> int:
+        if self.n_sections:
+            return max(1, int(self.n_sections))
+        return n_sections_for(inst, self.section_items, self.min_depth_boxes)
+
+    def __call__(self, inst: Instance, order: List[int], r_plan: List[int],
+                 eps_P: float = 1e-4, eps_H: float = 1e-6, eps_D: float = 1e-6) -> DecodeResult:
+        S = self.sections(inst)
+        if S == 1:
+            return decode_wall_heightmap(inst, order, r_plan, eps_P=eps_P, eps_H=eps_H, eps_D=eps_D)
+
+        c = inst.container
+        W, H, D = c.W, c.H, c.D
+        setup = _SETUP(inst)
+        n = setup.n
+        order_a = np.asarray(order, dtype=np.int64)
+        cum = np.cumsum(setup.vol[order_a]) if len(order_a) else np.zeros(0)
+        total = float(cum[-1]) if len(cum) else 0.0
+        cuts = [0] + [int(np.searchsorted(cum, total * k / S, side="left")) for k in range(1, S)] + [len(order_a)]
+
+        z0 = [0.0]
+        depths = []
+        orders = []
+        for k in range(S):
+            lo, hi = cuts[k], cuts[k + 1]
+            share = (float(cum[hi - 1]) - (float(cum[lo - 1]) if lo else 0.0)) / total if total > 0 and hi > lo else 1.0 / S
+            z1 = D if k == S - 1 else min(D, z0[-1] + D * share)
+            depths.append(z1 - z0[-1])
+            orders.append(order_a[lo:hi].tolist())
+            z0.append(z1)
+
+        if self.executor is not None:
+            parts = list(self.executor.map(_decode_section, [setup] * S, [W] * S, [H] * S, depths, orders, [r_plan] * S,
+                                           *[[e] * S for e in (eps_P, eps_H, eps_D)]))
+        else:
+            parts = [_decode_section(setup, W, H, Dk, o, r_plan, eps_P, eps_H, eps_D) for Dk, o in zip(depths, orders)]
+
+        placements: List[Placement] = []
+        V_placed = 0.0
+        H_max = 0.0
+        D_max = 0.0
+        for k, part in enumerate(parts):
+            dz = z0[k]
+            for p in part.placements:
+                placements.append(Placement(x=p.x, y=p.y, z=p.z + dz, w=p.w, h=p.h, d=p.d, r=p.r, item=p.item))
+                V_placed += p.w * p.h * p.d
+            H_max = max(H_max, part.H_max)
+            if part.placements:
+                D_max = max(D_max, dz + part.D_max)
+
+        V = V_placed / (W * H * D) if W * H * D > 0 else 0.0
+        placed_count = len(placements)
+        f = V + eps_P * (placed_count / n) - eps_H * (H_max / H) - eps_D * (D_max / D)
+        return DecodeResult(V=V, placed_count=placed_count, H_max=H_max, D_max=D_max, f=f, placements=placements,
+                            hm_peak_bytes=max(p.hm_peak_bytes for p in parts), hm_allocs=sum(p.hm_allocs for p in parts),
+                            n_anchors=sum(p.n_anchors for p in parts))
@@ -0,0 +1,372 @@
+"""Long-running local solve service.
+
+A `SolveService` keeps a pool of warm worker processes (imported and with one
+decode already run) and hands `run_variant`-style solve jobs to them. Instances
+are registered once and addressed by a content hash of their compact JSON, so a
+caller can upload an instance and then solve it repeatedly by key; every worker
+keeps the parsed `Instance` objects it has seen in a small LRU cache. Jobs carry only
+the key once an instance has been shipped to the pool; a worker that does not hold it
+answers with a cache miss and the job is resent with the instance attached.
+
+Concurrent requests are queued on the shared pool and fan out over the workers;
+`solve_batch` submits a list of jobs at once and returns the results in order.
+
+`make_server` exposes the service over localhost HTTP (JSON in, JSON out):
+
+  GET  /health         workers, cached instances, uptime
+  POST /instances      body: instance JSON             -> {"instance_key", ...}
+  POST /solve          body: job                        -> response
+  POST /solve_batch    body: {"jobs": [job, ...]}       -> {"results": [...]}
+
+A job is {"instance": {...}} or {"instance_key": "..."} plus optional variant,
+seconds, NP, seed, validate and placements (return the best packing, default
+true). A response holds the run-table row ("result"), the best placements, the
+serving worker's pid, whether its instance cache was hit, and timing in seconds
+(queue_s, load_s, solve_s, decode_s, worker_s, total_s).
+
+`SolveClient` is a stdlib-only client for the HTTP endpoints.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .instance import Instance
+
+DEFAULT_PORT = 8765
+JOB_DEFAULTS = {"variant": "A3", "seconds": 10.0, "NP": 50, "seed": 123, "validate": False, "placements": True}
+
+
+class UnknownInstance(KeyError):
+    pass
+
+
+class ServiceError(RuntimeError):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+def instance_key(inst: Union[Instance, Dict[str, Any]]) -> str:
+    """Content hash of an instance (sha1 of its canonical compact JSON)."""
+    if not isinstance(inst, Instance):
+        inst = Instance.from_dict(inst)
+    blob = json.dumps(inst.to_dict(compact=True), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _jsonable(v):
+    """Plain JSON values (numpy scalars unwrapped, nan/inf -> None)."""
+    if isinstance(v, dict):
+        return {k: _jsonable(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_jsonable(x) for x in v]
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    return v
+
+
+# ---- worker side -------------------------------------------------------------
+
+_WORKER_CACHE: "OrderedDict[str, Instance]" = OrderedDict()
+_WORKER_CACHE_SIZE = 32
+
+
+def _init_worker(cache_size: int) -> None:
+    global _WORKER_CACHE_SIZE
+    _WORKER_CACHE_SIZE = max(1, int(cache_size))
+    # Import the solver and run one tiny decode so the first real job starts warm.
+    from .de import evaluate
+    from .instance import Container, BoxType
+
+    tiny = Instance(name="warmup", container=Container(W=10, H=10, D=10), types=[BoxType(w=2, h=3, d=4, q=4)])
+    evaluate(tiny, np.linspace(0.1, 0.9, 2 * tiny.n))
+
+
+def _ping(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+# Returned by _solve_job when it got only a key that its worker has not cached.
+CACHE_MISS = "cache_miss"
+
+
+def _worker_instance(key: str, inst_dict: Optional[Dict[str, Any]]) -> Tuple[Optional[Instance], bool]:
+    inst = _WORKER_CACHE.get(key)
+    if inst is not None:
+        _WORKER_CACHE.move_to_end(key)
+        return inst, True
+    if inst_dict is None:
+        return None, False
+    inst = Instance.from_dict(inst_dict)
+    _WORKER_CACHE[key] = inst
+    while len(_WORKER_CACHE) > _WORKER_CACHE_SIZE:
+        _WORKER_CACHE.popitem(last=False)
+    return inst, False
+
+
+def _solve_job(key: str, inst_dict: Optional[Dict[str, Any]], job: Dict[str, Any], t_submit: float) -> Dict[str, Any]:
+    """Solve one job; with inst_dict None and `key` not cached, returns {CACHE_MISS: True}."""
+    from .de import decode_x
+    from .runner import result_row, solve_variant
+
+    t0 = time.time()
+    inst, hit = _worker_instance(key, inst_dict)
+    if inst is None:
+        return {CACHE_MISS: True}
+    t1 = time.time()
+    variant, seconds, NP, seed = job["variant"], float(job["seconds"]), int(job["NP"]), int(job["seed"])
+    res = solve_variant(inst, variant, seconds=seconds, NP=NP, seed=seed)
+    t2 = time.time()
+    placements = None
+    if job["placements"] or job["validate"]:
+        dec = decode_x(inst, res.best_x)
+        if job["validate"]:
+            from .validate import validate_packing
+            validate_packing(inst, dec).raise_if_invalid()
+        if job["placements"]:
+            placements = [
+                {"item": p.item, "x": p.x, "y": p.y, "z": p.z, "w": p.w, "h": p.h, "d": p.d, "r": p.r}
+                for p in dec.placements
+            ]
+    t3 = time.time()
+    return {
+        "instance_key": key,
+        "result": result_row(inst, variant, seconds, NP, seed, res, t2 - t1),
+        "placements": placements,
+        "worker": os.getpid(),
+        "cache_hit": hit,
+        "timing": {"queue_s": t0 - t_submit, "load_s": t1 - t0, "solve_s": t2 - t1, "decode_s": t3 - t2, "worker_s": t3 - t0},
+    }
+
+
+# ---- parent side -------------------------------------------------------------
+
+class SolveService:
+    """Warm process pool plus an instance registry keyed by content hash."""
+
+    def __init__(self, workers: Optional[int] = None, cache_size: int = 32, max_instances: int = 256):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.max_instances = max(1, int(max_instances))
+        self._instances: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._shipped: set = set()  # keys sent to the pool at least once
+        self._lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(cache_size,))
+        self.started = time.time()
+
+    def warm(self) -> List[int]:
+        """Start every worker now instead of on the first requests; returns their pids."""
+        futs = [self._pool.submit(_ping, 0.05) for _ in range(self.workers)]
+        return sorted({f.result() for f in futs})
+
+    def register(self, inst: Union[Instance, Dict[str, Any]]) -> str:
+        if not isinstance(inst, Instance):
+            inst = Instance.from_dict(inst)
+        d = inst.to_dict(compact=True)
+        key = instance_key(inst)
+        with self._lock:
+            self._instances[key] = d
+            self._instances.move_to_end(key)
+            while len(self._instances) > self.max_instances:
+                old, _ = self._instances.popitem(last=False)
+                self._shipped.discard(old)
+        return key
+
+    def _resolve(self, job: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        if job.get("instance") is not None:
+            key = self.register(job["instance"])
+        else:
+            key = job.get("instance_key")
+            if not key:
+                raise ValueError("job needs 'instance' or 'instance_key'")
+        with self._lock:
+            d = self._instances.get(key)
+            if d is None:
+                raise UnknownInstance(key)
+            self._instances.move_to_end(key)
+        return key, d
+
+    def submit(self, job: Dict[str, Any]) -> "Future[Dict[str, Any]]":
+        t_submit = time.time()
+        key, d = self._resolve(job)
+        spec = {k: job[k] if job.get(k) is not None else v for k, v in JOB_DEFAULTS.items()}
+        with self._lock:
+            first = key not in self._shipped
+            self._shipped.add(key)
+        outer: "Future[Dict[str, Any]]" = Future()
+
+        def done(f):
+            try:
+                out = f.result()
+                if out.get(CACHE_MISS):  # that worker does not hold the instance: resend with it
+                    self._pool.submit(_solve_job, key, d, spec, t_submit).add_done_callback(done)
+                    return
+            except BaseException as e:  # propagate worker exceptions (e.g. unknown variant)
+                outer.set_exception(e)
+                return
+            out["timing"]["total_s"] = time.time() - t_submit
+            outer.set_result(out)
+
+        # The first job of an instance carries it; later ones only its key.
+        self._pool.submit(_solve_job, key, d if first else None, spec, t_submit).add_done_callback(done)
+        return outer
+
+    def solve(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return self.submit(job).result()
+
+    def solve_batch(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Submit all jobs at once; failed jobs come back as {"error": message}."""
+        futs: List[Any] = []
+        for job in jobs:
+            try:
+                futs.append(self.submit(job))
+            except (ValueError, KeyError) as e:
+                futs.append(e)
+        out = []
+        for f in futs:
+            if isinstance(f, Exception):
+                out.append({"error": _error_message(f)})
+                continue
+            try:
+                out.append(f.result())
+            except Exception as e:
+                out.append({"error": _error_message(e)})
+        return out
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            n_inst = len(self._instances)
+        return {"ok": True, "workers": self.workers, "instances": n_inst, "uptime_s": time.time() - self.started}
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "SolveService":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _error_message(e: BaseException) -> str:
+    if isinstance(e, UnknownInstance):
+        return f"unknown instance_key {e.args[0]}; upload the instance first"
+    return str(e) or type(e).__name__
+
+
+def make_server(service: SolveService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """HTTP front end for `service` (see the module docstring for the endpoints)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            body = json.dumps(_jsonable(payload)).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> Any:
+            n = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(n) or b"{}")
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, service.health())
+            else:
+                self._send(404, {"error": f"no such endpoint: {self.path}"})
+
+        def do_POST(self):
+            try:
+                body = self._body()
+                if self.path == "/instances":
+                    key = service.register(body)
+                    self._send(200, {"instance_key": key})
+                elif self.path == "/solve":
+                    self._send(200, service.solve(body))
+                elif self.path == "/solve_batch":
+                    self._send(200, {"results": service.solve_batch(list(body.get("jobs", [])))})
+                else:
+                    self._send(404, {"error": f"no such endpoint: {self.path}"})
+            except UnknownInstance as e:
+                self._send(404, {"error": _error_message(e)})
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": _error_message(e)})
+            except Exception as e:
+                self._send(500, {"error": _error_message(e)})
+
+        def log_message(self, fmt, *args):  # keep the console quiet
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+class SolveClient:
+    """Client for a running solve server; instances are uploaded once and then sent by key."""
+
+    def __init__(self, url: str = f"http://127.0.0.1:{DEFAULT_PORT}", timeout: Optional[float] = None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._known: set = set()
+
+    def _call(self, method: str, path: str, payload: Any = None) -> Dict[str, Any]:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                return json.loads(r.read())
+        except urllib.error.HTTPError as e:
+            try:
+                msg = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                msg = e.reason
+            raise ServiceError(e.code, msg) from None
+
+    def health(self) -> Dict[str, Any]:
+        return self._call("GET", "/health")
+
+    def upload(self, inst: Union[Instance, Dict[str, Any]]) -> str:
+        d = inst.to_dict(compact=True) if isinstance(inst, Instance) else inst
+        key = self._call("POST", "/instances", d)["instance_key"]
+        self._known.add(key)
+        return key
+
+    def _job(self, inst: Union[Instance, Dict[str, Any]], **kw) -> Dict[str, Any]:
+        if not isinstance(inst, Instance):
+            inst = Instance.from_dict(inst)
+        key = instance_key(inst)
+        if key not in self._known:
+            self.upload(inst)
+        return {"instance_key": key, **kw}
+
+    def solve(self, inst: Union[Instance, Dict[str, Any]], **kw) -> Dict[str, Any]:
+        """Solve one instance; keyword arguments are job fields (variant, seconds, NP, seed, ...)."""
+        job = self._job(inst, **kw)
+        try:
+            return self._call("POST", "/solve", job)
+        except ServiceError as e:
+            if e.status != 404:
+                raise
+            self._known.discard(job["instance_key"])  # evicted on the server: upload again
+            return self._call("POST", "/solve", self._job(inst, **kw))
+
+    def solve_batch(self, jobs: List[Tuple[Union[Instance, Dict[str, Any]], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Solve (instance, job fields) pairs in one request; results keep the input order."""
+        payload = [self._job(inst, **kw) for inst, kw in jobs]
+        return self._call("POST", "/solve_batch", {"jobs": payload})["results"]
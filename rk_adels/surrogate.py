@@ -0,0 +1,146 @@
+"""Online surrogate for pre-screening random-key trial vectors.
+
+A ridge regression on a handful of cheap phenotype features predicts the fitness f
+of a random-key vector without decoding it. Optimizers use it to rank the trial
+vectors of a generation and decode only the most promising fraction.
+
+Features (per vector; pos_i in [0, 1] is item i's position in the packing order,
+and the orientation terms use the orientation the key selects):
+  volume-weighted mean position, height-weighted mean position, mean chosen height,
+  footprint-weighted mean position, chosen-height mean of the first half of the
+  order, and volume share of the first quarter of the order.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .instance import Instance, orientations
+
+
+class RidgeSurrogate:
+    def __init__(self, inst: Instance, genotype=None, lam: float = 1e-3, min_samples: int = 20):
+        self.genotype = genotype  # rk_adels.genotype.Genotype for compact vectors, None for 2n keys
+        self.lam = float(lam)
+        self.min_samples = int(min_samples)
+        c = inst.container
+        n = inst.n
+        self.n = n
+        # Orientation table padded to 6 entries so that table[i, r-1] is what the decoder
+        # picks for orientation gene r (it uses orients[(r-1) % len(orients)]).
+        tab = np.zeros((n, 6, 3), dtype=float)
+        for t, lo, hi in zip(inst.types, inst.type_offsets[:-1], inst.type_offsets[1:]):
+            ors = orientations(t.w, t.h, t.d, t.vert_ok) or [(t.w, t.h, t.d)]
+            tab[lo:hi] = np.array([ors[j % len(ors)] for j in range(6)], dtype=float)
+        self._h = tab[:, :, 1] / c.H
+        self._base = tab[:, :, 0] * tab[:, :, 2] / (c.W * c.D)
+        vol = tab[:, 0, 0] * tab[:, 0, 1] * tab[:, 0, 2]
+        self._vol = vol / max(float(vol.mean()), 1e-12) if n else vol
+        self.p = 7
+        self._A = np.zeros((self.p, self.p))
+        self._b = np.zeros(self.p)
+        self._w = np.zeros(self.p)
+        self._dirty = False
+        self.n_samples = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.n_samples >= self.min_samples
+
+    def features(self, X: np.ndarray) -> np.ndarray:
+        X = np.atleast_2d(X)
+        n = self.n
+        m = len(X)
+        if n == 0:
+            return np.ones((m, self.p))
+        ranks = np.argsort(np.argsort(X[:, :n], axis=1, kind="mergesort"), axis=1, kind="mergesort")
+        pos = ranks / max(n - 1, 1)
+        if self.genotype is not None:
+            r = self.genotype.orient_index(X)
+        else:
+            r = np.clip(np.floor(6.0 * np.clip(X[:, n:], 0.0, 1.0 - 1e-12)).astype(int), 0, 5)
+        rows = np.arange(n)[None, :]
+        h = self._h[rows, r]
+        base = self._base[rows, r]
+        vol = self._vol[None, :]
+        F = np.empty((m, self.p))
+        F[:, 0] = 1.0
+        F[:, 1] = (pos * vol).mean(axis=1)
+        F[:, 2] = (pos * h).mean(axis=1)
+        F[:, 3] = h.mean(axis=1)
+        F[:, 4] = (pos * base).mean(axis=1)
+        F[:, 5] = np.where(pos < 0.5, h, 0.0).mean(axis=1)
+        F[:, 6] = np.where(pos < 0.25, vol, 0.0).mean(axis=1)
+        return F
+
+    def get_state(self) -> dict:
+        """Arrays for rk_adels.checkpoint (n_samples goes into the metadata)."""
+        return {"surr_A": self._A, "surr_b": self._b, "surr_w": self._w, "surr_dirty": np.array(self._dirty)}
+
+    def set_state(self, arrays: dict, meta: dict) -> None:
+        self._A, self._b, self._w = arrays["surr_A"].copy(), arrays["surr_b"].copy(), arrays["surr_w"].copy()
+        self._dirty = bool(arrays["surr_dirty"])
+        self.n_samples = int(meta["surr_samples"])
+
+    def add(self, X: np.ndarray, f) -> None:
+        F = self.features(X)
+        y = np.atleast_1d(np.asarray(f, dtype=float))
+        self._A += F.T @ F
+        self._b += F.T @ y
+        self.n_samples += len(y)
+        self._dirty = True
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self._dirty:
+            A = self._A + self.lam * np.eye(self.p) * max(1.0, float(np.trace(self._A)) / self.p)
+            self._w = np.linalg.solve(A, self._b)
+            self._dirty = False
+        return self.features(X) @ self._w
+
+
+def rank_corr(a, b) -> float:
+    """Spearman rank correlation (nan if fewer than 3 points or no spread)."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if len(a) < 3:
+        return float("nan")
+    ra = np.argsort(np.argsort(a)).astype(float)
+    rb = np.argsort(np.argsort(b)).astype(float)
+    if ra.std() == 0 or rb.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+SCREEN_COLUMNS = ("surr_screened", "surr_decoded", "surr_decodes_saved", "surr_rank_corr")
+
+
+class ScreenStats:
+    """Per-run bookkeeping: decodes saved and rank correlation of predicted vs real f."""
+
+    def __init__(self):
+        self.screened = 0
+        self.decoded = 0
+        self.saved = 0
+        self._corr = []
+
+    def record(self, n_screened: int, pred, actual) -> None:
+        self.screened += n_screened
+        self.decoded += len(actual)
+        self.saved += n_screened - len(actual)
+        c = rank_corr(pred, actual)
+        if c == c:
+            self._corr.append(c)
+
+    def get_state(self) -> dict:
+        return {"screened": self.screened, "decoded": self.decoded, "saved": self.saved, "corr": list(self._corr)}
+
+    def set_state(self, d: dict) -> None:
+        self.screened, self.decoded, self.saved = d["screened"], d["decoded"], d["saved"]
+        self._corr = list(d["corr"])
+
+    def as_dict(self) -> dict:
+        return {
+            "surr_screened": self.screened,
+            "surr_decoded": self.decoded,
+            "surr_decodes_saved": self.saved,
+            "surr_rank_corr": float(np.mean(self._corr)) if self._corr else float("nan"),
+        }
@@ -0,0 +1,215 @@
+"""Feasibility checks for decoded packings.
+
+`validate_packing` verifies a `DecodeResult` (or a list of placements, or an
+(n, 6) array of x, y, z, w, h, d rows) against its instance:
+
+- every box lies inside the container,
+- no two boxes overlap (touching faces are allowed),
+- each placed (w, h, d) is a feasible orientation of its item under `vert_ok`,
+  and no item is placed twice,
+- the reported V, H_max and D_max match the placements.
+
+Overlaps are found on a uniform 3D grid (see `find_overlaps`): only boxes that share
+a grid cell are tested, in vectorized chunks. This is near O(n log n) for packings of
+boxes of comparable size, and O(n^2) in the worst case.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from .decoder import DecodeResult, Placement
+from .instance import Instance, orientations
+
+
+class PackingError(ValueError):
+    pass
+
+
+@dataclass
+class ValidationReport:
+    ok: bool
+    n_placed: int
+    errors: List[str] = field(default_factory=list)
+
+    def raise_if_invalid(self) -> None:
+        if not self.ok:
+            raise PackingError("; ".join(self.errors))
+
+
+def placements_array(placements: Sequence[Placement]) -> np.ndarray:
+    """(n, 6) float array of x, y, z, w, h, d."""
+    return np.array([(p.x, p.y, p.z, p.w, p.h, p.d) for p in placements], dtype=float).reshape(-1, 6)
+
+
+def _pairs_after(cnt: np.ndarray, i0: int, i1: int):
+    """Index pairs (a, a+1..a+cnt[a]) for a in [i0, i1)."""
+    c = cnt[i0:i1]
+    tot = int(c.sum())
+    a = np.repeat(np.arange(i0, i1), c)
+    start = np.repeat(np.cumsum(c) - c, c)
+    return a, a + 1 + (np.arange(tot) - start)
+
+
+def find_overlaps(boxes: np.ndarray, tol: float = 1e-9, chunk: int = 1 << 20, max_pairs: Optional[int] = None,
+                  cells_per_box: int = 8) -> np.ndarray:
+    """Index pairs (i, j) of boxes with positive-volume intersection (uniform grid).
+
+    The boxes are hashed into a 3D grid whose cell edges start at the median box
+    extent and grow until the boxes occupy at most `cells_per_box` cells each on
+    average. Only boxes sharing a cell are tested exactly, and each pair is reported
+    only in the cell holding the lower corner of its intersection. Sorting the m
+    cell memberships costs O(m log m), with m = O(n). The tests add O(p) for the p
+    pairs that share a cell. For packings without overlaps and boxes of comparable
+    size, a cell holds O(1) boxes, so p = O(n). In the worst case, with many boxes in
+    one cell (mass overlaps, or a few huge boxes among tiny ones), p is O(n^2).
+    """
+    n = len(boxes)
+    empty = np.zeros((0, 2), dtype=np.int64)
+    if n < 2:
+        return empty
+    lo = boxes[:, :3]
+    hi = boxes[:, :3] + boxes[:, 3:]
+    origin = lo.min(axis=0)
+    size = np.median(boxes[:, 3:], axis=0)
+    size = np.where(size > tol, size, np.maximum(hi.max(axis=0) - origin, 1.0))
+    while True:
+        c0 = np.floor((lo - origin) / size).astype(np.int64)
+        c1 = np.maximum(np.floor((hi - tol - origin) / size).astype(np.int64), c0)
+        span = c1 - c0 + 1
+        k = np.prod(span, axis=1)
+        if int(k.sum()) <= cells_per_box * n:
+            break
+        size = size * 1.5
+
+    # Cell memberships (box, cell key), sorted by cell.
+    box = np.repeat(np.arange(n), k)
+    t = np.arange(len(box)) - np.repeat(np.cumsum(k) - k, k)
+    sy, sz = span[box, 1], span[box, 2]
+    cell = c0[box] + np.stack([t // (sy * sz), (t // sz) % sy, t % sz], axis=1)
+    dims = c1.max(axis=0) + 1
+    key = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]
+    order = np.argsort(key, kind="mergesort")
+    box, key, cell = box[order], key[order], cell[order]
+    # Member q pairs with the following members q+1 .. end[q]-1 of its cell.
+    end = np.searchsorted(key, key, side="right")
+    cnt = end - np.arange(len(key)) - 1
+    ccum = np.cumsum(cnt)
+
+    found: List[np.ndarray] = []
+    n_found = 0
+    i0, m = 0, len(key)
+    while i0 < m:
+        # Take a block of members holding about `chunk` candidate pairs.
+        base = int(ccum[i0 - 1]) if i0 else 0
+        i1 = max(i0 + 1, int(np.searchsorted(ccum, base + chunk, side="right")))
+        qa, qb = _pairs_after(cnt, i0, i1)
+        if len(qa):
+            a, b = box[qa], box[qb]
+            lo_ab = np.maximum(lo[a], lo[b])
+            hit = np.all(lo_ab < np.minimum(hi[a], hi[b]) - tol, axis=1)
+            # Report the pair only in the cell of the intersection's lower corner.
+            hit &= np.all(np.floor((lo_ab - origin) / size).astype(np.int64) == cell[qa], axis=1)
+            if np.any(hit):
+                pairs = np.sort(np.stack([a[hit], b[hit]], axis=1), axis=1)
+                found.append(pairs)
+                n_found += len(pairs)
+                if max_pairs is not None and n_found >= max_pairs:
+                    break
+        i0 = i1
+    if not found:
+        return empty
+    return np.concatenate(found)
+
+
+def validate_packing(
+    inst: Instance,
+    result: Union[DecodeResult, Sequence[Placement], np.ndarray],
+    items: Optional[Sequence[int]] = None,
+    tol: float = 1e-9,
+    max_errors: int = 10,
+) -> ValidationReport:
+    """Check a packing; see the module docstring for what is verified.
+
+    `items` gives the item index of each row when `result` is an array (placements
+    carry their own `item`). Orientation checks are skipped for rows with item -1.
+    """
+    res: Optional[DecodeResult] = result if isinstance(result, DecodeResult) else None
+    if isinstance(result, np.ndarray):
+        boxes = np.asarray(result, dtype=float).reshape(-1, 6)
+        item_idx = np.asarray(items if items is not None else [-1] * len(boxes), dtype=np.int64)
+    else:
+        pls = res.placements if res is not None else list(result)  # type: ignore[union-attr]
+        boxes = placements_array(pls)
+        item_idx = np.array([p.item for p in pls], dtype=np.int64)
+
+    errors: List[str] = []
+
+    def err(msg: str) -> bool:
+        errors.append(msg)
+        return len(errors) >= max_errors
+
+    c = inst.container
+    C = np.array([c.W, c.H, c.D], dtype=float)
+    n = len(boxes)
+    full = False
+
+    # Containment (and positive sizes)
+    bad = np.flatnonzero(np.any(boxes[:, :3] < -tol, axis=1)
+                         | np.any(boxes[:, :3] + boxes[:, 3:] > C + tol, axis=1)
+                         | np.any(boxes[:, 3:] <= 0.0, axis=1))
+    for k in bad:
+        if err(f"box {k} (item {item_idx[k]}) at {tuple(boxes[k, :3].tolist())} size {tuple(boxes[k, 3:].tolist())} is outside the container"):
+            full = True
+            break
+
+    # Orientation legality and duplicates
+    if not full:
+        known = item_idx[item_idx >= 0]
+        if len(known):
+            if int(known.max()) >= inst.n:
+                full = err(f"item index {int(known.max())} out of range (n={inst.n})")
+            uniq, cnt = np.unique(known, return_counts=True)
+            for i in uniq[cnt > 1]:
+                if full or err(f"item {int(i)} placed {int(cnt[uniq == i][0])} times"):
+                    full = True
+                    break
+        type_orients = {}
+        for k in range(n):
+            if full:
+                break
+            i = int(item_idx[k])
+            if i < 0 or i >= inst.n:
+                continue
+            t = inst.type_of(i)
+            if t not in type_orients:
+                bt = inst.types[t]
+                type_orients[t] = np.array(orientations(bt.w, bt.h, bt.d, bt.vert_ok), dtype=float).reshape(-1, 3)
+            ok = type_orients[t]
+            if len(ok) == 0 or not np.any(np.all(np.abs(ok - boxes[k, 3:]) <= tol, axis=1)):
+                full = err(f"box {k}: size {tuple(boxes[k, 3:].tolist())} is not a feasible orientation of item {i}")
+
+    # Pairwise overlap
+    if not full:
+        pairs = find_overlaps(boxes, tol=tol, max_pairs=max_errors)
+        for a, b in pairs[:max_errors - len(errors)]:
+            full = err(f"boxes {int(a)} (item {item_idx[a]}) and {int(b)} (item {item_idx[b]}) overlap")
+
+    # Reported metrics
+    if res is not None:
+        cvol = float(C.prod())
+        V = float(np.prod(boxes[:, 3:], axis=1).sum()) / cvol if cvol > 0 else 0.0
+        H_max = float((boxes[:, 1] + boxes[:, 4]).max()) if n else 0.0
+        D_max = float((boxes[:, 2] + boxes[:, 5]).max()) if n else 0.0
+        if abs(V - res.V) > 1e-9 * max(1.0, abs(V)):
+            err(f"reported V={res.V} but placements give {V}")
+        if abs(H_max - res.H_max) > tol * max(1.0, c.H):
+            err(f"reported H_max={res.H_max} but placements give {H_max}")
+        if abs(D_max - res.D_max) > tol * max(1.0, c.D):
+            err(f"reported D_max={res.D_max} but placements give {D_max}")
+        if res.placed_count != n:
+            err(f"reported placed_count={res.placed_count} but {n} placements")
+
+    return ValidationReport(ok=not errors, n_placed=n, errors=errors)
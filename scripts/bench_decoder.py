@@ -0,0 +1,77 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from rk_adels.bundle import BUNDLE_SUFFIX, InstanceBundle
+from rk_adels.decoder import decode_wall_heightmap
+from rk_adels.instance import Instance
+from rk_adels.raster import raster_points
+from rk_adels.runner import make_decoder
+
+def main():
+    ap = argparse.ArgumentParser(description="Decoder micro-benchmark: decodes/s and heightmap memory per decode.")
+    ap.add_argument("--instances_dir", required=True, help="Directory of *.json instances or a .rkb bundle")
+    ap.add_argument("--n_instances", type=int, default=5)
+    ap.add_argument("--decodes", type=int, default=5, help="Random (perm, r_plan) decodes per instance")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--decoder", choices=["full", "sections"], default="full")
+    ap.add_argument("--section_items", type=int, default=250, help="Items per depth section with --decoder sections")
+    ap.add_argument("--tracemalloc", action="store_true", help="Also report the Python-level allocation peak per decode (slower)")
+    ap.add_argument("--raster", action="store_true", help="Also report the instance's normal patterns / raster points along W and D")
+    args = ap.parse_args()
+
+    src = Path(args.instances_dir)
+    if src.suffix == BUNDLE_SUFFIX:
+        b = InstanceBundle(src)
+        insts = [b[k] for k in range(min(len(b), args.n_instances))]
+    else:
+        insts = [Instance.load_json(str(p)) for p in sorted(src.glob("*.json"))[:args.n_instances]]
+
+    decode = make_decoder(args.decoder, section_items=args.section_items) or decode_wall_heightmap
+    rng = random.Random(args.seed)
+    tot_t = 0.0
+    tot_n = 0
+    for inst in insts:
+        n = inst.n
+        t_inst = 0.0
+        peak = allocs = placed = anchors = 0
+        V = 0.0
+        py_peak = 0
+        for _ in range(args.decodes):
+            perm = list(range(n))
+            rng.shuffle(perm)
+            r_plan = [rng.randrange(1, 7) for _ in range(n)]
+            if args.tracemalloc:
+                tracemalloc.start()
+            t0 = time.perf_counter()
+            res = decode(inst, perm, r_plan)
+            t_inst += time.perf_counter() - t0
+            if args.tracemalloc:
+                py_peak = max(py_peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            peak = max(peak, res.hm_peak_bytes)
+            allocs += res.hm_allocs
+            anchors += res.n_anchors
+            placed += res.placed_count
+            V += res.V
+        tot_t += t_inst
+        tot_n += args.decodes
+        line = (f"{inst.name}: n={n} placed={placed / args.decodes:.1f} V={V / args.decodes:.4f} "
+                f"ms/decode={1000 * t_inst / args.decodes:.1f} hm_peak_kB={peak / 1024:.1f} "
+                f"hm_allocs/decode={allocs / args.decodes:.1f} anchors/decode={anchors / args.decodes:.0f}")
+        if args.tracemalloc:
+            line += f" py_peak_kB={py_peak / 1024:.1f}"
+        if args.raster:
+            rp = raster_points(inst)
+            if rp.x is None or rp.z is None:
+                line += " raster=n/a"
+            else:
+                line += f" normal={rp.x_normal}x{rp.z_normal} raster={len(rp.x)}x{len(rp.z)}"
+        print(line)
+    print(f"OK: {tot_n} decodes, {tot_n / max(tot_t, 1e-9):.2f} decodes/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+
+CORE_MODULES = [
+    "rk_adels.instance",
+    "rk_adels.decoder",
+    "rk_adels.local_search",
+    "rk_adels.de",
+    "rk_adels.runner",
+    "scripts.run_ablation",
+]
+# Loaded lazily where runs are aggregated, stored or plotted; never on the solve path.
+HEAVY = ["pandas", "matplotlib", "pyarrow", "scipy"]
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for m in sys.argv[1:]:
+    __import__(m)
+dt = time.perf_counter() - t0
+print(json.dumps({"ms": 1000 * dt, "loaded": sorted(k for k in sys.modules if k.split('.')[0] in %r)}))
+"""
+
+def measure(modules, repeats: int = 3):
+    best = None
+    loaded = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", _PROBE % (HEAVY,), *modules],
+                             check=True, capture_output=True, text=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        best = r["ms"] if best is None else min(best, r["ms"])
+        loaded = r["loaded"]
+    return best, loaded
+
+def main():
+    ap = argparse.ArgumentParser(description="Import-time guard: the solver core must import without pandas/matplotlib.")
+    ap.add_argument("--modules", nargs="*", default=CORE_MODULES)
+    ap.add_argument("--max_ms", type=float, default=500.0, help="Fail if the best-of-N import time exceeds this")
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    failed = False
+    for m in args.modules:
+        ms, loaded = measure([m], repeats=args.repeats)
+        heavy = sorted({k.split(".")[0] for k in loaded})
+        status = "OK"
+        if heavy:
+            status = f"FAIL (imports {', '.join(heavy)})"
+            failed = True
+        elif ms > args.max_ms:
+            status = f"FAIL (> {args.max_ms:.0f} ms)"
+            failed = True
+        print(f"{m:28s} {ms:8.1f} ms  {status}")
+    if failed:
+        raise SystemExit(1)
+    print("OK: solver core imports without pandas/matplotlib")
+
+if __name__ == "__main__":
+    main()
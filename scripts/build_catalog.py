@@ -0,0 +1,22 @@
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+from rk_adels.catalog import CATALOG_NAME, load_catalog
+
+def main():
+    ap = argparse.ArgumentParser(description="Build/refresh the metadata catalog of an instance directory and optionally query it.")
+    ap.add_argument("--instances_dir", required=True)
+    ap.add_argument("--where", type=str, default=None, help="pandas query over catalog columns, e.g. \"n_items>150 and family=='thpack3'\"")
+    args = ap.parse_args()
+
+    df = load_catalog(args.instances_dir)
+    print(f"OK: {len(df)} instances in {Path(args.instances_dir) / CATALOG_NAME}")
+    if args.where:
+        df = df.query(args.where)
+        print(f"{len(df)} match: {args.where}")
+    cols = ["name", "family", "n_items", "n_types", "vol_ratio", "n_restricted"]
+    print(df[cols].to_string(index=False, max_rows=40))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+from rk_adels.bundle import BundleWriter, InstanceBundle
+from rk_adels.instance import Instance
+
+def main():
+    ap = argparse.ArgumentParser(description="Pack a directory of JSON instances into one memory-mapped bundle file (.rkb).")
+    ap.add_argument("--instances_dir", required=True)
+    ap.add_argument("--out", required=True, help="Output bundle path, e.g. data/instances.rkb")
+    args = ap.parse_args()
+
+    inst_paths = sorted(Path(args.instances_dir).glob("*.json"))
+    if not inst_paths:
+        raise SystemExit(f"No instances found in {args.instances_dir}")
+
+    with BundleWriter(args.out) as w:
+        for ip in inst_paths:
+            inst = Instance.load_json(str(ip))
+            inst.name = inst.name or ip.stem
+            w.add(inst)
+
+    b = InstanceBundle(args.out)
+    n_types = sum(rec["n_types"] for rec in b.index)
+    print(f"OK: wrote {len(b)} instances ({n_types} box types) to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from rk_adels.difftest import check_source, edge_instances
+
+def main():
+    ap = argparse.ArgumentParser(description="Differential test of a decoder backend against the reference "
+                                             "decode_wall_heightmap(exhaustive=True) on every instance plus synthetic edge cases.")
+    ap.add_argument("--instances_dir", default="data/instances", help="Directory of *.json instances")
+    ap.add_argument("--candidate", default="rk_adels.decoder:decode_wall_heightmap",
+                    help="Decoder under test as module:attr (a class is instantiated without arguments)")
+    ap.add_argument("--cases", type=int, default=8, help="Random (perm, r_plan) cases per instance (adversarial cases come on top)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--limit", type=int, default=0, help="Only the first N instances of the directory (0: all)")
+    ap.add_argument("--no_edge", action="store_true", help="Skip the synthetic edge-case instances")
+    ap.add_argument("--no_shrink", action="store_true", help="Report divergences without minimizing them")
+    ap.add_argument("--tol", type=float, default=1e-9, help="Coordinate / metric tolerance")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes (0: all cores)")
+    ap.add_argument("--out_dir", default="outputs/difftest", help="Where minimized reproducers are written")
+    args = ap.parse_args()
+
+    sources = [] if args.no_edge else [inst.to_dict() for inst in edge_instances()]
+    paths = sorted(Path(args.instances_dir).glob("*.json"))
+    if args.limit:
+        paths = paths[:args.limit]
+    sources += [str(p) for p in paths]
+    if not sources:
+        raise SystemExit(f"No instances found in {args.instances_dir}")
+
+    jobs = args.jobs or os.cpu_count() or 1
+    out_dir = Path(args.out_dir)
+    t0 = time.time()
+    n_cases = n_bad = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futs = [pool.submit(check_source, s, args.candidate, args.cases, args.seed, args.tol, not args.no_shrink)
+                for s in sources]
+        for fut in as_completed(futs):
+            rep = fut.result()
+            n_cases += rep.n_cases
+            if rep.error is not None:
+                n_bad += 1
+                print(f"ERROR {rep.instance}: {rep.error}")
+            for fnd in rep.findings:
+                n_bad += 1
+                d = fnd.divergence
+                out_dir.mkdir(parents=True, exist_ok=True)
+                path = out_dir / f"{fnd.instance}_{fnd.case}.json"
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({"candidate": args.candidate, "case": fnd.case, "message": d.message,
+                               **fnd.reproducer}, f, indent=2)
+                print(f"DIVERGED {fnd.instance} [{fnd.case}] step {d.step}: {d.message}")
+                print(f"  reference: {d.reference}")
+                print(f"  candidate: {d.candidate}")
+                print(f"  reproducer ({len(fnd.reproducer['order'])} items): {path}")
+
+    print(f"{'FAIL' if n_bad else 'OK'}: {len(sources)} instances, {n_cases} cases, {n_bad} diverging, "
+          f"{time.time() - t0:.1f}s with {jobs} jobs")
+    if n_bad:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
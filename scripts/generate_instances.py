@@ -1,42 +1,118 @@
 from __future__ import annotations
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import List, Optional
 import numpy as np
 
-from rk_adels.instance import Instance, Container, Item
+from rk_adels.bundle import BundleWriter
+from rk_adels.instance import Instance, Container, BoxType
+
+# Per-edge lognormal parameters of the default generator (fractions of the container edge).
+_LN_MEAN = np.array([-0.7, -0.8, -0.9])
+_LN_SIGMA = np.array([0.7, 0.8, 0.9])
+
+@dataclass
+class SizeClass:
+    # Box types of this class get edges drawn uniformly in [lo, hi] * container edge.
+    weight: float
+    lo: float
+    hi: float
+
+# Named mixtures for --mix. "thpack" mimics strongly heterogeneous Bischoff-Ratcliff loads:
+# mostly small/medium boxes plus a few bulky ones, few distinct types with large quantities.
+MIXTURES = {
+    "thpack": [SizeClass(0.45, 0.08, 0.20), SizeClass(0.35, 0.20, 0.35), SizeClass(0.20, 0.35, 0.55)],
+    "small": [SizeClass(1.0, 0.03, 0.10)],
+    "bimodal": [SizeClass(0.8, 0.05, 0.15), SizeClass(0.2, 0.40, 0.70)],
+}
+
+def parse_mixture(spec: str) -> List[SizeClass]:
+    """A preset name from MIXTURES or 'weight:lo-hi,...', e.g. '0.7:0.05-0.2,0.3:0.3-0.6'."""
+    if spec in MIXTURES:
+        return MIXTURES[spec]
+    classes = []
+    for part in spec.split(","):
+        wt, rng_ = part.split(":")
+        lo, hi = rng_.split("-")
+        classes.append(SizeClass(weight=float(wt), lo=float(lo), hi=float(hi)))
+    if not classes or any(c.weight <= 0 or not (0 < c.lo <= c.hi <= 1) for c in classes):
+        raise ValueError(f"Bad size-class mixture: {spec}")
+    return classes
+
+def _rescale(dims: np.ndarray, q: np.ndarray, C: np.ndarray, target_vol: float, clip: bool = True) -> np.ndarray:
+    # Sequential sum (cumsum) keeps the result bit-identical to summing item by item.
+    vol = float(np.cumsum(np.prod(dims, axis=1) * q)[-1]) if len(dims) else 0.0
+    if vol > 1e-9:
+        s = (target_vol / vol) ** (1.0/3.0)
+        if clip:
+            s = float(np.clip(s, 0.6, 1.4))
+        dims = np.minimum(C, np.maximum(1.0, dims * s))
+    return dims
 
 def generate_instance(name: str, W: float, H: float, D: float, n_items: int, fill_ratio: float, seed: int) -> Instance:
     rng = np.random.default_rng(seed)
-    container_vol = W*H*D
-    target_vol = fill_ratio * container_vol
+    C = np.array([W, H, D], dtype=float)
+    target_vol = fill_ratio * W*H*D
 
-    items = []
-    vol = 0.0
+    # Same draw order as one (a, b, c) triple per item.
+    abc = np.clip(rng.lognormal(mean=_LN_MEAN, sigma=_LN_SIGMA, size=(n_items, 3)), 0.05, 0.9)
+    dims = np.minimum(C, np.maximum(1.0, abc * C))
+    dims = _rescale(dims, np.ones(n_items), C, target_vol)
 
-    for _ in range(n_items):
-        a = float(np.clip(rng.lognormal(mean=-0.7, sigma=0.7), 0.05, 0.9))
-        b = float(np.clip(rng.lognormal(mean=-0.8, sigma=0.8), 0.05, 0.9))
-        c = float(np.clip(rng.lognormal(mean=-0.9, sigma=0.9), 0.05, 0.9))
+    types = [BoxType(w=w, h=h, d=d) for w, h, d in dims.tolist()]
+    return Instance(name=name, container=Container(W=W,H=H,D=D), types=types)
 
-        w = min(W, max(1.0, a * W))
-        h = min(H, max(1.0, b * H))
-        d = min(D, max(1.0, c * D))
+def generate_mixture_instance(
+    name: str, W: float, H: float, D: float, n_items: int, fill_ratio: float, seed: int,
+    classes: List[SizeClass], n_types: int = 20, p_restricted: float = 0.0, integer: bool = True,
+) -> Instance:
+    """Box-type instance: n_types types drawn from a size-class mixture, n_items split over them.
 
-        items.append(Item(w=w, h=h, d=d))
-        vol += w*h*d
+    The class ranges fix the relative box shapes; all edges are then scaled by one factor
+    so the total volume matches fill_ratio (without the 0.6..1.4 clip of generate_instance,
+    so very large n_items give correspondingly small boxes).
+    """
+    rng = np.random.default_rng(seed)
+    C = np.array([W, H, D], dtype=float)
+    T = max(1, min(int(n_types), int(n_items)))
 
-    if vol > 1e-9:
-        s = (target_vol / vol) ** (1.0/3.0)
-        s = float(np.clip(s, 0.6, 1.4))
-        new_items = []
-        for it in items:
-            w = min(W, max(1.0, it.w * s))
-            h = min(H, max(1.0, it.h * s))
-            d = min(D, max(1.0, it.d * s))
-            new_items.append(Item(w=w,h=h,d=d))
-        items = new_items
+    wts = np.array([c.weight for c in classes], dtype=float)
+    cls = rng.choice(len(classes), size=T, p=wts / wts.sum())
+    lo = np.array([c.lo for c in classes])[cls][:, None]
+    hi = np.array([c.hi for c in classes])[cls][:, None]
+    dims = (lo + (hi - lo) * rng.random((T, 3))) * C
+
+    # Every type gets at least one box; the rest follow a Dirichlet share.
+    q = np.ones(T, dtype=np.int64) + rng.multinomial(int(n_items) - T, rng.dirichlet(np.ones(T)))
+    dims = _rescale(dims, q, C, fill_ratio * W*H*D, clip=False)
+    if integer:
+        dims = np.minimum(np.floor(C), np.maximum(1.0, np.round(dims)))
 
-    return Instance(name=name, container=Container(W=W,H=H,D=D), items=items)
+    restricted = rng.random(T) < p_restricted
+    types = [
+        BoxType(w=w, h=h, d=d, vert_ok=(0, 1, 0) if r else (1, 1, 1), q=int(k))
+        for (w, h, d), r, k in zip(dims.tolist(), restricted.tolist(), q.tolist())
+    ]
+    return Instance(name=name, container=Container(W=W,H=H,D=D), types=types)
+
+def _make(args, k: int) -> Instance:
+    name = f"{args.prefix}_{k:0{max(3, len(str(args.n_instances - 1)))}d}"
+    seed = args.seed + 1000*k
+    if args.mix is None:
+        return generate_instance(name=name, W=args.W, H=args.H, D=args.D, n_items=args.n_items,
+                                 fill_ratio=args.fill_ratio, seed=seed)
+    return generate_mixture_instance(name=name, W=args.W, H=args.H, D=args.D, n_items=args.n_items,
+                                     fill_ratio=args.fill_ratio, seed=seed, classes=parse_mixture(args.mix),
+                                     n_types=args.n_types, p_restricted=args.p_restricted)
+
+def _make_and_save(args, k: int) -> Optional[Instance]:
+    inst = _make(args, k)
+    if args.format == "bundle":
+        return inst
+    inst.save_json(str(Path(args.out_dir) / f"{inst.name}.json"), compact=args.format == "compact")
+    return None
 
 def main():
     ap = argparse.ArgumentParser()
@@ -48,23 +124,42 @@ def main():
     ap.add_argument("--H", type=float, default=100)
     ap.add_argument("--D", type=float, default=100)
     ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--prefix", type=str, default="syn")
+    ap.add_argument("--mix", type=str, default=None,
+                    help=f"Box-type size-class mixture: one of {sorted(MIXTURES)} or 'weight:lo-hi,...' "
+                         "(default: per-item lognormal sizes)")
+    ap.add_argument("--n_types", type=int, default=20, help="Box types per instance with --mix")
+    ap.add_argument("--p_restricted", type=float, default=0.0,
+                    help="With --mix: probability that a type may only stand on its original height")
+    ap.add_argument("--format", choices=["json", "compact", "bundle"], default="json",
+                    help="json: per-item JSON; compact: box-type JSON; bundle: one <out_dir>/<prefix>.rkb file")
+    ap.add_argument("--workers", type=int, default=1)
     args = ap.parse_args()
 
     out = Path(args.out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    for k in range(args.n_instances):
-        name = f"syn_{k:03d}"
-        inst = generate_instance(
-            name=name,
-            W=args.W, H=args.H, D=args.D,
-            n_items=args.n_items,
-            fill_ratio=args.fill_ratio,
-            seed=args.seed + 1000*k
-        )
-        inst.save_json(str(out / f"{name}.json"))
-
-    print(f"OK: wrote {args.n_instances} instances to {out}")
+    ks = range(args.n_instances)
+    bundle = BundleWriter(out / f"{args.prefix}.rkb") if args.format == "bundle" else None
+    try:
+        if args.workers > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                chunk = max(1, args.n_instances // (4 * args.workers))
+                results = ex.map(_make_and_save, [args] * args.n_instances, ks, chunksize=chunk)
+                for inst in results:
+                    if bundle is not None:
+                        bundle.add(inst)
+        else:
+            for k in ks:
+                inst = _make_and_save(args, k)
+                if bundle is not None:
+                    bundle.add(inst)
+    finally:
+        if bundle is not None:
+            bundle.close()
+
+    target = bundle.path if bundle is not None else out
+    print(f"OK: wrote {args.n_instances} instances to {target}")
 
 if __name__ == "__main__":
     main()
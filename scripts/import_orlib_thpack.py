@@ -6,7 +6,7 @@ from typing import Iterator, Optional, List, Dict, Any
 
 import pandas as pd
 
-from rk_adels.instance import Instance, Container, Item
+from rk_adels.instance import Instance, Container, BoxType
 
 def _nonempty_lines(path: Path) -> Iterator[str]:
     with path.open("r", encoding="utf-8", errors="ignore") as f:
@@ -48,7 +48,7 @@ def parse_thpack_file(path: Path, limit_problems: Optional[int] = None) -> List[
         Lc, Wc, Hc = LWH  # length, width, height
         n_types = int(next(it).split()[0])
 
-        items: List[Item] = []
+        types: List[BoxType] = []
         for _k in range(n_types):
             parts = [int(x) for x in next(it).split()]
             if len(parts) != 8:
@@ -60,11 +60,10 @@ def parse_thpack_file(path: Path, limit_problems: Optional[int] = None) -> List[
             # Vertical-permission flags must align with (w,h,d) = (length,height,width)
             vert_ok = (vl, vh, vw)
 
-            for _ in range(q):
-                items.append(Item(w=float(l), h=float(h), d=float(w), vert_ok=vert_ok))
+            types.append(BoxType(w=float(l), h=float(h), d=float(w), vert_ok=vert_ok, q=q))
 
         name = f"{path.stem}_p{p:03d}" + (f"_seed{seed}" if seed is not None else "")
-        inst = Instance(name=name, container=Container(W=float(Lc), H=float(Hc), D=float(Wc)), items=items)
+        inst = Instance(name=name, container=Container(W=float(Lc), H=float(Hc), D=float(Wc)), types=types)
         instances.append(inst)
 
         if limit_problems is not None and len(instances) >= limit_problems:
@@ -78,6 +77,7 @@ def main() -> None:
     ap.add_argument("--out_dir", required=True, help="Output directory for .json instances")
     ap.add_argument("--limit_problems", type=int, default=None, help="Optional: only convert first N problems per file")
     ap.add_argument("--manifest", action="store_true", help="Write a manifest CSV into out_dir")
+    ap.add_argument("--compact", action="store_true", help="Write box types with quantities instead of one entry per item")
     args = ap.parse_args()
 
     out_dir = Path(args.out_dir)
@@ -92,7 +92,7 @@ def main() -> None:
         insts = parse_thpack_file(p, limit_problems=args.limit_problems)
         for inst in insts:
             out_path = out_dir / f"{inst.name}.json"
-            inst.save_json(str(out_path))
+            inst.save_json(str(out_path), compact=args.compact)
             rows.append({
                 "name": inst.name,
                 "file": str(out_path),
@@ -100,6 +100,7 @@ def main() -> None:
                 "H": inst.container.H,
                 "D": inst.container.D,
                 "n_items": inst.n,
+                "n_types": inst.n_types,
             })
 
         print(f"OK: {p.name} -> {len(insts)} instances")
@@ -17,6 +17,11 @@ from pathlib import Path
 
 import pandas as pd
 
+from rk_adels.results_io import read_runs
+
+RESULTS_COLUMNS = ["instance", "method", "V_mean", "V_std", "V_best", "placed_mean", "time_s"]
+ABLATION_COLUMNS = ["instance", "variant", "V_mean", "V_std", "V_best", "placed_mean", "time_s", "decodes_per_s"]
+
 
 def _fmt_float(x, nd=4):
     try:
@@ -38,8 +43,7 @@ def _latex_escape(s: str) -> str:
 
 
 def results_table(df: pd.DataFrame) -> str:
-    # Expect columns: instance, method, V_mean, V_std, V_best, placed_mean, time_s
-    cols = ["instance", "method", "V_mean", "V_std", "V_best", "placed_mean", "time_s"]
+    cols = RESULTS_COLUMNS
     df = df.copy()
     for c in cols:
         if c not in df.columns:
@@ -77,8 +81,7 @@ def results_table(df: pd.DataFrame) -> str:
 
 
 def ablation_table(df: pd.DataFrame) -> str:
-    # Expect columns: instance, variant, V_mean, V_std, V_best, placed_mean, time_s, decodes_per_s
-    cols = ["instance", "variant", "V_mean", "V_std", "V_best", "placed_mean", "time_s", "decodes_per_s"]
+    cols = ABLATION_COLUMNS
     df = df.copy()
     for c in cols:
         if c not in df.columns:
@@ -116,6 +119,15 @@ def ablation_table(df: pd.DataFrame) -> str:
     return "\n".join(lines)
 
 
+def _find_table(in_dir: Path, stem: str) -> Path:
+    # Prefer columnar summaries when present; fall back to CSV.
+    for suffix in (".parquet", ".feather", ".csv"):
+        p = in_dir / f"{stem}{suffix}"
+        if p.exists():
+            return p
+    return in_dir / f"{stem}.csv"
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in_dir", required=True, help="Directory containing results_summary.csv and ablation_summary.csv")
@@ -126,16 +138,16 @@ def main():
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    rs_path = in_dir / "results_summary.csv"
-    ab_path = in_dir / "ablation_summary.csv"
+    rs_path = _find_table(in_dir, "results_summary")
+    ab_path = _find_table(in_dir, "ablation_summary")
 
     if not rs_path.exists():
         raise FileNotFoundError(f"Missing {rs_path}. Run scripts/plot_results.py first.")
     if not ab_path.exists():
         raise FileNotFoundError(f"Missing {ab_path}. Run scripts/plot_results.py first.")
 
-    rs = pd.read_csv(rs_path)
-    ab = pd.read_csv(ab_path)
+    rs = read_runs(rs_path, columns=RESULTS_COLUMNS)
+    ab = read_runs(ab_path, columns=ABLATION_COLUMNS)
 
     (out_dir / "results_table.tex").write_text(results_table(rs) + "\n", encoding="utf-8")
     (out_dir / "ablation_table.tex").write_text(ablation_table(ab) + "\n", encoding="utf-8")
@@ -1,9 +1,10 @@
 from __future__ import annotations
 import argparse
 from pathlib import Path
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from rk_adels.results_io import read_runs
+
 VARIANT_LABEL = {
     "H0": "H0 (Decoder-only)",
     "A1": "A1 (RK-DE)",
@@ -12,14 +13,23 @@ VARIANT_LABEL = {
     "RS": "Random Search (RK)",
     "GA": "GA (RK)",
     "SA": "SA (Perm+Orient)",
+    "PT": "PT (replica exchange)",
+    "PF": "Portfolio (A3+GA+PSO+SA)",
+    "SH": "L-SHADE",
+    "SHLS": "L-SHADE + LS",
+    "A2S": "A2 + surrogate",
+    "A3S": "A3 + surrogate",
+    "GAS": "GA + surrogate",
 }
 
+RESOURCE_PLOT_COLUMNS = ["cpu_user", "cpu_sys", "cpu_util", "peak_rss_mb", "gc_collections"]
+
 def make_plots(runs_csv: str, summary_csv: str, out_dir: str):
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    runs = pd.read_csv(runs_csv)
-    summ = pd.read_csv(summary_csv)
+    runs = read_runs(runs_csv, columns=["variant", "wallclock", "V_best"])
+    summ = read_runs(summary_csv, columns=["variant", "V_mean"])
 
     # Bar plot: mean utilization per variant (averaged over instances)
     agg = summ.groupby("variant", as_index=False).agg(V_mean=("V_mean","mean"), V_std=("V_mean","std"))
@@ -44,10 +54,37 @@ def make_plots(runs_csv: str, summary_csv: str, out_dir: str):
     plt.savefig(out / "fig_runtime_scatter.png", dpi=200)
     plt.close()
 
+    # Resources per variant (run tables written with resource accounting only)
+    res = read_runs(runs_csv, columns=["variant"] + RESOURCE_PLOT_COLUMNS)
+    if all(c in res.columns for c in RESOURCE_PLOT_COLUMNS):
+        agg = res.groupby("variant", as_index=False).agg(
+            cpu_user=("cpu_user","mean"), cpu_sys=("cpu_sys","mean"), cpu_util=("cpu_util","mean"),
+            rss=("peak_rss_mb","max"), gc=("gc_collections","mean"),
+        )
+        labels = agg["variant"].map(lambda v: VARIANT_LABEL.get(v, v))
+        fig, axes = plt.subplots(1, 4, figsize=(16, 4))
+        axes[0].bar(labels, agg["cpu_user"], label="user")
+        axes[0].bar(labels, agg["cpu_sys"], bottom=agg["cpu_user"], label="sys")
+        axes[0].set_ylabel("CPU seconds per run")
+        axes[0].legend()
+        axes[1].bar(labels, agg["cpu_util"])
+        axes[1].set_ylabel("CPU / wall-clock")
+        axes[2].bar(labels, agg["rss"])
+        axes[2].set_ylabel("Peak RSS (MB)")
+        axes[3].bar(labels, agg["gc"])
+        axes[3].set_ylabel("GC collections per run")
+        for ax in axes:
+            ax.tick_params(axis="x", labelrotation=30)
+            for t in ax.get_xticklabels():
+                t.set_ha("right")
+        fig.tight_layout()
+        fig.savefig(out / "fig_resources.png", dpi=200)
+        plt.close(fig)
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--runs_csv", required=True)
-    ap.add_argument("--summary_csv", required=True)
+    ap.add_argument("--runs_csv", required=True, help="runs.csv, runs.parquet or runs.feather")
+    ap.add_argument("--summary_csv", required=True, help="summary.csv (or a .parquet/.feather summary)")
     ap.add_argument("--out_dir", required=True)
     args = ap.parse_args()
     make_plots(args.runs_csv, args.summary_csv, args.out_dir)
@@ -1,60 +1,156 @@
 from __future__ import annotations
 import argparse
+import contextlib
+import time
+import zlib
 from pathlib import Path
-import pandas as pd
 
+from rk_adels.bundle import BUNDLE_SUFFIX, InstanceBundle
+from rk_adels.catalog import select_instances
 from rk_adels.instance import Instance
-from rk_adels.runner import run_variant, summarize_runs
-from scripts.plot_results import make_plots
+from rk_adels.metrics import MetricsExporter
+from rk_adels.racing import Race
+from rk_adels.results_io import RUN_FORMATS, RunsWriter, runs_path
+from rk_adels.checkpoint import Checkpoint
+from rk_adels.runner import CHECKPOINT_VARIANTS, make_decoder, run_variant, summarize_runs
+
+def _load_json_instance(ip: Path) -> Instance:
+    inst = Instance.load_json(str(ip))
+    inst.name = inst.name or ip.stem
+    return inst
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--instances_dir", required=True)
+    ap.add_argument("--instances_dir", required=True,
+                    help="Directory of *.json instances, or an instance bundle (.rkb) from scripts.bundle_instances")
     ap.add_argument("--out_dir", required=True)
+    ap.add_argument("--where", type=str, default=None,
+                    help="Catalog filter, e.g. \"n_items>150 and family=='thpack3'\" (see rk_adels.catalog)")
     ap.add_argument("--trials", type=int, default=10)
     ap.add_argument("--seconds", type=float, default=30.0)
     ap.add_argument("--NP", type=int, default=50)
     ap.add_argument("--seed", type=int, default=123)
     ap.add_argument("--variants", type=str, default="H0,A1,A2,A3",
                     help="Comma-separated list of variants to run (e.g., H0,A1,A2,A3,RS,GA,SA)")
+    ap.add_argument("--validate", action="store_true",
+                    help="Re-decode and check the best packing of every run (containment, overlap, orientations, metrics)")
+    ap.add_argument("--format", choices=RUN_FORMATS, default="csv",
+                    help="Run table format: csv (runs.csv) or columnar parquet/feather (needs pyarrow)")
+    ap.add_argument("--row_group_size", type=int, default=1000,
+                    help="Rows buffered per appended row group of the run table")
+    ap.add_argument("--decoder", choices=["full", "sections"], default="full",
+                    help="full: one wall/heightmap decode; sections: depth-section decomposition for very large loads")
+    ap.add_argument("--section_items", type=int, default=250, help="Items per depth section with --decoder sections")
+    ap.add_argument("--genotype", choices=["full", "compact"], default="full",
+                    help="full: 2n random keys; compact: one orientation key per item with more than one feasible orientation")
+    ap.add_argument("--block_items", type=int, default=0,
+                    help="Aggregate identical boxes into blocks of up to this many boxes before searching (0: off)")
+    ap.add_argument("--alloc_every", type=int, default=0,
+                    help="Trace every k-th decode with tracemalloc for the alloc_* run columns (0: off; slows traced decodes)")
+    ap.add_argument("--target_V", type=float, default=None,
+                    help="Stop each run once V_best reaches this utilization and record evals_to_target (decodes-to-target)")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="Processes for the replicas of the parallel-tempering variant PT (0: all replicas in this process)")
+    ap.add_argument("--checkpoint_dir", type=str, default=None,
+                    help="Checkpoint runs here and resume a run whose checkpoint exists")
+    ap.add_argument("--checkpoint_every", type=float, default=60.0, help="Minimum seconds between two checkpoints of a run")
+    ap.add_argument("--metrics", action="store_true",
+                    help="Write live metrics (metrics.jsonl, Prometheus metrics.prom) to --out_dir during the sweep")
+    ap.add_argument("--metrics_interval", type=float, default=5.0, help="Seconds between metrics snapshots")
+    ap.add_argument("--race", action="store_true",
+                    help="F-race: after each trial, drop variants that a Friedman test finds worse than the best (per instance)")
+    ap.add_argument("--race_alpha", type=float, default=0.05, help="Significance level of the racing tests")
+    ap.add_argument("--race_first", type=int, default=5, help="Trials completed before the first racing test")
     args = ap.parse_args()
 
     inst_dir = Path(args.instances_dir)
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    inst_paths = sorted(inst_dir.glob("*.json"))
-    if not inst_paths:
+    if inst_dir.suffix == BUNDLE_SUFFIX and inst_dir.is_file():
+        if args.where:
+            raise SystemExit("--where needs an instance directory (the catalog is built from JSON files)")
+        bundle = InstanceBundle(inst_dir)
+        inst_keys = list(range(len(bundle)))  # by position: names need not be unique in older bundles
+        load = bundle.instance
+    elif args.where:
+        inst_keys = select_instances(inst_dir, args.where)
+        load = _load_json_instance
+    else:
+        inst_keys = sorted(inst_dir.glob("*.json"))
+        load = _load_json_instance
+    if not inst_keys:
         raise SystemExit(f"No instances found in {inst_dir}. Run generate_instances first.")
 
-    rows = []
     variants = [v.strip() for v in args.variants.split(",") if v.strip()]
-    seed_off = {"H0":0,"A1":17,"A2":31,"A3":47,"RS":61,"GA":79,"SA":97}
+    decoder = make_decoder(args.decoder, section_items=args.section_items)
+    # Surrogate variants share the seed of their base variant so comparisons are paired.
+    seed_off = {"H0":0,"A1":17,"A2":31,"A3":47,"RS":61,"GA":79,"SA":97,"A2S":31,"A3S":47,"GAS":79,"PT":113,"PF":127,"SH":131,"SHLS":137}
+
+    runs_file = runs_path(out_dir, args.format)
+    meta = dict(vars(args), variants=variants, started=time.strftime("%Y-%m-%dT%H:%M:%S"))
 
-    for ip in inst_paths:
-        inst = Instance.load_json(str(ip))
-        inst.name = inst.name or ip.stem
+    metrics = None
+    if args.metrics:
+        metrics = MetricsExporter(out_dir, jobs_planned=len(inst_keys) * args.trials * len(variants),
+                                  interval=args.metrics_interval)
 
-        for t in range(args.trials):
-            trial_seed_base = args.seed + 100000*t + (abs(hash(inst.name)) % 10000)
-            for v in variants:
-                row = run_variant(inst, variant=v, seconds=args.seconds, NP=args.NP, seed=trial_seed_base + seed_off.get(v, 0))
-                row["trial"] = t
-                rows.append(row)
-                print(f"{inst.name} trial={t} {v} V={row['V_best']:.4f} placed={row['placed_best']} evals/s={row['evals_per_sec']:.1f}")
+    n_planned = n_run = 0
+    with RunsWriter(runs_file, fmt=args.format, row_group_size=args.row_group_size, metadata=meta) as writer, \
+            (metrics if metrics is not None else contextlib.nullcontext()):
+        for key in inst_keys:
+            inst = load(key)
+            race = Race(variants, alpha=args.race_alpha, first_test=args.race_first) if args.race else None
+            inst_rows = []
 
-    df = pd.DataFrame(rows)
-    runs_csv = out_dir / "runs.csv"
-    df.to_csv(runs_csv, index=False)
+            try:
+                for t in range(args.trials):
+                    trial_seed_base = args.seed + 100000*t + (zlib.crc32(inst.name.encode()) % 10000)
+                    for v in (race.alive if race is not None else variants):
+                        if metrics is not None:
+                            metrics.start_job(inst.name, v, t)
+                        ckpt = None
+                        if args.checkpoint_dir and v in CHECKPOINT_VARIANTS:
+                            ckpt = Checkpoint(Path(args.checkpoint_dir) / f"{inst.name}_{v}_t{t}.npz", every=args.checkpoint_every)
+                        row = run_variant(inst, variant=v, seconds=args.seconds, NP=args.NP, seed=trial_seed_base + seed_off.get(v, 0),
+                                          validate=args.validate, decoder=decoder, genotype=args.genotype,
+                                          block_items=args.block_items, alloc_every=args.alloc_every,
+                                          workers=args.workers, target_V=args.target_V, checkpoint=ckpt,
+                                          callback=metrics.progress if metrics is not None else None)
+                        row["trial"] = t
+                        if metrics is not None:
+                            metrics.end_job(row)
+                        n_run += 1
+                        print(f"{inst.name} trial={t} {v} V={row['V_best']:.4f} placed={row['placed_best']} evals/s={row['evals_per_sec']:.1f}")
+                        if race is None:
+                            writer.append(row)
+                        else:
+                            race.add(v, row["V_best"])
+                            inst_rows.append(row)
+                    if race is not None:
+                        for v in race.end_round(t):
+                            print(f"{inst.name} race: dropped {v} after trial {t} (Friedman p={race.p_at_drop[v]:.3g})")
+                            if metrics is not None:
+                                metrics.cancel_jobs(args.trials - 1 - t)
+                n_planned += args.trials * len(variants)
+            finally:
+                # Race flags are only known once the instance is done, so its rows are written
+                # together; after an error or interrupt they carry the flags known so far.
+                for row in inst_rows:
+                    row.update(race.flags(row["variant"]))
+                    writer.append(row)
 
-    summary = summarize_runs(df)
+    summary = summarize_runs(runs_file)
     summary_csv = out_dir / "summary.csv"
     summary.to_csv(summary_csv, index=False)
 
-    print(f"OK: wrote {runs_csv}")
+    print(f"OK: wrote {runs_file} ({writer.n_rows} rows)")
+    if args.race:
+        print(f"Racing ran {n_run} of {n_planned} planned runs ({100.0 * (1 - n_run / max(n_planned, 1)):.0f}% saved)")
     print(f"OK: wrote {summary_csv}")
 
-    make_plots(str(runs_csv), str(summary_csv), str(out_dir))
+    from scripts.plot_results import make_plots  # matplotlib is only needed here
+    make_plots(str(runs_file), str(summary_csv), str(out_dir))
     print(f"OK: plots saved to {out_dir}")
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from rk_adels.instance import Instance
+from rk_adels.service import DEFAULT_PORT, SolveClient
+
+def main():
+    ap = argparse.ArgumentParser(description="Send solve requests to a running scripts.solve_server and print results and timing.")
+    ap.add_argument("--url", type=str, default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    ap.add_argument("--instance", required=True, nargs="+", help="Instance JSON file(s)")
+    ap.add_argument("--variant", type=str, default="A3")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--NP", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=123)
+    ap.add_argument("--repeat", type=int, default=1, help="Requests per instance (seeds seed, seed+1, ...)")
+    ap.add_argument("--concurrency", type=int, default=1, help="Parallel client requests")
+    ap.add_argument("--batch", action="store_true", help="Send all requests as one /solve_batch call")
+    ap.add_argument("--validate", action="store_true")
+    ap.add_argument("--out", type=str, default=None, help="Write the full responses (with placements) to this JSON file")
+    args = ap.parse_args()
+
+    client = SolveClient(args.url)
+    insts = [Instance.load_json(p) for p in args.instance]
+    jobs = [(inst, dict(variant=args.variant, seconds=args.seconds, NP=args.NP, seed=args.seed + k,
+                        validate=args.validate, placements=args.out is not None))
+            for inst in insts for k in range(args.repeat)]
+
+    if args.batch:
+        responses = client.solve_batch(jobs)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as ex:
+            responses = list(ex.map(lambda j: client.solve(j[0], **j[1]), jobs))
+
+    for r in responses:
+        if "error" in r:
+            print(f"ERROR: {r['error']}")
+            continue
+        row, t = r["result"], r["timing"]
+        print(f"{row['instance']:32s} {row['variant']:4s} seed={row['seed']:<5d} V={row['V_best']:.4f} placed={row['placed_best']:<4d} "
+              f"queue={t['queue_s']:.3f}s solve={t['solve_s']:.3f}s total={t['total_s']:.3f}s "
+              f"worker={r['worker']} cache_hit={r['cache_hit']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(responses, f)
+        print(f"OK: wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
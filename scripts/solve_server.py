@@ -0,0 +1,28 @@
+from __future__ import annotations
+import argparse
+
+from rk_adels.service import DEFAULT_PORT, SolveService, make_server
+
+def main():
+    ap = argparse.ArgumentParser(description="Local solve service: warm worker pool behind a localhost HTTP endpoint (see rk_adels.service).")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--cache_size", type=int, default=32, help="Parsed instances cached per worker")
+    ap.add_argument("--max_instances", type=int, default=256, help="Registered instances kept by the server (LRU)")
+    args = ap.parse_args()
+
+    service = SolveService(workers=args.workers, cache_size=args.cache_size, max_instances=args.max_instances)
+    pids = service.warm()
+    server = make_server(service, host=args.host, port=args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} with {len(pids)} warm workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()